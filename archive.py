@@ -0,0 +1,222 @@
+import sqlite3
+from collections import Counter
+from enum import Enum
+from typing import NamedTuple
+
+from enemy import EnemyMode
+from game import ReplayMove, encode_settings, enemy_mode
+from replay import read_replay, decode_moves
+
+
+class Winner(Enum):
+    PLAYER = 0,
+    ENEMY = 1
+
+
+class ArchivedGame(NamedTuple):
+    """
+    A game stored in the archive. moves is the number of shots fired by both
+    sides, and replay can be played with a ReplayPlayer
+    """
+    game_id: int
+    enemy_mode: EnemyMode
+    winner: Winner
+    moves: int
+    player_shots: int
+    enemy_shots: int
+    replay: bytes
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    enemy_mode TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    moves INTEGER NOT NULL,
+    player_shots INTEGER NOT NULL,
+    enemy_shots INTEGER NOT NULL,
+    settings INTEGER NOT NULL,
+    replay BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_mode
+    ON games (enemy_mode, winner, moves);
+CREATE INDEX IF NOT EXISTS games_by_winner ON games (winner, moves);
+CREATE INDEX IF NOT EXISTS games_by_moves ON games (moves);
+"""
+
+_COLUMNS = "id, enemy_mode, winner, moves, player_shots, enemy_shots, replay"
+
+
+def _summarize(replay: bytes) -> tuple:
+    """
+    Reads a replay of a finished game and creates a row of the games table
+    for it
+    :param replay: replay of the game
+    :type replay: bytes
+    :return: a tuple with values of all columns except the id
+    :raises ValueError: if the replay is invalid or the game isn't finished
+    """
+    header = read_replay(replay)
+    shots = Counter(move for move, _ in decode_moves(header.records))
+    # every ship is encoded with three bytes
+    if shots[ReplayMove.PLAYER_SINK] == len(header.enemy_fleet) // 3:
+        winner = Winner.PLAYER
+    elif shots[ReplayMove.ENEMY_SINK] == len(header.player_fleet) // 3:
+        winner = Winner.ENEMY
+    else:
+        raise ValueError("the game isn't finished")
+    player_shots = shots[ReplayMove.PLAYER_MISS] + \
+        shots[ReplayMove.PLAYER_HIT] + shots[ReplayMove.PLAYER_SINK]
+    enemy_shots = shots[ReplayMove.ENEMY_MISS] + \
+        shots[ReplayMove.ENEMY_HIT] + shots[ReplayMove.ENEMY_SINK]
+    return (enemy_mode(header.settings).name, winner.name,
+            player_shots + enemy_shots, player_shots, enemy_shots,
+            encode_settings(header.settings), bytes(replay))
+
+
+def _where_clause(mode: EnemyMode, winner: Winner, min_moves: int,
+                  max_moves: int) -> tuple[str, list]:
+    """
+    Creates the WHERE clause of a query for games matching all the given
+    conditions, the ones which are None are skipped
+    :param mode: mode of the enemy
+    :type mode: EnemyMode
+    :param winner: the side which won
+    :type winner: Winner
+    :param min_moves: minimum number of shots fired by both sides
+    :type min_moves: int
+    :param max_moves: maximum number of shots fired by both sides
+    :type max_moves: int
+    :return: a tuple with the clause and a list of its parameters
+    """
+    conditions = []
+    parameters = []
+    if mode is not None:
+        conditions.append("enemy_mode = ?")
+        parameters.append(mode.name)
+    if winner is not None:
+        conditions.append("winner = ?")
+        parameters.append(winner.name)
+    if min_moves is not None:
+        conditions.append("moves >= ?")
+        parameters.append(min_moves)
+    if max_moves is not None:
+        conditions.append("moves <= ?")
+        parameters.append(max_moves)
+    if not conditions:
+        return "", parameters
+    return " WHERE " + " AND ".join(conditions), parameters
+
+
+class GameArchive:
+    """
+    Archive of finished games in an SQLite database, indexed by the enemy's
+    mode, the winner and the length of the game. Games are added in batches,
+    every batch is inserted in a single transaction, which is much faster
+    than committing every game separately. Every game is stored as its
+    replay, which contains the settings, both fleets and all moves
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        """
+        Opens the archive, creating it if it doesn't exist
+        :param path: path to the database file, or ":memory:"
+        :type path: str
+        :param batch_size: number of games kept in memory before they are
+        inserted into the database
+        :type batch_size: int
+        """
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._batch_size = batch_size
+        self._batch = []
+
+    def __enter__(self) -> "GameArchive":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, replay: bytes):
+        """
+        Adds a finished game to the current batch, inserting the batch once
+        it's full
+        :param replay: replay of the game, from Game.get_replay() or a
+        MatchResult of a recorded simulated game
+        :type replay: bytes
+        :raises ValueError: if the replay is invalid or the game isn't
+        finished
+        """
+        self._batch.append(_summarize(replay))
+        if len(self._batch) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Inserts the current batch into the database in a single transaction
+        """
+        if not self._batch:
+            return
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO games (enemy_mode, winner, moves, player_shots, "
+                "enemy_shots, settings, replay) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._batch)
+        self._batch = []
+
+    def close(self):
+        """
+        Inserts the remaining games and closes the database
+        """
+        if self._connection is None:
+            return
+        self.flush()
+        self._connection.close()
+        self._connection = None
+
+    def find(self, mode: EnemyMode = None, winner: Winner = None,
+             min_moves: int = None, max_moves: int = None):
+        """
+        Finds games matching all the given conditions, for example all games
+        lost by the hard enemy which lasted over 70 moves with
+        find(EnemyMode.HARD, Winner.PLAYER, min_moves=71)
+        :param mode: mode of the enemy
+        :type mode: EnemyMode
+        :param winner: the side which won
+        :type winner: Winner
+        :param min_moves: minimum number of shots fired by both sides
+        :type min_moves: int
+        :param max_moves: maximum number of shots fired by both sides
+        :type max_moves: int
+        :return: a generator of ArchivedGames, in the order they were added
+        """
+        self.flush()
+        where, parameters = _where_clause(mode, winner, min_moves, max_moves)
+        cursor = self._connection.execute(
+            f"SELECT {_COLUMNS} FROM games{where} ORDER BY id", parameters)
+        for (game_id, mode_name, winner_name, moves, player_shots,
+             enemy_shots, replay) in cursor:
+            yield ArchivedGame(game_id, EnemyMode[mode_name],
+                               Winner[winner_name], moves, player_shots,
+                               enemy_shots, replay)
+
+    def count(self, mode: EnemyMode = None, winner: Winner = None,
+              min_moves: int = None, max_moves: int = None) -> int:
+        """
+        Counts games matching all the given conditions, which are the same as
+        in find()
+        :param mode: mode of the enemy
+        :type mode: EnemyMode
+        :param winner: the side which won
+        :type winner: Winner
+        :param min_moves: minimum number of shots fired by both sides
+        :type min_moves: int
+        :param max_moves: maximum number of shots fired by both sides
+        :type max_moves: int
+        :return: number of the games
+        """
+        self.flush()
+        where, parameters = _where_clause(mode, winner, min_moves, max_moves)
+        cursor = self._connection.execute(
+            f"SELECT COUNT(*) FROM games{where}", parameters)
+        return cursor.fetchone()[0]
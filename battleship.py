@@ -4,13 +4,13 @@ import sys
 from enum import Enum
 from typing import List
 
-from PySide2.QtCore import Qt
+from PySide2.QtCore import Qt, QThreadPool
 from PySide2.QtWidgets import QApplication, QMainWindow
 
 from board import FieldStatus
 from fleet_creator import FleetCreator, FCMessage
-from game import Game, GameMessage
-from gui import UIBoard, load_icons, UIFleet
+from game import Game, GameMessage, GameView
+from gui import UIBoard, load_icons, UIFleet, EnemyMoveWorker
 from settings import Settings, Setting
 from ui_battleship import Ui_Battleship
 
@@ -41,7 +41,9 @@ class Command(Enum):
     GAME_UNMARK_FIELD = 14,
     GAME_HELP = 15,
     SETTINGS_MMA = 16,
-    SETTINGS_HARD_ENEMY = 17
+    SETTINGS_HARD_ENEMY = 17,
+    SETTINGS_DENSITY_ENEMY = 18,
+    SETTINGS_MONTE_CARLO_ENEMY = 19
 
 
 def cls():
@@ -231,7 +233,9 @@ class BattleshipCMD:
         """
         settings_list = [
             "1. Mark fields around sunken ships:",
-            "2. Harder enemy: "
+            "2. Harder enemy: ",
+            "3. Probability-based targeting of the harder enemy: ",
+            "4. Sampling-based targeting of the harder enemy: "
         ]
         settings = self._settings.get_settings()
         states = ["Yes" if x else "No" for x in settings.values()]
@@ -354,6 +358,10 @@ class BattleshipCMD:
                 return Command.SETTINGS_MMA, "", 0
             elif command_parts[0].startswith('2'):
                 return Command.SETTINGS_HARD_ENEMY, "", 0
+            elif command_parts[0].startswith('3'):
+                return Command.SETTINGS_DENSITY_ENEMY, "", 0
+            elif command_parts[0].startswith('4'):
+                return Command.SETTINGS_MONTE_CARLO_ENEMY, "", 0
             else:
                 return Command.EXIT_TO_MAIN, "", 0
 
@@ -457,6 +465,15 @@ class BattleshipCMD:
             setting_hard_enemy = self._settings.get_settings()[
                 Setting.HARD_ENEMY]
             self._settings.set_hard_enemy(not setting_hard_enemy)
+        elif command == Command.SETTINGS_DENSITY_ENEMY:
+            setting_density_enemy = self._settings.get_settings()[
+                Setting.DENSITY_ENEMY]
+            self._settings.set_density_enemy(not setting_density_enemy)
+        elif command == Command.SETTINGS_MONTE_CARLO_ENEMY:
+            setting_monte_carlo_enemy = self._settings.get_settings()[
+                Setting.MONTE_CARLO_ENEMY]
+            self._settings.set_monte_carlo_enemy(
+                not setting_monte_carlo_enemy)
         else:
             self._game.apply_settings(self._settings.get_settings())
             self._state = AppState.MAIN_MENU
@@ -496,6 +513,11 @@ class BattleshipWindow(QMainWindow):
         self._game_enemy_fleet = UIFleet()
         self._settings = Settings()
         self._settings.load_settings()
+        self._thread_pool = QThreadPool.globalInstance()
+        self._enemy_move_worker = None
+        # every started worker is kept until it finishes, so it isn't deleted
+        # while it's running, even if a new game made its result useless
+        self._enemy_move_workers = set()
         self._setup_boards()
         self._setup_fleet_displays()
         self._link_buttons()
@@ -514,11 +536,10 @@ class BattleshipWindow(QMainWindow):
         :type QMouseEvent: QMouseEvent
         """
         if self.ui.stackedWidget.currentIndex() == 2:  # in Game
-            if not self._game.players_turn():
-                self._game.enemy_move()
-                self._game_refresh()
             if self._game.won():
                 self.ui.stackedWidget.setCurrentIndex(0)
+            elif not self._game.players_turn():
+                self._game_enemy_move()
 
     def _setup_boards(self):
         """
@@ -581,6 +602,10 @@ class BattleshipWindow(QMainWindow):
             self._settings_toggle_mma)
         self.ui.checkbox_settings_hard_enemy.stateChanged.connect(
             self._settings_toggle_hard_enemy)
+        self.ui.checkbox_settings_density_enemy.stateChanged.connect(
+            self._settings_toggle_density_enemy)
+        self.ui.checkbox_settings_monte_carlo_enemy.stateChanged.connect(
+            self._settings_toggle_monte_carlo_enemy)
 
     def _load_settings(self):
         settings = self._settings.get_settings()
@@ -588,6 +613,10 @@ class BattleshipWindow(QMainWindow):
             settings[Setting.MARK_MISSES_AROUND])
         self.ui.checkbox_settings_hard_enemy.setChecked(
             settings[Setting.HARD_ENEMY])
+        self.ui.checkbox_settings_density_enemy.setChecked(
+            settings[Setting.DENSITY_ENEMY])
+        self.ui.checkbox_settings_monte_carlo_enemy.setChecked(
+            settings[Setting.MONTE_CARLO_ENEMY])
         self._game.apply_settings(self._settings.get_settings())
 
     def _fix_pyside2_uic_bug(self):
@@ -675,9 +704,12 @@ class BattleshipWindow(QMainWindow):
         fleet
         """
         board, fleet = self._fleet_creator.get_setup()
+        self._enemy_move_worker = None
+        self._game = Game()
+        self._game.apply_settings(self._settings.get_settings())
         self._game.start_game(board, fleet)
         self.ui.game_plain_text_edit_log.clear()
-        self._game_refresh()
+        self._game_full_refresh()
         self.ui.stackedWidget.setCurrentIndex(2)
 
     def _fleet_creator_refresh(self):
@@ -703,8 +735,43 @@ class BattleshipWindow(QMainWindow):
             self.ui.stackedWidget.setCurrentIndex(0)
         if self._game.players_turn():
             self._game.discover_field(x, y)
+            self._game_refresh()
         else:
-            self._game.enemy_move()
+            self._game_enemy_move()
+
+    def _game_enemy_move(self):
+        """
+        Starts the computer enemy's move, its target is chosen by a worker
+        from the thread pool and the move is finished in
+        _game_enemy_move_finished() once it's ready. Does nothing if the enemy
+        is already thinking
+        """
+        if self._enemy_move_worker is not None:
+            return
+        self._enemy_move_worker = EnemyMoveWorker(self._game)
+        self._enemy_move_workers.add(self._enemy_move_worker)
+        self._enemy_move_worker.signals.finished.connect(
+            self._game_enemy_move_finished)
+        self._thread_pool.start(self._enemy_move_worker)
+
+    def _game_enemy_move_finished(self, worker: EnemyMoveWorker,
+                                  target: tuple[str, int]):
+        """
+        Makes the computer enemy's move on the main thread with the target
+        chosen by the worker, and refreshes all Game UI elements afterwards.
+        Results of workers started before a new game was started are ignored
+        :param worker: the worker which chose the target
+        :type worker: EnemyMoveWorker
+        :param target: coordinates of the chosen field, or None if it wasn't
+        the enemy's turn
+        :type target: tuple
+        """
+        self._enemy_move_workers.discard(worker)
+        if worker is not self._enemy_move_worker:
+            return
+        self._enemy_move_worker = None
+        if target is not None:
+            self._game.enemy_move(target)
         self._game_refresh()
 
     def _game_right_click(self, x: str, y: int):
@@ -725,11 +792,12 @@ class BattleshipWindow(QMainWindow):
             self._game.unmark_field(x, y)
         self._game_refresh()
 
-    def _game_refresh(self):
+    def _game_full_refresh(self):
         """
-        Refreshes all Game UI elements after player or the enemy performs a
-        move
+        Refreshes all Game UI elements by comparing them with whole boards and
+        fleets, used at the start of the game
         """
+        self._game.get_changes()
         player_board = self._game.get_player_board_display()
         enemy_board = self._game.get_enemy_board_display()
         self._game_player_board.update_board(player_board, None)
@@ -738,6 +806,30 @@ class BattleshipWindow(QMainWindow):
         enemy_fleet = self._game.get_enemy_fleet_display()
         self._game_player_fleet.update_fleet_display(player_fleet)
         self._game_enemy_fleet.update_fleet_display(enemy_fleet)
+        self._game_refresh_log()
+
+    def _game_refresh(self):
+        """
+        Refreshes the Game UI elements which changed after player or the
+        enemy performs a move
+        """
+        displays = {
+            GameView.PLAYER_BOARD: self._game_player_board,
+            GameView.ENEMY_BOARD: self._game_enemy_board,
+            GameView.PLAYER_FLEET: self._game_player_fleet,
+            GameView.ENEMY_FLEET: self._game_enemy_fleet
+        }
+        changes = {view: [] for view in displays}
+        for change in self._game.get_changes():
+            changes[change.view].append(change)
+        for view, display in displays.items():
+            display.apply_changes(changes[view])
+        self._game_refresh_log()
+
+    def _game_refresh_log(self):
+        """
+        Adds messages generated during the last move to the Game log
+        """
         messages = self._game.get_display_messages()
         formatted = format_game_messages(messages, extra_newline=True)
         self.ui.game_plain_text_edit_log.insertPlainText(formatted)
@@ -755,6 +847,14 @@ class BattleshipWindow(QMainWindow):
         new_state = self.ui.checkbox_settings_hard_enemy.isChecked()
         self._settings.set_hard_enemy(new_state)
 
+    def _settings_toggle_density_enemy(self):
+        new_state = self.ui.checkbox_settings_density_enemy.isChecked()
+        self._settings.set_density_enemy(new_state)
+
+    def _settings_toggle_monte_carlo_enemy(self):
+        new_state = self.ui.checkbox_settings_monte_carlo_enemy.isChecked()
+        self._settings.set_monte_carlo_enemy(new_state)
+
     def _settings_save_and_back(self):
         self._game.apply_settings(self._settings.get_settings())
         self._return_to_main()
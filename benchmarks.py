@@ -0,0 +1,82 @@
+import argparse
+import glob
+import os
+import sys
+
+import pytest
+
+# how much slower on average than the baseline a benchmark may get before the
+# comparison fails, in percent
+REGRESSION_THRESHOLD = 10
+BENCHMARK_STORAGE = ".benchmarks"
+
+
+def stored_baselines(storage: str) -> list:
+    """
+    Lists the benchmark results saved in the storage directory
+    :param storage: directory with the saved results
+    :type storage: str
+    :return: a list of paths to the saved results, pytest-benchmark keeps them
+    in a subdirectory for every machine and Python version
+    """
+    return sorted(glob.glob(os.path.join(storage, "*", "*.json")))
+
+
+def save_baseline(storage: str) -> int:
+    """
+    Runs the benchmarks and saves their results as a new baseline
+    :param storage: directory to save the results in
+    :type storage: str
+    :return: exit code of pytest
+    """
+    return pytest.main(["test_benchmark.py", "--benchmark-only",
+                        "--benchmark-autosave",
+                        f"--benchmark-storage={storage}"])
+
+
+def compare_with_baseline(storage: str, threshold: int) -> int:
+    """
+    Runs the benchmarks and compares them with the latest saved baseline
+    :param storage: directory with the saved results
+    :type storage: str
+    :param threshold: how much slower on average, in percent, a benchmark may
+    get before the comparison fails
+    :type threshold: int
+    :return: exit code of pytest, which isn't 0 if any benchmark got slower
+    than allowed, or 1 if there is no baseline to compare with
+    """
+    if not stored_baselines(storage):
+        print(f"No baseline saved in {storage}, save one first",
+              file=sys.stderr)
+        return 1
+    return pytest.main(["test_benchmark.py", "--benchmark-only",
+                        "--benchmark-compare",
+                        f"--benchmark-compare-fail=mean:{threshold}%",
+                        f"--benchmark-storage={storage}"])
+
+
+def main(argv):
+    """
+    Parses the command line arguments and saves or compares the benchmarks
+    :param argv: command line arguments
+    :type argv: list
+    :return: exit code of the benchmark run
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["save", "compare"],
+                        help="save a new baseline or compare with the latest "
+                             "one")
+    parser.add_argument("--storage", default=BENCHMARK_STORAGE,
+                        help="directory with the saved baselines")
+    parser.add_argument("--threshold", type=int,
+                        default=REGRESSION_THRESHOLD,
+                        help="how much slower on average than the baseline "
+                             "a benchmark may get, in percent")
+    args = parser.parse_args(argv[1:])
+    if args.command == "save":
+        return save_baseline(args.storage)
+    return compare_with_baseline(args.storage, args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,4 +1,6 @@
+import random
 from enum import Enum
+from typing import List, Union
 
 import fleet
 
@@ -10,12 +12,19 @@ class FieldStatus(Enum):
     SUNK = 3,  # indicates that this field contains a sunken ship
     SELECTED = 4  # a special state used in the GUI
 
+    # members are singletons, so hashing them by identity is enough, and is
+    # much faster than hashing their names like Enum does, which matters for
+    # the BitBoard looking up its masks by status
+    __hash__ = object.__hash__
+
 
 class Field:
     """
     Class that stores information about a field on a game board.
     """
 
+    __slots__ = ('_status',)
+
     def __init__(self):
         """
         Initializes a field, assigning it a status of FieldStatus.NOTHING
@@ -57,6 +66,50 @@ class InvalidGameCoordinatesError(Exception):
         super().__init__(f"Invalid game coordinates specified: {x}, {y}")
 
 
+FULL_BOARD_MASK = (1 << 100) - 1
+# bit of every field in the BitBoard masks, by the field's index
+FIELD_BITS = tuple(1 << index for index in range(100))
+# Statuses of the BitBoard masks, by the number of the mask, and the reverse
+LAYER_STATUSES = (FieldStatus.NOTHING, FieldStatus.MISS, FieldStatus.SHIP,
+                  FieldStatus.SUNK, FieldStatus.SELECTED)
+STATUS_LAYERS = {status: layer for layer, status in enumerate(LAYER_STATUSES)}
+# number of bytes needed to store a mask of the whole board
+MASK_BYTES = 13
+
+# Coordinates of all fields in the order of return_all_field_coordinates()
+ALL_FIELDS = tuple((x, y) for x in "abcdefghij" for y in range(1, 11))
+FIELD_SET = frozenset(ALL_FIELDS)
+# Field coordinates translated to indices of the fields array and to field
+# indices used by the BitBoard, and the field indices translated back
+ARRAY_COORDINATES = {(x, y): (ord(x) - 97, y - 1) for x, y in ALL_FIELDS}
+FIELD_INDICES = {field: c_y * 10 + c_x
+                 for field, (c_x, c_y) in ARRAY_COORDINATES.items()}
+INDEX_TO_FIELD = tuple(sorted(ALL_FIELDS, key=FIELD_INDICES.get))
+# The same field indices looked up by column and then by row, which is several
+# times faster than building and hashing a tuple of coordinates
+COLUMN_FIELD_INDICES = {x: {y: FIELD_INDICES[(x, y)] for y in range(1, 11)}
+                        for x in "abcdefghij"}
+# Fields on the board next to every field, in the same order as in
+# enemy.create_list_of_adherent() and enemy.create_list_of_tangents()
+ADHERENT_FIELDS = {
+    (x, y): tuple(field for field in [(chr(ord(x) - 1), y),
+                                      (chr(ord(x) + 1), y),
+                                      (x, y - 1), (x, y + 1)]
+                  if field in FIELD_SET)
+    for x, y in ALL_FIELDS
+}
+TANGENT_FIELDS = {
+    (x, y): tuple(field for field in [(chr(ord(x) - 1), y - 1),
+                                      (chr(ord(x) + 1), y - 1),
+                                      (chr(ord(x) - 1), y + 1),
+                                      (chr(ord(x) + 1), y + 1)]
+                  if field in FIELD_SET)
+    for x, y in ALL_FIELDS
+}
+FIELDS_AROUND = {field: ADHERENT_FIELDS[field] + TANGENT_FIELDS[field]
+                 for field in ALL_FIELDS}
+
+
 def game_to_array_coords(x: str, y: int) -> tuple[int, int]:
     """
     Function used to translate in-game coordinates (like 'a', 7) to board field
@@ -68,6 +121,9 @@ def game_to_array_coords(x: str, y: int) -> tuple[int, int]:
     :type y: int
     :return: a tuple of coordinates translated to indices of the fields array
     """
+    array_coords = ARRAY_COORDINATES.get((x, y))
+    if array_coords is not None:
+        return array_coords
     x = x.lower()
     coord_x = ord(x) - 97
     coord_y = y - 1
@@ -76,16 +132,60 @@ def game_to_array_coords(x: str, y: int) -> tuple[int, int]:
     return coord_x, coord_y
 
 
+def field_index(x: str, y: int) -> int:
+    """
+    Translates in-game coordinates to the index of the field, counting fields
+    row by row from the upper left corner of the board. The index is used as
+    the number of the field's bit in the BitBoard masks
+    :param x: x coordinate of the field, a letter from a to j
+    :type x: str
+    :param y: y coordinate of the field, a number from 1 to 10
+    :type y: int
+    :return: index of the field, a number from 0 to 99
+    """
+    try:
+        return COLUMN_FIELD_INDICES[x][y]
+    except KeyError:
+        c_x, c_y = game_to_array_coords(x, y)
+        return c_y * 10 + c_x
+
+
+def ship_mask(ship: "fleet.Ship") -> int:
+    """
+    Creates a bit mask of the fields occupied by the given ship
+    :param ship: Ship to create the mask of
+    :type ship: Ship
+    :return: an integer with bits of the ship's fields set
+    """
+    mask = 0
+    for segment in ship.segments():
+        x, y = segment.position()
+        mask |= 1 << field_index(x, y)
+    return mask
+
+
+def mask_indices(mask: int) -> List[int]:
+    """
+    Lists indices of all fields in the mask
+    :param mask: mask of fields
+    :type mask: int
+    :return: a list of indices of fields which bits are set in the mask, in
+    ascending order
+    """
+    indices = []
+    while mask:
+        lowest = mask & -mask
+        indices.append(lowest.bit_length() - 1)
+        mask ^= lowest
+    return indices
+
+
 def return_all_field_coordinates():
     """
     Returns a list of tuples containing coordinates of all fields on the board
     :return: a list of 100 tuples with field coordinates
     """
-    all_fields = []
-    for x in "abcdefghij":
-        for y in range(1, 11):
-            all_fields.append((x, y))
-    return all_fields
+    return list(ALL_FIELDS)
 
 
 def field_on_board(field: tuple[str, int]) -> bool:
@@ -95,7 +195,84 @@ def field_on_board(field: tuple[str, int]) -> bool:
     :type field: tuple
     :return: True if coordinates point to a field on the board, otherwise False
     """
-    return field in return_all_field_coordinates()
+    return field in FIELD_SET
+
+
+class FieldSet:
+    """
+    Set of fields, which stores indices of the fields in a list, together with
+    the position of every field in that list and a mask of all fields in the
+    set. Checking, removing and randomly choosing fields takes constant time
+    """
+
+    __slots__ = ('_indices', '_positions', '_mask')
+
+    def __init__(self, fields=()):
+        """
+        Creates a set containing the given fields
+        :param fields: coordinates of fields to put in the set
+        """
+        self._indices = []
+        self._positions = [-1] * 100
+        self._mask = 0
+        for field in fields:
+            self.add(field)
+
+    def __contains__(self, field) -> bool:
+        index = FIELD_INDICES.get(field)
+        return index is not None and self._positions[index] != -1
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def __iter__(self):
+        return (INDEX_TO_FIELD[index] for index in self._indices)
+
+    def add(self, field: tuple[str, int]):
+        """
+        Adds a field to the set, if it isn't in the set already
+        :param field: coordinates of the field
+        :type field: tuple
+        """
+        index = FIELD_INDICES[field]
+        if self._positions[index] == -1:
+            self._positions[index] = len(self._indices)
+            self._indices.append(index)
+            self._mask |= 1 << index
+
+    def remove(self, field: tuple[str, int]):
+        """
+        Removes a field from the set, by moving the last field in the list to
+        its position
+        :param field: coordinates of the field
+        :type field: tuple
+        :raises ValueError: if the field is not in the set
+        """
+        if field not in self:
+            raise ValueError(f"{field} is not in the set")
+        index = FIELD_INDICES[field]
+        position = self._positions[index]
+        last = self._indices.pop()
+        if last != index:
+            self._indices[position] = last
+            self._positions[last] = position
+        self._positions[index] = -1
+        self._mask &= ~(1 << index)
+
+    def choice(self, rng=random) -> tuple[str, int]:
+        """
+        Chooses a random field from the set
+        :param rng: source of randomness with a choice() method, the random
+        module by default
+        :return: coordinates of the chosen field
+        """
+        return INDEX_TO_FIELD[rng.choice(self._indices)]
+
+    def indices(self) -> List[int]:
+        return self._indices
+
+    def mask(self) -> int:
+        return self._mask
 
 
 class Board:
@@ -103,6 +280,8 @@ class Board:
     Class being an array of fields, representing a 10x10 board
     """
 
+    __slots__ = ('_fields',)
+
     def __init__(self):
         """
         Creates a 10x10 array with empty fields, which status can be set with
@@ -201,22 +380,280 @@ class Board:
         self._fields[c_y][c_x].set_status(status)
 
 
+class BitBoard:
+    """
+    Alternative implementation of the Board, which instead of an array of
+    Fields stores every FieldStatus as a 100-bit integer mask, with a bit set
+    for every field with that status. It has the same interface as the Board,
+    but operations on whole ships and boards are single integer operations
+    """
+
+    __slots__ = ('_masks', '_layers')
+
+    def __init__(self):
+        """
+        Creates a board with all fields empty. Masks are kept in a list in the
+        order of LAYER_STATUSES, and the number of the mask every field is in
+        is kept in a list indexed by field indices, so that reading a field
+        takes a single lookup and changing it touches at most two masks. The
+        mask of empty fields isn't stored, it stays 0 in the list and is found
+        from the other masks when needed, so that discovering a field only
+        changes a single mask
+        """
+        self._masks = [0, 0, 0, 0, 0]
+        self._layers = [0] * 100
+
+    def __str__(self):
+        """
+        Prints out the contents of this board, the same way the Board does
+        """
+        return str(self.to_board())
+
+    def _set_mask_status(self, mask: int, status: FieldStatus):
+        """
+        Sets the status of all fields in the mask
+        :param mask: mask of the fields to change
+        :type mask: int
+        :param status: new status of the fields
+        :type status: FieldStatus
+        """
+        layer = STATUS_LAYERS[status]
+        masks = self._masks
+        layers = self._layers
+        for index in mask_indices(mask):
+            if layers[index]:
+                masks[layers[index]] &= ~FIELD_BITS[index]
+            layers[index] = layer
+        if layer:
+            masks[layer] |= mask
+
+    def _set_masks(self, masks: List[int]):
+        """
+        Replaces all masks of the board and finds the layer of every field
+        from them. A field set in more than one mask other than the mask of
+        empty fields is put in the first of them
+        :param masks: masks of all statuses other than FieldStatus.NOTHING, in
+        the order of LAYER_STATUSES
+        :type masks: list
+        """
+        cleaned = []
+        occupied = 0
+        for mask in masks:
+            mask &= ~occupied
+            cleaned.append(mask)
+            occupied |= mask
+        self._masks = [0] + cleaned
+        self._layers = [0] * 100
+        for layer, mask in enumerate(cleaned, 1):
+            for index in mask_indices(mask):
+                self._layers[index] = layer
+
+    def clear_board(self):
+        """
+        Sets states of all fields in the board to FieldStatus.NOTHING
+        """
+        self._masks = [0, 0, 0, 0, 0]
+        self._layers = [0] * 100
+
+    def place_ship(self, ship: "fleet.Ship"):
+        """
+        Places a ship on the board by marking all fields it occupies with a
+        status of FieldStatus.SHIP
+        :param ship: Ship to be placed
+        :type ship: Ship
+        """
+        self._set_mask_status(ship_mask(ship), FieldStatus.SHIP)
+
+    def place_fleet(self, fleet_to_place: "fleet.Fleet"):
+        """
+        Places ships defined in ships on the board
+        :param fleet_to_place: a Fleet containing player's ships
+        :type fleet_to_place: Fleet
+        """
+        self.clear_board()
+        for ship in fleet_to_place.ships():
+            self.place_ship(ship)
+
+    def mark_sunken_ship(self, ship_to_sink: "fleet.Ship"):
+        """
+        Marks a given ship as a sunken ship on the board
+        :param ship_to_sink: Ship to be marked as sunken
+        :type ship_to_sink: Ship
+        """
+        self._set_mask_status(ship_mask(ship_to_sink), FieldStatus.SUNK)
+
+    def get_field_status(self, x: str, y: int) -> FieldStatus:
+        """
+        Returns the status of a field on the specified coordinates
+        :param x: x coordinate of a field
+        :type x: str
+        :param y: y coordinate of a field
+        :type y: int
+        :return: status of the specified field
+        """
+        try:
+            index = COLUMN_FIELD_INDICES[x][y]
+        except KeyError:
+            index = field_index(x, y)
+        return LAYER_STATUSES[self._layers[index]]
+
+    def set_field_status(self, x: str, y: int, status: FieldStatus):
+        """
+        Sets the status of a field on the specified coordinates
+        :param x: x coordinate of a field
+        :type x: str
+        :param y: y coordinate of a field
+        :type y: int
+        :param status: new status of a field
+        :type status: FieldStatus
+        """
+        try:
+            index = COLUMN_FIELD_INDICES[x][y]
+        except KeyError:
+            index = field_index(x, y)
+        layer = STATUS_LAYERS[status]
+        layers = self._layers
+        old_layer = layers[index]
+        if old_layer != layer:
+            layers[index] = layer
+            # the bit is set only in the old mask, so it can be moved with
+            # integer subtraction and addition, which are a bit faster
+            if old_layer:
+                self._masks[old_layer] -= FIELD_BITS[index]
+            if layer:
+                self._masks[layer] += FIELD_BITS[index]
+
+    def mask(self, status: FieldStatus) -> int:
+        """
+        Returns the mask of all fields with the specified status
+        :param status: status of the fields
+        :type status: FieldStatus
+        :return: an integer with bits of all fields with that status set
+        """
+        layer = STATUS_LAYERS[status]
+        if layer:
+            return self._masks[layer]
+        masks = self._masks
+        return FULL_BOARD_MASK & ~(masks[1] | masks[2] | masks[3] | masks[4])
+
+    def copy(self) -> "BitBoard":
+        """
+        Creates a copy of this board
+        :return: a new BitBoard with the same fields
+        """
+        new_board = BitBoard()
+        new_board._masks = list(self._masks)
+        new_board._layers = list(self._layers)
+        return new_board
+
+    def overlay(self, other: "BitBoard") -> "BitBoard":
+        """
+        Creates a new board with fields of this board, where all fields empty
+        on this board are taken from the other board
+        :param other: board to take the fields empty on this board from
+        :type other: BitBoard
+        :return: a new BitBoard with both boards merged
+        """
+        empty = self.mask(FieldStatus.NOTHING)
+        merged = BitBoard()
+        merged._set_masks([mask | (other_mask & empty) for mask, other_mask
+                           in zip(self._masks[1:], other._masks[1:])])
+        return merged
+
+    def to_board(self) -> Board:
+        """
+        Converts this board to a Board made of Fields
+        :return: a Board with the same fields
+        """
+        converted = Board()
+        for index, layer in enumerate(self._layers):
+            converted._fields[index // 10][index % 10].set_status(
+                LAYER_STATUSES[layer])
+        return converted
+
+    def snapshot(self) -> bytes:
+        """
+        Encodes the board as the masks of all statuses other than
+        FieldStatus.NOTHING
+        :return: MASK_BYTES bytes for every mask, in little endian order
+        """
+        return b''.join(mask.to_bytes(MASK_BYTES, 'little')
+                        for mask in self._masks[1:])
+
+    def restore(self, data: bytes):
+        """
+        Sets all fields of the board to the ones encoded with snapshot()
+        :param data: the encoded board
+        :type data: bytes
+        :raises ValueError: if the data doesn't encode a board
+        """
+        if len(data) != (len(LAYER_STATUSES) - 1) * MASK_BYTES:
+            raise ValueError("invalid board snapshot")
+        self._set_masks([
+            int.from_bytes(data[start:start + MASK_BYTES], 'little') &
+            FULL_BOARD_MASK
+            for start in range(0, len(data), MASK_BYTES)
+        ])
+
+
+def as_bit_board(board_to_convert) -> BitBoard:
+    """
+    Creates a BitBoard with the same fields as the given board
+    :param board_to_convert: a Board or a BitBoard
+    :return: a new BitBoard
+    """
+    if isinstance(board_to_convert, BitBoard):
+        return board_to_convert.copy()
+    masks = [0] * (len(LAYER_STATUSES) - 1)
+    for x, y in ALL_FIELDS:
+        status = board_to_convert.get_field_status(x, y)
+        if status is not FieldStatus.NOTHING:
+            masks[STATUS_LAYERS[status] - 1] |= FIELD_BITS[FIELD_INDICES[x, y]]
+    converted = BitBoard()
+    converted._set_masks(masks)
+    return converted
+
+
 class GameBoard:
     """
     Board used in game, consists of two Boards, one of them being the data
     board, visible for the player, and one of them being the visible board,
-    seen by the enemy, based on the data board.
+    seen by the enemy, based on the data board. What the player sees, the
+    data board with the visible board under it, is kept up to date in a
+    separate display board as fields change, together with a list of the
+    changed fields. The display board is only updated by the GameBoard's
+    methods, so once the data board is given to a GameBoard, it may only be
+    changed through them
     """
 
+    __slots__ = (
+        '_data_board', '_visible_board', '_display_board', '_changed_fields'
+    )
+
     def __init__(self, data_board: Board):
         """
         Creates a GameBoard, by taking a data board and creating a visible
-        board for it
+        board and a display board for it
         :param data_board: raw board with all positions of the ships etc.
         :type data_board: Board
         """
         self._data_board = data_board
-        self._visible_board = Board()
+        self._visible_board = type(data_board)()
+        self._display_board = as_bit_board(data_board)
+        self._changed_fields = {}
+
+    def _update_display(self, fields):
+        """
+        Updates the display board on the given fields after their status has
+        changed on the data board or the visible board
+        :param fields: coordinates of the changed fields
+        """
+        for x, y in fields:
+            status = self._data_board.get_field_status(x, y)
+            if status == FieldStatus.NOTHING:
+                status = self._visible_board.get_field_status(x, y)
+            self._display_board.set_field_status(x, y, status)
+            self._changed_fields[field_index(x, y)] = None
 
     def discover_field(self, x: str, y: int) -> bool:
         """
@@ -234,11 +671,15 @@ class GameBoard:
             field_status = FieldStatus.MISS
             self._data_board.set_field_status(x, y, field_status)
         self._visible_board.set_field_status(x, y, field_status)
-        if field_status == FieldStatus.SHIP:
+        hit = field_status == FieldStatus.SHIP
+        if hit:
             field_status = FieldStatus.SUNK
             self._data_board.set_field_status(x, y, field_status)
-            return True
-        return False
+        # the field isn't empty on the data board anymore, so it's shown the
+        # same as on the data board
+        self._display_board.set_field_status(x, y, field_status)
+        self._changed_fields[field_index(x, y)] = None
+        return hit
 
     def mark_as_empty(self, x: str, y: int) -> bool:
         """
@@ -256,6 +697,11 @@ class GameBoard:
         if current_status != FieldStatus.NOTHING:
             return False
         self._visible_board.set_field_status(x, y, FieldStatus.MISS)
+        # the marker is only shown to the player on fields empty on the data
+        # board, which until now were shown as empty
+        if self._display_board.get_field_status(x, y) == FieldStatus.NOTHING:
+            self._display_board.set_field_status(x, y, FieldStatus.MISS)
+        self._changed_fields[field_index(x, y)] = None
         return True
 
     def unmark_as_empty(self, x: str, y: int) -> bool:
@@ -272,6 +718,9 @@ class GameBoard:
         if current_status != FieldStatus.MISS:
             return False
         self._visible_board.set_field_status(x, y, FieldStatus.NOTHING)
+        if self._data_board.get_field_status(x, y) == FieldStatus.NOTHING:
+            self._display_board.set_field_status(x, y, FieldStatus.NOTHING)
+        self._changed_fields[field_index(x, y)] = None
         return True
 
     def sink_ship(self, ship_to_sink: "fleet.Ship"):
@@ -282,26 +731,62 @@ class GameBoard:
         """
         self._data_board.mark_sunken_ship(ship_to_sink)
         self._visible_board.mark_sunken_ship(ship_to_sink)
+        self._display_board.mark_sunken_ship(ship_to_sink)
+        for field in ship_to_sink.get_segment_coordinates():
+            self._changed_fields[field_index(*field)] = None
 
-    def get_display_board(self, display_as_enemy: bool = False) -> Board:
+    def get_display_board(self, display_as_enemy: bool = False) -> \
+            Union[Board, BitBoard]:
         """
         Creates a data board representing what the specified player would see
         :param display_as_enemy: if set to True, the data will reflect what the
         enemy would see, otherwise it'll look like what the player should see
         :type display_as_enemy: bool
-        :return: a Board containing data necessary to draw this board on the
-        screen
+        :return: a board containing data necessary to draw this board on the
+        screen. The player's view is a BitBoard copy of the display board
+        which won't change after later moves, and the enemy's view is the
+        visible board itself, of the same type as the data board
         """
         if display_as_enemy:
             return self._visible_board
-        else:
-            display_board = Board()
-            for x, y in return_all_field_coordinates():
-                status = self._data_board.get_field_status(x, y)
-                if status == FieldStatus.NOTHING:
-                    status = self._visible_board.get_field_status(x, y)
-                display_board.set_field_status(x, y, status)
-            return display_board
+        return self._display_board.copy()
+
+    def changed_fields(self) -> List[tuple]:
+        """
+        Returns coordinates of the fields which status might have changed on
+        any of the displayed boards since the last call, so only those fields
+        have to be redrawn
+        :return: a list of field coordinates, each appearing once, in the
+        order of the first change
+        """
+        changed = [INDEX_TO_FIELD[index] for index in self._changed_fields]
+        self._changed_fields = {}
+        return changed
+
+    def snapshot(self) -> bytes:
+        """
+        Encodes the data board and the visible board, the display board can be
+        recreated from them
+        :return: the encoded boards
+        """
+        return as_bit_board(self._data_board).snapshot() + \
+            as_bit_board(self._visible_board).snapshot()
+
+    def restore(self, data: bytes):
+        """
+        Replaces the boards with the ones encoded with snapshot(). The restored
+        boards are always BitBoards
+        :param data: the encoded boards
+        :type data: bytes
+        :raises ValueError: if the data doesn't encode two boards
+        """
+        half = len(data) // 2
+        self._data_board = BitBoard()
+        self._data_board.restore(data[:half])
+        self._visible_board = BitBoard()
+        self._visible_board.restore(data[half:])
+        self._display_board = self._data_board.overlay(self._visible_board)
+        self._changed_fields = {}
 
     def field_undiscovered(self, x: str, y: int) -> bool:
         """
@@ -317,4 +802,5 @@ class GameBoard:
 
     def mark_misses_around(self, ship_to_mark_around: "fleet.Ship"):
         fleet.mark_misses_around(ship_to_mark_around, self._visible_board)
+        self._update_display(fleet.fields_around_ship(ship_to_mark_around))
         self.sink_ship(ship_to_mark_around)
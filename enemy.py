@@ -1,7 +1,49 @@
-from copy import deepcopy
-from random import choice, shuffle
+import random
+import time
+from bisect import bisect_right
+from collections import Counter, deque
+from enum import Enum
+from functools import lru_cache
+from itertools import accumulate
+from typing import List, NamedTuple, Optional
 
 import board
+import fleet
+
+
+class EnemyMode(Enum):
+    EASY = 0,  # shoots at random fields
+    HARD = 1,  # shoots where the longest ship can fit
+    DENSITY = 2,  # shoots where the most placements of remaining ships fit
+    MONTE_CARLO = 3  # shoots where sampled fleets most often have a ship
+
+
+# numbers and positions of the set bits of every byte, used to count and
+# choose placements in the sets of placements of the PosteriorSampler
+BYTE_COUNTS = bytes(bin(byte).count('1') for byte in range(256))
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1)
+                  for byte in range(256))
+
+
+class MoveTime(NamedTuple):
+    """
+    Time taken by a single move of the enemy. budget_ms is the time limit of
+    the move, None if it wasn't limited
+    """
+    elapsed_ms: float
+    budget_ms: Optional[float]
+
+
+class SamplingStats(NamedTuple):
+    """
+    Numbers of layouts sampled by the PosteriorSampler for a single heatmap,
+    and of the ones which reached a ship with no free placement left and have
+    no weight. fallback is True if no layout could be completed and the
+    heatmap counts the consistent placements instead
+    """
+    layouts: int
+    dead_ends: int
+    fallback: bool
 
 
 def create_list_of_adherent(source: tuple[str, int]) -> list:
@@ -50,102 +92,676 @@ def right_field(coords: tuple[str, int]) -> tuple[str, int]:
     return chr(ord(x) + 1), y
 
 
+@lru_cache(maxsize=None)
+def _density_placements() -> tuple[list, list]:
+    """
+    Creates a list of all distinct ship placements from the placement table,
+    and a list of placements covering every field, used by the DensityMap
+    :return: a tuple of a list of (size, field indices) tuples, one for every
+    placement, and a list containing lists of numbers of placements covering
+    every field, indexed with field indices
+    """
+    placements = []
+    by_field = [[] for _ in range(100)]
+    for size in sorted(set(fleet.SHIP_SIZES), reverse=True):
+        masks = []
+        for vertical in (True, False):
+            for _, mask, _ in fleet.placement_table()[(size, vertical)]:
+                if mask not in masks:
+                    masks.append(mask)
+        for mask in masks:
+            fields = tuple(board.mask_indices(mask))
+            for index in fields:
+                by_field[index].append(len(placements))
+            placements.append((size, fields))
+    return placements, by_field
+
+
+@lru_cache(maxsize=None)
+def _initial_density() -> tuple[tuple, dict]:
+    """
+    Computes the density of every field on an empty board with the whole
+    fleet afloat, used to initialize every DensityMap
+    :return: a tuple of densities of all fields, indexed with field indices,
+    and a dictionary with numbers of placements of ships of every size
+    """
+    placements, _ = _density_placements()
+    remaining = Counter(fleet.SHIP_SIZES)
+    possible = {size: [] for size in remaining}
+    density = [0] * 100
+    for number, (size, fields) in enumerate(placements):
+        possible[size].append(number)
+        for index in fields:
+            density[index] += remaining[size]
+    return tuple(density), possible
+
+
+class DensityMap:
+    """
+    Keeps track of how many ways the ships that are still afloat can be placed
+    on every field that can still contain a ship. The map is updated every
+    time a field gets discovered or a ship sinks, by subtracting only the
+    placements that stopped being possible
+    """
+
+    __slots__ = (
+        '_placements', '_placements_by_field', '_remaining', '_density',
+        '_possible'
+    )
+
+    def __init__(self):
+        """
+        Creates a density map of an empty board with the whole fleet afloat
+        """
+        self._placements, self._placements_by_field = _density_placements()
+        self._remaining = Counter(fleet.SHIP_SIZES)
+        density, possible = _initial_density()
+        self._density = list(density)
+        self._possible = {size: set(numbers)
+                          for size, numbers in possible.items()}
+
+    def remove_field(self, field: tuple[str, int]):
+        """
+        Removes all placements covering the field from the map, called when
+        the field can't contain a ship that is still afloat anymore
+        :param field: coordinates of the field
+        :type field: tuple
+        """
+        for number in self._placements_by_field[board.FIELD_INDICES[field]]:
+            size, fields = self._placements[number]
+            possible = self._possible[size]
+            if number in possible:
+                possible.remove(number)
+                weight = self._remaining[size]
+                for index in fields:
+                    self._density[index] -= weight
+
+    def remove_ship(self, size: int):
+        """
+        Removes placements of one ship of the given size from the map, called
+        when a ship sinks
+        :param size: size of the sunken ship
+        :type size: int
+        """
+        if not self._remaining[size]:
+            return
+        self._remaining[size] -= 1
+        for number in self._possible[size]:
+            for index in self._placements[number][1]:
+                self._density[index] -= 1
+
+    def remaining(self) -> Counter:
+        """
+        Returns the number of ships of every size that are still afloat
+        """
+        return self._remaining
+
+    def density(self, field: tuple[str, int]) -> int:
+        """
+        Returns the number of placements of remaining ships covering the field
+        :param field: coordinates of the field
+        :type field: tuple
+        :return: density of the field
+        """
+        return self._density[board.FIELD_INDICES[field]]
+
+    def densest_fields(self, fields) -> list:
+        """
+        Chooses the fields with the highest density from the given ones
+        :param fields: coordinates of fields to choose from
+        :return: a list of coordinates of the fields with the highest density
+        """
+        best_fields = []
+        max_density = -1
+        for field in fields:
+            field_density = self._density[board.FIELD_INDICES[field]]
+            if field_density > max_density:
+                max_density = field_density
+                best_fields = [field]
+            elif field_density == max_density:
+                best_fields.append(field)
+        return best_fields
+
+
+class SamplerPlacements(NamedTuple):
+    """
+    Table of all distinct placements of ships of every size, used by the
+    PosteriorSampler. Placements of all sizes are numbered together, from the
+    biggest ships, and vertical ones before horizontal ones, and a set of them
+    is kept as an integer with the bits of their numbers set. masks and sizes
+    list the masks and the sizes of the placements by their numbers. ranges
+    holds the lowest number and a mask as wide as the number of placements of
+    every size, to get a set of placements of one size by shifting. rotations
+    lists, for every placement, the range of the placements of its size and
+    rotation, and the probability of Fleet.create_random() choosing that
+    rotation - ships of size 1 look the same in both rotations, so for them
+    it's the range of their size, always chosen. compatible lists the sets of
+    placements which don't touch every placement
+    """
+    masks: List[int]
+    sizes: List[int]
+    ranges: dict
+    rotations: List[tuple]
+    compatible: List[int]
+
+
+@lru_cache(maxsize=None)
+def _sampler_placements() -> SamplerPlacements:
+    """
+    Lists all distinct placements of ships of every size from the placement
+    table. The table is created once, on the first call
+    :return: the table of the placements
+    """
+    table = fleet.placement_table()
+    masks, sizes, exclusions, rotations = [], [], [], []
+    ranges = {}
+    for size in sorted(set(fleet.SHIP_SIZES), reverse=True):
+        size_offset = len(masks)
+        listed = set()
+        size_rotations = []
+        for vertical in (True, False):
+            offset = len(masks)
+            for _, mask, exclusion in table[(size, vertical)]:
+                if mask not in listed:
+                    listed.add(mask)
+                    masks.append(mask)
+                    sizes.append(size)
+                    exclusions.append(exclusion)
+            size_rotations.append((offset, len(masks) - offset))
+        count = len(masks) - size_offset
+        ranges[size] = (size_offset, (1 << count) - 1)
+        if not size_rotations[1][1]:
+            # the horizontal placements are the vertical ones
+            rotations += [(size_offset, (1 << count) - 1, 1.0)] * count
+        else:
+            for offset, count in size_rotations:
+                rotations += [(offset, (1 << count) - 1, 0.5)] * count
+    compatible = [sum(1 << other for other, mask in enumerate(masks)
+                      if not mask & exclusion)
+                  for exclusion in exclusions]
+    return SamplerPlacements(masks, sizes, ranges, rotations, compatible)
+
+
+def _choose_placement(placements: int, rng) -> tuple[int, int]:
+    """
+    Chooses a random placement from a set of placements of the
+    PosteriorSampler, with all of them equally likely
+    :param placements: set of placements, with the bits of their numbers set,
+    at least one of them has to be set
+    :type placements: int
+    :param rng: source of randomness
+    :return: a tuple with the number of the chosen placement and the number
+    of placements in the set
+    """
+    data = placements.to_bytes((placements.bit_length() + 7) // 8, 'little')
+    counts = list(accumulate(data.translate(BYTE_COUNTS)))
+    count = counts[-1]
+    position = int(rng.random() * count)
+    byte = bisect_right(counts, position)
+    if byte:
+        position -= counts[byte - 1]
+    return byte * 8 + BYTE_BITS[data[byte]][position], count
+
+
+class PosteriorSampler:
+    """
+    Estimates how likely every field is to contain a ship that is still
+    afloat, given what the enemy knows about the board, by sampling layouts
+    of the remaining ships consistent with it and adding up their weights on
+    every field. Sampling is sequential and rejection-free: ships are placed
+    one by one from the biggest, in the same order as Fleet.create_random()
+    places them, and each one is drawn directly from the set of its free
+    placements, which don't cover known empty fields and don't touch the
+    ships placed before it, following the same rules as
+    fleet.field_available() and fleet.mark_misses_around(). The set is
+    updated after every ship with a precomputed set of placements which don't
+    touch it. While a ship is being shot at, a placement covering all of its
+    hit fields is drawn first and put in the place of one of the remaining
+    ships of its size, and the other ships are drawn only from placements
+    which don't touch it.
+
+    Every layout is weighted by the probability of create_random() choosing
+    its ships, which chooses a rotation and then a placement among all free
+    placements with that rotation, divided by the probability of the sampler
+    choosing them, so the heatmap follows the layouts create_random()
+    generates. Sunken ships are only known as empty fields, so layouts are
+    weighted as if the remaining ships were the whole fleet. A layout in
+    which a ship has no free placement left has no weight and isn't drawn
+    again, it's only counted as a dead end in stats(). If no layout could be
+    completed, the heatmap counts the consistent placements on every field
+    instead, as in the density mode.
+
+    Sampling stops after max_samples layouts, or once the time budget runs
+    out. With a time budget, the number of layouts depends on the speed of
+    the machine, so the results aren't reproducible even with a seeded
+    source of randomness
+    """
+
+    __slots__ = ('_remaining', '_time_budget_ms', '_max_samples', '_stats')
+
+    def __init__(self, time_budget_ms: float = None,
+                 max_samples: int = 2000):
+        """
+        Creates a sampler with the whole fleet afloat
+        :param time_budget_ms: maximum time of sampling for a single move in
+        milliseconds, if None only the number of samples is limited, which
+        makes the results depend only on the source of randomness
+        :type time_budget_ms: float
+        :param max_samples: maximum number of samples for a single move
+        :type max_samples: int
+        """
+        self._remaining = Counter(fleet.SHIP_SIZES)
+        self._time_budget_ms = time_budget_ms
+        self._max_samples = max_samples
+        self._stats = SamplingStats(0, 0, False)
+
+    def remove_ship(self, size: int):
+        """
+        Removes a ship of the given size from the remaining ships, called when
+        a ship sinks
+        :param size: size of the sunken ship
+        :type size: int
+        """
+        if self._remaining[size]:
+            self._remaining[size] -= 1
+
+    def remaining(self) -> Counter:
+        """
+        Returns the number of ships of every size that are still afloat
+        """
+        return self._remaining
+
+    def stats(self) -> SamplingStats:
+        """
+        Returns the numbers of layouts sampled by the last call of heatmap()
+        """
+        return self._stats
+
+    def _sample(self, candidates: int, targets: list, sizes: list,
+                rng) -> tuple[float, list]:
+        """
+        Samples a single layout of the remaining ships
+        :param candidates: set of placements which don't cover known empty
+        fields
+        :type candidates: int
+        :param targets: numbers of the placements of the ship which covers all
+        hit fields, empty if no ship is being shot at
+        :type targets: list
+        :param sizes: sizes of the ships to place, from the biggest one
+        :type sizes: list
+        :param rng: source of randomness
+        :return: a tuple with the weight of the layout and a list of numbers
+        of the placed ships, the weight is 0 if the layout couldn't be
+        completed
+        """
+        table = _sampler_placements()
+        ranges, rotations, compatible = (table.ranges, table.rotations,
+                                         table.compatible)
+        free = candidates
+        # placements create_random() would choose from
+        possible = (1 << len(table.masks)) - 1
+        weight = 1.0
+        target = None
+        target_position = -1
+        if targets:
+            target = rng.choice(targets)
+            positions = [position for position, size in enumerate(sizes)
+                         if size == table.sizes[target]]
+            target_position = rng.choice(positions)
+            weight = float(len(targets) * len(positions))
+            free &= compatible[target]
+        placed = []
+        for position, size in enumerate(sizes):
+            if position == target_position:
+                number = target
+            else:
+                offset, width = ranges[size]
+                placements = free >> offset & width
+                if not placements:
+                    return 0.0, placed
+                number, count = _choose_placement(placements, rng)
+                number += offset
+                weight *= count
+            offset, width, probability = rotations[number]
+            weight *= probability / bin(possible >> offset &
+                                        width).count('1')
+            placed.append(number)
+            free &= compatible[number]
+            possible &= compatible[number]
+        return weight, placed
+
+    def heatmap(self, unknown: int, hits: int, rng=random,
+                deadline: float = None) -> list:
+        """
+        Samples layouts of the remaining ships and adds up their weights on
+        every field occupied by a ship
+        :param unknown: mask of fields that the enemy knows nothing about
+        :type unknown: int
+        :param hits: mask of the hit fields of the ship which hasn't sunk yet
+        :type hits: int
+        :param rng: source of randomness, a random.Random instance or the
+        random module
+        :param deadline: time.perf_counter() value after which sampling stops
+        even if the sampler's own time budget hasn't run out, at least one
+        layout is always sampled
+        :type deadline: float
+        :return: a list of weights of all fields, indexed with field indices,
+        all of them are 0 if no placement is consistent with the board
+        """
+        heat = [0.0] * 100
+        self._stats = SamplingStats(0, 0, False)
+        sizes = sorted(self._remaining.elements(), reverse=True)
+        if not sizes:
+            return heat
+        table = _sampler_placements()
+        forbidden = ~(unknown | hits)
+        candidates = 0
+        for number, mask in enumerate(table.masks):
+            if self._remaining[table.sizes[number]] and not mask & forbidden:
+                candidates |= 1 << number
+        targets = []
+        if hits:
+            targets = [number for number, mask in enumerate(table.masks)
+                       if candidates >> number & 1 and mask & hits == hits]
+            if not targets:
+                return heat
+        if self._time_budget_ms is not None:
+            budget_deadline = time.perf_counter() + self._time_budget_ms / 1000
+            if deadline is None or budget_deadline < deadline:
+                deadline = budget_deadline
+        weights = {}
+        layouts = 0
+        dead_ends = 0
+        for _ in range(self._max_samples):
+            weight, placed = self._sample(candidates, targets, sizes, rng)
+            layouts += 1
+            if weight:
+                for number in placed:
+                    weights[number] = weights.get(number, 0.0) + weight
+            else:
+                dead_ends += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        fallback = not weights
+        if fallback:
+            # every layout reached a dead end, so every consistent placement
+            # counts once, only the hit ship's ones while it's being shot at
+            weights = dict.fromkeys(
+                targets or board.mask_indices(candidates), 1.0)
+        self._stats = SamplingStats(layouts, dead_ends, fallback)
+        for number, weight in weights.items():
+            for index in board.mask_indices(table.masks[number]):
+                heat[index] += weight
+        return heat
+
+
 class Enemy:
     """
     Class representing the computer opponent
     """
 
-    def __init__(self, hard_mode: bool = False):
+    __slots__ = (
+        '_undiscovered', '_to_shoot', '_to_mark_as_empty', '_last_target',
+        '_mode', '_hard_mode', '_density_map', '_target_hits', '_rng',
+        '_sampler', '_hit_mask', '_time_budget_ms', '_max_samples',
+        '_move_times', '_sampling_stats'
+    )
+
+    def __init__(self, hard_mode: bool = False, mode: EnemyMode = None,
+                 rng=random, time_budget_ms: float = None,
+                 max_samples: int = 2000):
         """
-        Creates an Enemy class, initializing 3 lists - a list of undiscovered
-        fields which Enemy will shoot randomly at, a list of to_shoot fields,
-        which have higher priority than random targets and are set once a ship
-        is hit, and to_mark_as_empty list, which gets populated by fields to
-        mark as empty once a ship is hit
+        Creates an Enemy class, initializing 3 collections - a set of
+        undiscovered fields which Enemy will shoot randomly at, a queue of
+        to_shoot fields, which have higher priority than random targets and
+        are set once a ship is hit, and to_mark_as_empty list, which gets
+        populated by fields to mark as empty once a ship is hit
+        :param hard_mode: if set to True, the enemy shoots where the longest
+        ship can fit instead of shooting randomly
+        :type hard_mode: bool
+        :param mode: the way of choosing targets, overrides hard_mode if set
+        :type mode: EnemyMode
+        :param rng: source of randomness, a random.Random instance or the
+        random module
+        :param time_budget_ms: time limit of a single move in milliseconds,
+        used when shoot() isn't given one, not limited if None. In the Monte
+        Carlo mode, the number of layouts sampled within the limit depends on
+        the speed of the machine, so moves of an enemy with a seeded rng are
+        only reproducible without a time limit
+        :type time_budget_ms: float
+        :param max_samples: maximum number of layouts sampled for a single
+        move in the Monte Carlo mode
+        :type max_samples: int
         """
-        self._undiscovered = []
-        self._to_shoot = []
+        self._undiscovered = board.FieldSet(board.ALL_FIELDS)
+        self._to_shoot = deque()
         self._to_mark_as_empty = []
-        for x, y in board.return_all_field_coordinates():
-            self._undiscovered.append((x, y))
         self._last_target = None
-        self._hard_mode = hard_mode
+        if mode is None:
+            mode = EnemyMode.HARD if hard_mode else EnemyMode.EASY
+        self._mode = mode
+        self._hard_mode = mode != EnemyMode.EASY
+        self._density_map = None
+        if mode == EnemyMode.DENSITY:
+            self._density_map = DensityMap()
+        self._time_budget_ms = time_budget_ms
+        self._max_samples = max_samples
+        self._sampler = None
+        if mode == EnemyMode.MONTE_CARLO:
+            self._sampler = PosteriorSampler(max_samples=max_samples)
+        self._hit_mask = 0
+        self._move_times = []
+        self._sampling_stats = []
+        self._target_hits = 0
+        self._rng = rng
+
+    def _discover(self, field: tuple[str, int]):
+        """
+        Removes a field from the undiscovered fields
+        :param field: coordinates of the field
+        :type field: tuple
+        """
+        self._undiscovered.remove(field)
+        if self._density_map is not None:
+            self._density_map.remove_field(field)
 
-    def shoot(self) -> tuple[str, int]:
+    def shoot(self, deadline_ms: float = None) -> tuple[str, int]:
         """
-        Chooses a field that will be shot at
+        Chooses a field that will be shot at. Once the time limit runs out,
+        the Monte Carlo mode stops sampling and the hard mode stops ranking
+        fields, and the best field found so far is chosen. The other modes
+        take a short constant time. The time taken by the move is recorded in
+        move_times()
+        :param deadline_ms: time limit of the move in milliseconds, counted
+        from the call, the enemy's time budget is used if it's None
+        :type deadline_ms: float
         :return: a tuple with field coordinates
         """
-        while self._to_shoot:
-            chosen = self._to_shoot[0]
-            self._to_shoot.remove(chosen)
+        start = time.perf_counter()
+        budget_ms = self._time_budget_ms if deadline_ms is None \
+            else deadline_ms
+        deadline = None
+        if budget_ms is not None:
+            deadline = start + budget_ms / 1000
+        chosen = self._choose_target(deadline)
+        self._move_times.append(
+            MoveTime((time.perf_counter() - start) * 1000, budget_ms))
+        return chosen
+
+    def _choose_target(self, deadline: float = None) -> tuple[str, int]:
+        """
+        Chooses a field that will be shot at and discovers it
+        :param deadline: time.perf_counter() value at which the search for
+        the best field stops, not limited if None
+        :type deadline: float
+        :return: a tuple with field coordinates
+        """
+        while self._to_shoot and self._sampler is None:
+            chosen = self._to_shoot.popleft()
             if chosen in self._undiscovered:
-                self._undiscovered.remove(chosen)
+                self._discover(chosen)
                 self._last_target = chosen
                 return chosen
-        if self._hard_mode:
-            chosen = self._rank_fields_and_choose()
+        if self._mode == EnemyMode.DENSITY:
+            chosen = self._rng.choice(
+                self._density_map.densest_fields(self._undiscovered))
+        elif self._mode == EnemyMode.MONTE_CARLO:
+            chosen = self._sample_and_choose(deadline)
+        elif self._hard_mode:
+            chosen = self._rank_fields_and_choose(deadline)
         else:
-            chosen = choice(self._undiscovered)
-        self._undiscovered.remove(chosen)
+            chosen = self._undiscovered.choice(self._rng)
+        self._discover(chosen)
         self._last_target = chosen
         return chosen
 
-    def _rank_fields_and_choose(self) -> tuple[str, int]:
+    def _sample_and_choose(self, deadline: float = None) -> tuple[str, int]:
+        """
+        Chooses the field which most often contains a ship in the layouts
+        sampled by the PosteriorSampler. While a ship is being shot at, only
+        the fields next to its hit segments are considered. The heatmap is
+        only empty if the board doesn't fit the remaining ships, then all
+        considered fields are equally good. The numbers of sampled layouts are
+        recorded in sampling_stats()
+        :param deadline: time.perf_counter() value at which sampling stops
+        :type deadline: float
+        :return: a tuple with field coordinates
+        """
+        candidates = [field for field in self._to_shoot
+                      if field in self._undiscovered]
+        if not candidates:
+            candidates = list(self._undiscovered)
+        heat = self._sampler.heatmap(self._undiscovered.mask(),
+                                     self._hit_mask, self._rng, deadline)
+        self._sampling_stats.append(self._sampler.stats())
+        best_fields = []
+        max_heat = -1
+        for field in candidates:
+            field_heat = heat[board.FIELD_INDICES[field]]
+            if field_heat > max_heat:
+                max_heat = field_heat
+                best_fields = [field]
+            elif field_heat == max_heat:
+                best_fields.append(field)
+        chosen = self._rng.choice(best_fields)
+        if chosen in self._to_shoot:
+            self._to_shoot.remove(chosen)
+        return chosen
+
+    def shoot_at(self, field: tuple[str, int]) -> tuple[str, int]:
+        """
+        Shoots at the given field instead of choosing one, used to repeat
+        moves recorded in a replay. The fields to shoot are taken off the
+        queue the same way shoot() would take them to choose the field
+        :param field: coordinates of the field
+        :type field: tuple
+        :return: the field's coordinates
+        :raises ValueError: if the field has already been discovered
+        """
+        if self._sampler is None:
+            while self._to_shoot and self._to_shoot[0] not in \
+                    self._undiscovered:
+                self._to_shoot.popleft()
+            if self._to_shoot and self._to_shoot[0] == field:
+                self._to_shoot.popleft()
+        elif field in self._to_shoot:
+            self._to_shoot.remove(field)
+        self._discover(field)
+        self._last_target = field
+        return field
+
+    def _rank_fields_and_choose(self,
+                                deadline: float = None) -> tuple[str, int]:
         """
         Creates a list of fields sorted by the maximum length of a ship that
         can be located there, and then returns coordinates of one with the
         highest score
+        :param deadline: time.perf_counter() value after which the remaining
+        fields aren't ranked, checked every 10 fields. With a deadline, fields
+        are ranked in a random order, so the fields ranked before it are a
+        random sample of the board
+        :type deadline: float
         """
-        rank_list = []
-        for field in self._undiscovered:
+        undiscovered = self._undiscovered.mask()
+        indices = self._undiscovered.indices()
+        if deadline is not None:
+            indices = list(indices)
+            self._rng.shuffle(indices)
+        best_fields = []
+        max_score = 0
+        for position, index in enumerate(indices):
+            if deadline is not None and position % 10 == 9 \
+                    and time.perf_counter() >= deadline:
+                break
+            row = index // 10
             score_vert = 1
+            current = index - 10
+            while current >= 0 and undiscovered >> current & 1:
+                score_vert += 1
+                current -= 10
+            current = index + 10
+            while current < 100 and undiscovered >> current & 1:
+                score_vert += 1
+                current += 10
             score_horiz = 1
-            current = deepcopy(field)
-            current = upper_field(current)
-            while current in self._undiscovered:
-                score_vert = score_vert + 1
-                current = upper_field(current)
-            current = deepcopy(field)
-            current = lower_field(current)
-            while current in self._undiscovered:
-                score_vert = score_vert + 1
-                current = lower_field(current)
-            current = deepcopy(field)
-            current = right_field(current)
-            while current in self._undiscovered:
-                score_horiz = score_horiz + 1
-                current = right_field(current)
-            current = deepcopy(field)
-            current = left_field(current)
-            while current in self._undiscovered:
-                score_horiz = score_horiz + 1
-                current = left_field(current)
-            rank_list.append((max(score_vert, score_horiz), field))
-        # awkward sorting because sorted() doesn't want to work
-        best_fields = []
-        max_score = max(x[0] for x in rank_list)
-        for score, field in rank_list:
-            if score == max_score:
-                best_fields.append(field)
-        return choice(best_fields)
+            current = index + 1
+            while current < row * 10 + 10 and undiscovered >> current & 1:
+                score_horiz += 1
+                current += 1
+            current = index - 1
+            while current >= row * 10 and undiscovered >> current & 1:
+                score_horiz += 1
+                current -= 1
+            score = max(score_vert, score_horiz)
+            if score > max_score:
+                max_score = score
+                best_fields = [index]
+            elif score == max_score:
+                best_fields.append(index)
+        return board.INDEX_TO_FIELD[self._rng.choice(best_fields)]
 
     def react_to_hit(self):
         """
         Appends coordinates of fields that can't have any ships to the
         _to_mark_as_empty list and puts new targets on the _to_shoot list
         """
+        self._target_hits += 1
+        if self._sampler is not None:
+            self._hit_mask |= 1 << board.FIELD_INDICES[self._last_target]
         to_mark_as_empty_list = create_list_of_tangents(self._last_target)
         for target in to_mark_as_empty_list:
             if target in self._undiscovered:
-                self._undiscovered.remove(target)
+                self._discover(target)
                 self._to_mark_as_empty.append(target)
         to_shoot_list = create_list_of_adherent(self._last_target)
-        shuffle(to_shoot_list)
+        self._rng.shuffle(to_shoot_list)
         for target in to_shoot_list:
             if target in self._undiscovered:
                 self._to_shoot.append(target)
 
+    def pending_targets(self) -> list:
+        """
+        Returns the fields to shoot at while finishing off a hit ship, in the
+        order they will be shot at. The order depends on the source of
+        randomness, so it's recorded in replays
+        :return: a list of field coordinates
+        """
+        return list(self._to_shoot)
+
+    def set_pending_targets(self, targets: list):
+        """
+        Puts the fields to shoot at in the given order, used to restore the
+        order recorded in a replay
+        :param targets: the fields returned by pending_targets(), in the
+        recorded order
+        :type targets: list
+        :raises ValueError: if the fields differ from the enemy's fields to
+        shoot at
+        """
+        if Counter(targets) != Counter(self._to_shoot):
+            raise ValueError("targets don't match the enemy's targets")
+        self._to_shoot = deque(targets)
+
     def react_to_sink(self):
         """
         Appends all the remaining unmarked fields around a sunken ship to the
@@ -154,17 +770,142 @@ class Enemy:
         to_mark_as_empty_list = create_list_of_adherent(self._last_target)
         for target in to_mark_as_empty_list:
             if target in self._undiscovered:
-                self._undiscovered.remove(target)
+                self._discover(target)
                 self._to_mark_as_empty.append(target)
         for target in self._to_shoot:
+            # the density map and the sampler don't count fields next to a
+            # sunken ship
+            if (self._density_map is not None or self._sampler is not None) \
+                    and target in self._undiscovered:
+                self._discover(target)
             self._to_mark_as_empty.append(target)
         self._to_shoot.clear()
+        if self._density_map is not None:
+            self._density_map.remove_ship(self._target_hits)
+        if self._sampler is not None:
+            self._sampler.remove_ship(self._target_hits)
+            self._hit_mask = 0
+        self._target_hits = 0
+
+    def snapshot(self) -> bytes:
+        """
+        Encodes the state of the enemy - its mode, the last target, the number
+        of hits on the current target, indices of the undiscovered fields, the
+        fields to shoot and the fields to mark as empty, all in their current
+        order, in the density and Monte Carlo modes, the number of remaining
+        ships of every size, and in the Monte Carlo mode, indices of the hit
+        fields of the ship which hasn't sunk yet. The density map itself is
+        recreated from them
+        :return: the encoded state
+        """
+        last_target = 255
+        if self._last_target is not None:
+            last_target = board.FIELD_INDICES[self._last_target]
+        data = bytearray([list(EnemyMode).index(self._mode), last_target,
+                          self._target_hits])
+        for fields in (self._undiscovered, self._to_shoot,
+                       self._to_mark_as_empty):
+            data.append(len(fields))
+            data += bytes(board.FIELD_INDICES[field] for field in fields)
+        remaining = None
+        if self._density_map is not None:
+            remaining = self._density_map.remaining()
+        elif self._sampler is not None:
+            remaining = self._sampler.remaining()
+        if remaining is not None:
+            data += bytes(remaining[size]
+                          for size in sorted(set(fleet.SHIP_SIZES)))
+        if self._sampler is not None:
+            hits = board.mask_indices(self._hit_mask)
+            data.append(len(hits))
+            data += bytes(hits)
+        return bytes(data)
+
+    def restore(self, data: bytes):
+        """
+        Sets the state of the enemy to the one encoded with snapshot()
+        :param data: the encoded state
+        :type data: bytes
+        :raises ValueError: if the data doesn't encode the enemy's state
+        """
+        try:
+            mode = list(EnemyMode)[data[0]]
+            last_target = None
+            if data[1] != 255:
+                last_target = board.INDEX_TO_FIELD[data[1]]
+            target_hits = data[2]
+            position = 3
+            field_lists = []
+            for _ in range(3):
+                length = data[position]
+                indices = data[position + 1:position + 1 + length]
+                if len(indices) != length:
+                    raise ValueError("invalid enemy snapshot")
+                field_lists.append([board.INDEX_TO_FIELD[index]
+                                    for index in indices])
+                position += 1 + length
+            sizes = sorted(set(fleet.SHIP_SIZES))
+            remaining = b''
+            if mode in (EnemyMode.DENSITY, EnemyMode.MONTE_CARLO):
+                remaining = data[position:position + len(sizes)]
+                position += len(sizes)
+            hits = b''
+            if mode == EnemyMode.MONTE_CARLO:
+                hits = data[position + 1:position + 1 + data[position]]
+                position += 1 + data[position]
+            if len(data) != position or any(index >= 100 for index in hits):
+                raise ValueError("invalid enemy snapshot")
+        except IndexError:
+            raise ValueError("invalid enemy snapshot") from None
+        undiscovered, to_shoot, to_mark_as_empty = field_lists
+        self._mode = mode
+        self._hard_mode = mode != EnemyMode.EASY
+        self._last_target = last_target
+        self._target_hits = target_hits
+        self._undiscovered = board.FieldSet(undiscovered)
+        self._to_shoot = deque(to_shoot)
+        self._to_mark_as_empty = to_mark_as_empty
+        self._density_map = None
+        if mode == EnemyMode.DENSITY:
+            self._density_map = DensityMap()
+            for field in board.ALL_FIELDS:
+                if field not in self._undiscovered:
+                    self._density_map.remove_field(field)
+            initial = Counter(fleet.SHIP_SIZES)
+            for size, count in zip(sizes, remaining):
+                for _ in range(initial[size] - count):
+                    self._density_map.remove_ship(size)
+        self._sampler = None
+        self._hit_mask = 0
+        if mode == EnemyMode.MONTE_CARLO:
+            self._sampler = PosteriorSampler(max_samples=self._max_samples)
+            initial = Counter(fleet.SHIP_SIZES)
+            for size, count in zip(sizes, remaining):
+                for _ in range(initial[size] - count):
+                    self._sampler.remove_ship(size)
+            for index in hits:
+                self._hit_mask |= 1 << index
+
+    def move_times(self) -> List[MoveTime]:
+        """
+        Returns the times taken by all moves chosen with shoot(), in order
+        :return: a list of MoveTimes
+        """
+        return self._move_times
+
+    def sampling_stats(self) -> List[SamplingStats]:
+        """
+        Returns the numbers of layouts sampled for all moves chosen in the
+        Monte Carlo mode, in order
+        :return: a list of SamplingStats
+        """
+        return self._sampling_stats
 
     def mark_as_empty(self) -> list:
         """
         Returns a list of fields to mark as empty after a move
         :return: a list of fields to mark as empty
         """
-        to_mark_as_empty_list = deepcopy(self._to_mark_as_empty)
-        self._to_mark_as_empty.clear()
+        to_mark_as_empty_list = self._to_mark_as_empty
+        self._to_mark_as_empty = []
         return to_mark_as_empty_list
@@ -0,0 +1,186 @@
+from typing import List
+
+import board
+from fleet import SHIP_SIZES, placement_table
+
+
+class EnumerationTooLargeError(Exception):
+    """
+    Raised when an enumeration would need to visit more board states than
+    allowed
+    """
+
+    def __init__(self, max_states: int):
+        super().__init__(f"Enumeration exceeded {max_states} board states")
+
+
+class PlacementDistribution:
+    """
+    Exact distribution of ship placements produced by Fleet.create_random(),
+    optionally conditioned on observations of the board. The fleet is placed
+    the same way create_random() does it - ships are placed in order, each one
+    with a random rotation and a placement chosen uniformly from the ones that
+    don't collide with the ships placed earlier. Board states, described by
+    the mask of fields taken by the ships placed so far and the fields around
+    them, are enumerated with memoisation, so every state is only expanded
+    once, no matter how many ways lead to it.
+
+    The number of states grows very quickly with the number of ships: without
+    any observations there are 140 states after placing the first ship,
+    15712 after the second one, 645938 after the third one and over 43 million
+    after the fourth one. Because ships placed later don't change where the
+    earlier ones were placed, the distribution of one of the first ships can
+    be computed from a fleet made of it and the ships before it - it takes
+    seconds for the first three ships and minutes for the fourth one. The
+    whole fleet can only be enumerated when observations rule out most of the
+    placements. Fleets in which a ship can't be placed at all, making
+    create_random() fail, are left out of the distribution
+    """
+
+    def __init__(self, sizes: tuple = SHIP_SIZES, misses: int = 0,
+                 hits: int = 0, max_states: int = 1000000):
+        """
+        Enumerates all the ways the fleet can be placed
+        :param sizes: sizes of the ships, in the order they are placed
+        :type sizes: tuple
+        :param misses: mask of fields known not to contain any ship
+        :type misses: int
+        :param hits: mask of fields known to contain a ship
+        :type hits: int
+        :param max_states: maximum number of board states to visit, after
+        which EnumerationTooLargeError is raised
+        :type max_states: int
+        """
+        self._sizes = tuple(sizes)
+        self._misses = misses
+        self._hits = hits
+        self._max_states = max_states
+        self._choices_cache = {}
+        self._values = {}
+        self._probability = self._value(0, 0, 0)
+        self._distributions = [{} for _ in self._sizes]
+        if self._probability:
+            self._propagate()
+
+    def _choices(self, number: int, taken: int) -> List[tuple]:
+        """
+        Lists placements of a ship that create_random() can choose in a board
+        state and that don't contradict the missed fields
+        :param number: number of the ship in the fleet
+        :type number: int
+        :param taken: mask of fields taken by the ships placed earlier and the
+        fields around them
+        :type taken: int
+        :return: a list of (probability, mask, exclusion_mask) tuples
+        """
+        key = (number, taken)
+        choices = self._choices_cache.get(key)
+        if choices is not None:
+            return choices
+        if len(self._choices_cache) >= self._max_states:
+            raise EnumerationTooLargeError(self._max_states)
+        choices = []
+        table = placement_table()
+        size = self._sizes[number]
+        for vertical in (True, False):
+            good = [placement for placement in table[(size, vertical)]
+                    if not placement[1] & taken]
+            for _, mask, exclusion in good:
+                if not mask & self._misses:
+                    choices.append((0.5 / len(good), mask, exclusion))
+        self._choices_cache[key] = choices
+        return choices
+
+    def _value(self, number: int, taken: int, covered: int) -> float:
+        """
+        Calculates the probability that the ships from the given one onwards
+        are placed in a way matching the observations
+        :param number: number of the next ship to place
+        :type number: int
+        :param taken: mask of fields taken by the ships placed earlier and the
+        fields around them
+        :type taken: int
+        :param covered: mask of hit fields covered by the ships placed
+        earlier
+        :type covered: int
+        :return: probability of matching the observations
+        """
+        if number == len(self._sizes):
+            return 0.0 if self._hits & ~covered else 1.0
+        key = (number, taken, covered)
+        value = self._values.get(key)
+        if value is not None:
+            return value
+        value = 0.0
+        uncovered = bin(self._hits & ~covered).count('1')
+        if uncovered <= sum(self._sizes[number:]):
+            for probability, mask, exclusion in self._choices(number, taken):
+                value += probability * self._value(
+                    number + 1, taken | exclusion,
+                    covered | (mask & self._hits))
+        self._values[key] = value
+        return value
+
+    def _propagate(self):
+        """
+        Goes through the board states ship by ship, carrying the probability
+        of reaching each state, and adds the probability of every placement
+        leading to a fleet matching the observations to the distributions
+        """
+        states = {(0, 0): 1.0}
+        for number, distribution in enumerate(self._distributions):
+            next_states = {}
+            for (taken, covered), reached in states.items():
+                for probability, mask, exclusion in self._choices(number,
+                                                                  taken):
+                    state = (taken | exclusion, covered | (mask & self._hits))
+                    value = self._value(number + 1, *state)
+                    if not value:
+                        continue
+                    weight = reached * probability
+                    distribution[mask] = distribution.get(mask, 0.0) + \
+                        weight * value / self._probability
+                    next_states[state] = next_states.get(state, 0.0) + weight
+            states = next_states
+
+    def probability(self) -> float:
+        """
+        Returns the probability that create_random() places the fleet in a way
+        matching the observations
+        """
+        return self._probability
+
+    def ship_distribution(self, number: int) -> dict:
+        """
+        Returns the distribution of placements of a ship
+        :param number: number of the ship in the fleet
+        :type number: int
+        :return: a dictionary mapping masks of the ship's fields to their
+        probabilities, empty if no fleet matches the observations
+        """
+        return self._distributions[number]
+
+    def ship_heatmap(self, number: int) -> List[float]:
+        """
+        Calculates the probability of every field being occupied by a ship
+        :param number: number of the ship in the fleet
+        :type number: int
+        :return: a list of probabilities indexed like board.INDEX_TO_FIELD
+        """
+        heatmap = [0.0] * 100
+        for mask, probability in self._distributions[number].items():
+            for index in board.mask_indices(mask):
+                heatmap[index] += probability
+        return heatmap
+
+    def fleet_heatmap(self) -> List[float]:
+        """
+        Calculates the probability of every field being occupied by any ship
+        of the fleet
+        :return: a list of probabilities indexed like board.INDEX_TO_FIELD
+        """
+        heatmap = [0.0] * 100
+        for number in range(len(self._sizes)):
+            for index, probability in enumerate(self.ship_heatmap(number)):
+                heatmap[index] += probability
+        return heatmap
@@ -1,5 +1,5 @@
-from copy import deepcopy
-from random import choice
+import random
+from functools import lru_cache
 from typing import List
 
 import board
@@ -11,6 +11,8 @@ class ShipSegment:
     Class representing a part of a ship on the board
     """
 
+    __slots__ = ('_x', '_y', '_sunk')
+
     def __init__(self, x: str, y: int):
         """
         Creates a segment setting its position and status to not sunk
@@ -51,9 +53,15 @@ class ShipSegment:
 class Ship:
     """
     Class containing information about a single ship. It contains coordinates
-    of all its parts, and it can tell if it sunk or not.
+    of all its parts, and it can tell if it sunk or not. The number of
+    segments afloat is counted as they are sunk with sink() and "unsunk" with
+    unsink(), so the segments have to be changed through the Ship
     """
 
+    __slots__ = (
+        '_segments', '_size', '_vertical', '_origin', '_segments_afloat'
+    )
+
     def __init__(self, origin: tuple[str, int], size: int,
                  vertical: bool = True):
         """
@@ -78,6 +86,7 @@ class Ship:
                                  range(ord(x), ord(x) + size)]
         for x, y in field_coordinates:
             self._segments.append(ShipSegment(x, y))
+        self._segments_afloat = size
 
     def get_segment_coordinates(self) -> List[tuple]:
         """
@@ -99,10 +108,31 @@ class Ship:
         :return: True if the given coordinates belong to this Ship's segments,
         otherwise False
         """
-        for segment in self._segments:
-            if segment.position() == (x, y):
-                return True
-        return False
+        return self._segment_number(x, y) != -1
+
+    def _segment_number(self, x: str, y: int) -> int:
+        """
+        Calculates the number of the segment on the given coordinates from the
+        ship's origin, without searching through the segments
+        :param x: x coordinate of a field
+        :type x: str
+        :param y: y coordinate of a field
+        :type y: int
+        :return: index of the segment in the self._segments list, or -1 if
+        the coordinates don't belong to this ship
+        """
+        origin_x, origin_y = self._origin
+        if self._vertical:
+            if x != origin_x:
+                return -1
+            number = y - origin_y
+        else:
+            if y != origin_y:
+                return -1
+            number = ord(x) - ord(origin_x)
+        if 0 <= number < self._size:
+            return number
+        return -1
 
     def sink(self, x: str, y: int):
         """
@@ -113,20 +143,37 @@ class Ship:
         :param y: y coordinate of a segment
         :type y: int
         """
-        for segment in self._segments:
-            if segment.position() == (x, y):
-                segment.sink()
-                return
+        number = self._segment_number(x, y)
+        if number == -1:
+            return
+        segment = self._segments[number]
+        if not segment.sunk():
+            segment.sink()
+            self._segments_afloat -= 1
+
+    def unsink(self, x: str, y: int):
+        """
+        "Unsinks" the specified segment of this ship, used by the Fleet
+        displays in the UI version
+        :param x: x coordinate of a segment
+        :type x: str
+        :param y: y coordinate of a segment
+        :type y: int
+        """
+        number = self._segment_number(x, y)
+        if number == -1:
+            return
+        segment = self._segments[number]
+        if segment.sunk():
+            segment.unsink()
+            self._segments_afloat += 1
 
     def sunk(self) -> bool:
         """
         Checks if this Ship sunk, checking if all of its segments sunk
         :return: True if it did, False otherwise
         """
-        for segment in self._segments:
-            if not segment.sunk():
-                return False
-        return True
+        return not self._segments_afloat
 
     def ship_to_str(self, draw_as_enemy: bool = False) -> str:
         """
@@ -172,6 +219,12 @@ def field_available(temp_ship, temp_board) -> bool:
     :type temp_board: Board
     :return: True if the proposed Ship can be placed, False otherwise
     """
+    if isinstance(temp_board, board.BitBoard):
+        try:
+            mask = board.ship_mask(temp_ship)
+        except board.InvalidGameCoordinatesError:
+            return False
+        return temp_board.mask(board.FieldStatus.NOTHING) & mask == mask
     fields = temp_ship.get_segment_coordinates()
     for field in fields:
         if board.field_on_board(field):
@@ -202,13 +255,14 @@ def fields_around_ship(ship: Ship) -> List[tuple]:
     :type ship: Ship
     :return: a list of field coordinates around that ship
     """
-    all_fields = board.return_all_field_coordinates()
     ship_fields = ship.get_segment_coordinates()
     around = []
     for ship_field in ship_fields:
-        fields_around_current = fields_around_field(ship_field)
+        fields_around_current = board.FIELDS_AROUND.get(ship_field)
+        if fields_around_current is None:
+            fields_around_current = fields_around_field(ship_field)
         for field in fields_around_current:
-            if field in all_fields and field not in around \
+            if field in board.FIELD_SET and field not in around \
                     and field not in ship_fields:
                 around.append(field)
     return around
@@ -228,18 +282,139 @@ def mark_misses_around(ship: Ship, placement_board: "board.Board"):
         placement_board.set_field_status(x, y, board.FieldStatus.MISS)
 
 
+SHIP_SIZES = (4, 3, 3, 2, 2, 2, 1, 1, 1, 1)
+
+
+@lru_cache(maxsize=None)
+def placement_table() -> dict:
+    """
+    Creates a table of all placements of ships of every size and rotation that
+    fit on the board. Every placement is a tuple of the ship's origin, a mask
+    of fields occupied by the ship and a mask of fields occupied by the ship
+    together with fields around it, on which no other ship can be placed. The
+    table is created once, on the first call
+    :return: a dictionary mapping (size, vertical) tuples to lists of
+    placements, ordered by the origins in the same way as board.ALL_FIELDS
+    """
+    table = {}
+    for size in set(SHIP_SIZES):
+        for vertical in (True, False):
+            placements = []
+            for origin in board.ALL_FIELDS:
+                ship = Ship(origin, size, vertical)
+                fields = ship.get_segment_coordinates()
+                if not all(field in board.FIELD_SET for field in fields):
+                    continue
+                mask = board.ship_mask(ship)
+                exclusion = mask
+                for x, y in fields_around_ship(ship):
+                    exclusion |= 1 << board.field_index(x, y)
+                placements.append((origin, mask, exclusion))
+            table[(size, vertical)] = placements
+    return table
+
+
+@lru_cache(maxsize=None)
+def _placement_index() -> dict:
+    """
+    Creates a dictionary for looking up placements from the placement table
+    by the ship's origin, size and rotation
+    :return: a dictionary mapping (origin, size, vertical) tuples to
+    placements
+    """
+    index = {}
+    for (size, vertical), placements in placement_table().items():
+        for placement in placements:
+            index[(placement[0], size, vertical)] = placement
+    return index
+
+
+def placement_masks(ship: Ship):
+    """
+    Finds the mask of fields occupied by the ship and the mask of fields
+    occupied by the ship together with fields around it
+    :param ship: Ship to find the masks of
+    :type ship: Ship
+    :return: a (mask, exclusion_mask) tuple, or None if the ship doesn't fit
+    on the board
+    """
+    key = (ship.origin(), ship.size(), ship.vertical())
+    placement = _placement_index().get(key)
+    if placement is not None:
+        return placement[1], placement[2]
+    if ship.size() in SHIP_SIZES:
+        return None
+    fields = ship.get_segment_coordinates()
+    if not all(field in board.FIELD_SET for field in fields):
+        return None
+    mask = board.ship_mask(ship)
+    exclusion = mask
+    for x, y in fields_around_ship(ship):
+        exclusion |= 1 << board.field_index(x, y)
+    return mask, exclusion
+
+
+def _choose_random_placements(rng=random) -> List[tuple]:
+    """
+    Chooses random placements for all ships of a fleet from the placement
+    table. First, rotations of all ships are chosen, and then for every ship a
+    placement is chosen from the ones that don't collide with the ships placed
+    earlier and the fields around them
+    :param rng: source of randomness, a random.Random instance or the random
+    module
+    :return: a list of (placement, vertical) tuples, one for every ship, in
+    the order of SHIP_SIZES
+    """
+    # True means vertical, just like in the Ship class constructor
+    rotations = [rng.choice([True, False]) for _ in range(10)]
+    table = placement_table()
+    taken = 0
+    chosen = []
+    for rotation, size in zip(rotations, SHIP_SIZES):
+        good_placements = [placement for placement in table[(size, rotation)]
+                           if not placement[1] & taken]
+        placement = rng.choice(good_placements)
+        chosen.append((placement, rotation))
+        taken |= placement[2]
+    return chosen
+
+
+def random_fleet_layouts(count: int, rng=random):
+    """
+    Generates random fleets without creating any Fleet, Ship or ShipSegment
+    objects. The fleets are placed the same way Fleet.create_random() does it
+    :param count: number of fleets to generate
+    :type count: int
+    :param rng: source of randomness, a random.Random instance or the random
+    module
+    :return: a generator of tuples with masks of fields occupied by every
+    ship of a fleet, in the order of SHIP_SIZES
+    """
+    for _ in range(count):
+        yield tuple(placement[1] for placement, _
+                    in _choose_random_placements(rng))
+
+
 class Fleet:
     """
     Class containing information about a fleet of ships
     """
 
+    __slots__ = (
+        '_ships', '_selected_ship', '_collision_masks', '_ships_on_fields',
+        '_ships_afloat'
+    )
+
     def __init__(self, ships: List[Ship] = None):
         """
         Initializes a Fleet by creating an empty list of ships. Ships in the
         self._ships list are always put in the order from biggest to smallest,
         and that's how they are generated in create_random() and create_fleet()
         methods. self._selected_ship is the ship that will be moved or rotated
-        while modifying the board
+        while modifying the board. The fleet is indexed by the fields the
+        ships occupy, and counts its ships afloat as they are sunk with hit().
+        The index is created when it's needed, after it's invalidated by the
+        methods which replace the ships
         :param ships: A list of ships to initialize this fleet with
         :type ships: list
         """
@@ -247,33 +422,29 @@ class Fleet:
         if ships is not None:
             self._ships = ships
         self._selected_ship = None
+        self._collision_masks = []
+        self._ships_on_fields = None
+        self._ships_afloat = 0
 
-    def create_random(self):
+    def create_random(self, rng=random):
         """
         Creates ships in random places on the board. Used by the computer
         enemy to place ships. First, the rotation of the ship is chosen, and
-        then a list of fields where a ship can be placed is made. Then, for
-        every ship, a location is chosen, and the cycle continues, until all
-        ships are placed. To test if a location for a ship is valid, ships are
-        placed on a temporary board.
+        then a list of placements where a ship can be placed is made. Then,
+        for every ship, a placement is chosen, and the cycle continues, until
+        all ships are placed. To test if a placement for a ship is valid, its
+        mask is compared with a mask of fields taken by the ships placed
+        earlier and the fields around them.
+        :param rng: source of randomness, a random.Random instance or the
+        random module
         """
         self._ships.clear()
         self._selected_ship = None
-        # True means vertical, just like in the Ship class constructor
-        rotations = [choice([True, False]) for _ in range(10)]
-        sizes = [4, 3, 3, 2, 2, 2, 1, 1, 1, 1]
-        temp_board = board.Board()
-        for rotation, size in zip(rotations, sizes):
-            good_coords = []
-            for x, y in board.return_all_field_coordinates():
-                temp_ship = Ship((x, y), size, rotation)
-                if field_available(temp_ship, temp_board):
-                    good_coords.append((x, y))
-            position = choice(good_coords)
-            ship_to_add = Ship(position, size, rotation)
-            self._ships.append(ship_to_add)
-            mark_misses_around(ship_to_add, temp_board)
-            temp_board.place_ship(ship_to_add)
+        self._invalidate_index()
+        placements = _choose_random_placements(rng)
+        for (placement, rotation), size in zip(placements, SHIP_SIZES):
+            position = placement[0]
+            self._ships.append(Ship(position, size, rotation))
 
     def hit(self, x: str, y: int) -> bool:
         """
@@ -287,8 +458,11 @@ class Fleet:
         ship_hit = self.find_ship(x, y)
         if ship_hit is None:
             return False
+        if ship_hit.sunk():
+            return True
         ship_hit.sink(x, y)
         if ship_hit.sunk():
+            self._ships_afloat -= 1
             return True
         return False
 
@@ -302,10 +476,9 @@ class Fleet:
         :return: Ship situated in this position or None if there is no ship
         there
         """
-        for ship in self._ships:
-            if ship.check_if_belongs(x, y):
-                return ship
-        return None
+        if self._ships_on_fields is None:
+            self._update_index()
+        return self._ships_on_fields.get((x, y))
 
     def select_ship(self, x: str, y: int) -> bool:
         """
@@ -331,23 +504,67 @@ class Fleet:
         :return: new_ship's index in the self._ships list if it fits with the
         other ships, otherwise -1 to indicate that it can't be placed
         """
-        new_fleet = deepcopy(self._ships)
         old_ship_index = self._ships.index(self._selected_ship)
-        new_fleet[old_ship_index] = new_ship
-        # Now a test fit will be conducted to see if the fleet doesn't collide
-        # with itself, and if it doesn't, the selected_ship will be assigned
-        # with a reference to the new_ship, replacing it in selection and in
-        # the fleet
-        temp_board = board.Board()
-        for ship in new_fleet:
-            if field_available(ship, temp_board):
-                mark_misses_around(ship, temp_board)
-                temp_board.place_ship(ship)
-            else:
+        new_masks = placement_masks(new_ship)
+        if new_masks is None:
+            return -1
+        new_mask = new_masks[0]
+        # The new ship only has to be tested against the other ships, as they
+        # already fit with each other
+        if self._ships_on_fields is None:
+            self._update_index()
+        for index, masks in enumerate(self._collision_masks):
+            if index == old_ship_index:
+                continue
+            if masks is None or new_mask & masks[1]:
                 return -1
-        # If all ships have been placed it means that a new location is good
         return old_ship_index
 
+    def _invalidate_index(self):
+        """
+        Marks the index of the fleet as outdated after the ships have been
+        replaced, so it's recreated when it's needed again
+        """
+        self._ships_on_fields = None
+
+    def _update_index(self):
+        """
+        Creates the index of the fleet. The index consists of placement masks
+        of every ship, a dictionary with the ship on every field taken by the
+        fleet and the number of ships afloat
+        """
+        self._collision_masks = [placement_masks(ship)
+                                 for ship in self._ships]
+        self._ships_on_fields = {}
+        self._ships_afloat = 0
+        for ship in self._ships:
+            for field in ship.get_segment_coordinates():
+                self._ships_on_fields[field] = ship
+            if not ship.sunk():
+                self._ships_afloat += 1
+
+    def _replace_ship(self, index: int, new_ship: Ship):
+        """
+        Puts a new ship in place of the ship with the given index and selects
+        it, updating the index of the fleet
+        :param index: index of the replaced ship in the self._ships list
+        :type index: int
+        :param new_ship: the ship to put in its place
+        :type new_ship: Ship
+        """
+        if self._ships_on_fields is None:
+            self._update_index()
+        old_ship = self._ships[index]
+        for field in old_ship.get_segment_coordinates():
+            if self._ships_on_fields.get(field) is old_ship:
+                del self._ships_on_fields[field]
+        for field in new_ship.get_segment_coordinates():
+            self._ships_on_fields[field] = new_ship
+        self._ships_afloat += old_ship.sunk() - new_ship.sunk()
+        self._ships[index] = new_ship
+        self._collision_masks[index] = placement_masks(new_ship)
+        self._selected_ship = new_ship
+
     def set_ship_position(self, x: str, y: int) -> bool:
         """
         Sets selected ship's position to the specified coordinates. Coordinates
@@ -369,8 +586,7 @@ class Fleet:
         old_ship_index = self._new_ship_test_fit(new_ship)
         if old_ship_index == -1:
             return False
-        self._ships[old_ship_index] = new_ship
-        self._selected_ship = new_ship
+        self._replace_ship(old_ship_index, new_ship)
         return True
 
     def change_ship_rotation(self) -> bool:
@@ -390,19 +606,18 @@ class Fleet:
         old_ship_index = self._new_ship_test_fit(new_ship)
         if old_ship_index == -1:
             return False
-        self._ships[old_ship_index] = new_ship
-        self._selected_ship = new_ship
+        self._replace_ship(old_ship_index, new_ship)
         return True
 
     def is_alive(self):
         """
-        Checks if the whole fleet has sunk
+        Checks if the whole fleet has sunk, using the number of ships afloat
+        counted by hit()
         :return: True if there are still ships afloat, False otherwise
         """
-        for ship in self._ships:
-            if not ship.sunk():
-                return True
-        return False
+        if self._ships_on_fields is None:
+            self._update_index()
+        return self._ships_afloat > 0
 
     def fleet_to_str(self, draw_as_enemy: bool = False) -> str:
         """
@@ -456,6 +671,46 @@ class Fleet:
         else:
             return Fleet(self._ships)
 
+    def snapshot(self) -> bytes:
+        """
+        Encodes the fleet with three bytes for every ship - the index of its
+        origin, its size and rotation, and a mask of its sunken segments
+        :return: the encoded fleet
+        """
+        data = bytearray()
+        for ship in self._ships:
+            sunken = 0
+            for number, segment in enumerate(ship.segments()):
+                if segment.sunk():
+                    sunken |= 1 << number
+            data += bytes([board.FIELD_INDICES[ship.origin()],
+                           ship.size() << 1 | ship.vertical(), sunken])
+        return bytes(data)
+
+    def restore(self, data: bytes):
+        """
+        Replaces the ships with the ones encoded with snapshot()
+        :param data: the encoded fleet
+        :type data: bytes
+        :raises ValueError: if the data doesn't encode a fleet
+        """
+        if len(data) % 3:
+            raise ValueError("invalid fleet snapshot")
+        ships = []
+        for start in range(0, len(data), 3):
+            origin, size_and_rotation, sunken = data[start:start + 3]
+            if origin >= 100:
+                raise ValueError("invalid fleet snapshot")
+            ship = Ship(board.INDEX_TO_FIELD[origin], size_and_rotation >> 1,
+                        bool(size_and_rotation & 1))
+            for number, segment in enumerate(ship.segments()):
+                if sunken >> number & 1:
+                    ship.sink(*segment.position())
+            ships.append(ship)
+        self._ships = ships
+        self._selected_ship = None
+        self._invalidate_index()
+
     def ships(self):
         return self._ships
 
@@ -1,7 +1,8 @@
+import random
 from copy import deepcopy
 from enum import Enum
 
-from board import Board
+from board import BitBoard
 from fleet import Fleet
 
 
@@ -17,20 +18,23 @@ class FleetCreator:
     Class handling player board's setup in the setup phase of the game
     """
 
-    def __init__(self):
+    def __init__(self, rng=random):
         """
         Creates game objects and variables needed to operate the fleet creator
+        :param rng: source of randomness used to create random fleets, a
+        random.Random instance or the random module
         """
-        self._board = Board()
+        self._board = BitBoard()
         self._fleet = Fleet()
         self._messages = []
+        self._rng = rng
 
     def start(self):
         """
         Starts the Fleet Creator by creating a new random fleet and placing it
         on the board
         """
-        self._fleet.create_random()
+        self._fleet.create_random(self._rng)
         self._board.place_fleet(self._fleet)
 
     def select_ship(self, x: str, y: int):
@@ -73,7 +77,7 @@ class FleetCreator:
         """
         Handles the creation of a new random fleet
         """
-        self._fleet.create_random()
+        self._fleet.create_random(self._rng)
         self._board.place_fleet(self._fleet)
 
     def setup_help(self):
@@ -136,17 +140,17 @@ class FleetCreator:
         self._messages.clear()
         return messages
 
-    def get_board_display(self) -> Board:
+    def get_board_display(self) -> BitBoard:
         """
-        :return: Board with the representation of the current Fleet setup
+        :return: BitBoard with the representation of the current Fleet setup
         """
         return self._board
 
-    def get_setup(self) -> tuple[Board, Fleet]:
+    def get_setup(self) -> tuple[BitBoard, Fleet]:
         """
-        :return: a tuple of the Board and Fleet created in the Fleet Creator,
-        called when the played uses the "done" command or clicks the "Done"
-        button
+        :return: a tuple of the BitBoard and Fleet created in the Fleet
+        Creator, called when the played uses the "done" command or clicks the
+        "Done" button
         """
         return self._board, self._fleet
 
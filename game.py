@@ -1,8 +1,11 @@
+import random
 from copy import deepcopy
 from enum import Enum
+from typing import List, NamedTuple
 
-from board import GameBoard, Board, field_on_board
-from enemy import Enemy
+from board import GameBoard, Board, field_on_board, BitBoard, FieldStatus, \
+    FIELD_INDICES
+from enemy import Enemy, EnemyMode, MoveTime
 from fleet import Fleet
 from settings import Setting, Settings
 
@@ -25,6 +28,133 @@ class GameMessage(Enum):
     PLAYERS_TURN = 14
 
 
+class GameView(Enum):
+    PLAYER_BOARD = 0,
+    ENEMY_BOARD = 1,
+    PLAYER_FLEET = 2,
+    ENEMY_FLEET = 3
+
+
+class GameChange(NamedTuple):
+    """
+    A change of a single field on one of the boards or a single segment in
+    one of the fleets displayed in the game. For boards, position contains
+    the field's coordinates, and for fleets it's a tuple of the ship's and
+    the segment's index, with SHIP and SUNK statuses for segments afloat and
+    sunk
+    """
+    view: GameView
+    position: tuple
+    old_status: FieldStatus
+    new_status: FieldStatus
+
+
+class ReplayMove(Enum):
+    PLAYER_MISS = 0,
+    PLAYER_HIT = 1,
+    PLAYER_SINK = 2,
+    ENEMY_MISS = 3,
+    ENEMY_HIT = 4,
+    ENEMY_SINK = 5,
+    MARK = 6,
+    UNMARK = 7,
+    # a field the enemy will shoot at while finishing off a hit ship, the
+    # records after an enemy's hit list all of them in their order
+    ENEMY_TARGET = 8
+
+
+# versions of the formats of Game.snapshot() and Game.get_replay(),
+# increased when they change
+SNAPSHOT_VERSION = 1
+REPLAY_VERSION = 2
+# every move in a replay is stored as the move's code and the field's index
+REPLAY_RECORD_SIZE = 2
+REPLAY_CODES = {move: code for code, move in enumerate(ReplayMove)}
+REPLAY_MOVES = tuple(ReplayMove)
+# longest time the Monte Carlo enemy spends on sampling a single move, keeps
+# the game responsive on slow machines. The number of layouts sampled in that
+# time depends on the machine, so the Monte Carlo enemy's moves can't be
+# reproduced with a seeded rng, they can only be repeated from a replay
+ENEMY_TIME_BUDGET_MS = 100
+# high enough for the time budget to limit the sampling on any machine
+ENEMY_MAX_SAMPLES = 50000
+
+
+def encode_settings(settings: dict) -> int:
+    """
+    Encodes the settings as bits of an integer, in the order of the Setting
+    enum
+    :param settings: dictionary with values of the settings
+    :type settings: dict
+    :return: an integer with a bit set for every enabled setting
+    """
+    return sum(bool(settings.get(setting, False)) << bit
+               for bit, setting in enumerate(Setting))
+
+
+def decode_settings(flags: int) -> dict:
+    """
+    Decodes the settings encoded with encode_settings()
+    :param flags: the encoded settings
+    :type flags: int
+    :return: dictionary with values of all settings
+    """
+    return {setting: bool(flags >> bit & 1)
+            for bit, setting in enumerate(Setting)}
+
+
+def enemy_mode(settings: dict) -> EnemyMode:
+    """
+    Chooses the computer enemy's mode according to the settings. The
+    sampling-based and probability-based targeting are only used by the
+    harder enemy, the former if both are enabled
+    :param settings: dictionary with values of the settings
+    :type settings: dict
+    :return: mode of the enemy
+    """
+    if not settings[Setting.HARD_ENEMY]:
+        return EnemyMode.EASY
+    if settings.get(Setting.MONTE_CARLO_ENEMY, False):
+        return EnemyMode.MONTE_CARLO
+    if settings.get(Setting.DENSITY_ENEMY, False):
+        return EnemyMode.DENSITY
+    return EnemyMode.HARD
+
+
+def enemy_target_records(targets: list) -> bytes:
+    """
+    Encodes the enemy's fields to shoot at as ENEMY_TARGET records of a
+    replay. Their order depends on the enemy's source of randomness, so it's
+    recorded to be restored when the replay is played
+    :param targets: coordinates of the fields, from Enemy.pending_targets()
+    :type targets: list
+    :return: the records
+    """
+    code = REPLAY_CODES[ReplayMove.ENEMY_TARGET]
+    return bytes(value for field in targets
+                 for value in (code, FIELD_INDICES[field]))
+
+
+def replay_header(settings: dict, player_fleet: Fleet,
+                  enemy_fleet: Fleet) -> bytes:
+    """
+    Creates the beginning of a replay, describing the game at its start
+    :param settings: dictionary with values of the settings
+    :type settings: dict
+    :param player_fleet: the player's fleet
+    :type player_fleet: Fleet
+    :param enemy_fleet: the enemy's fleet
+    :type enemy_fleet: Fleet
+    :return: the format version, the encoded settings and both fleets,
+    each one preceded by its length
+    """
+    player_data = player_fleet.snapshot()
+    enemy_data = enemy_fleet.snapshot()
+    return bytes([REPLAY_VERSION, encode_settings(settings),
+                  len(player_data)]) + player_data + \
+        bytes([len(enemy_data)]) + enemy_data
+
+
 class Game:
     """
     Handles the game
@@ -42,7 +172,12 @@ class Game:
         self._players_turn = True
         self._won = False
         self._messages = []
+        self._fleet_changes = []
+        self._displayed_boards = {}
         self._settings = None
+        self._rng = random
+        self._replay = None
+        self._last_move = None
         self.apply_settings(None)
 
     def apply_settings(self, settings: dict = None):
@@ -52,30 +187,54 @@ class Game:
         else:
             self._settings = settings
 
-    def _create_enemy_fleet(self):
+    def _create_enemy_fleet(self, enemy_fleet: Fleet = None):
         """
         Creates enemy's fleet and board
-        """
-        self._enemy_fleet = Fleet()
-        self._enemy_fleet.create_random()
-        enemy_board = Board()
+        :param enemy_fleet: the enemy's fleet, a random one is created if it's
+        None
+        :type enemy_fleet: Fleet
+        """
+        if enemy_fleet is None:
+            enemy_fleet = Fleet()
+            enemy_fleet.create_random(self._rng)
+        self._enemy_fleet = enemy_fleet
+        enemy_board = BitBoard()
         enemy_board.place_fleet(self._enemy_fleet)
         self._enemy_board = GameBoard(enemy_board)
 
-    def start_game(self, player_board: Board, player_fleet: Fleet):
+    def start_game(self, player_board: Board, player_fleet: Fleet,
+                   rng=random, enemy_fleet: Fleet = None):
         """
-        Starts the game by assigning boards and fleets
+        Starts the game by assigning boards and fleets, and starts recording
+        its replay
         :param player_board: player's board, created in the setup phase
         :type player_board: GameBoard
         :param player_fleet: player's fleet, also from the setup phase
         :type player_fleet: Fleet
-        """
+        :param rng: source of randomness used by the enemy, a random.Random
+        instance or the random module. The Monte Carlo enemy's moves depend
+        on the speed of the machine too, see ENEMY_TIME_BUDGET_MS
+        :param enemy_fleet: the enemy's fleet, a random one is created if it's
+        None
+        :type enemy_fleet: Fleet
+        """
+        self._rng = rng
         self._player_board = GameBoard(player_board)
-        self._enemy = Enemy(self._settings[Setting.HARD_ENEMY])
+        self._enemy = Enemy(mode=enemy_mode(self._settings), rng=rng,
+                            time_budget_ms=ENEMY_TIME_BUDGET_MS,
+                            max_samples=ENEMY_MAX_SAMPLES)
         self._player_fleet = player_fleet
-        self._create_enemy_fleet()
+        self._create_enemy_fleet(enemy_fleet)
+        self._fleet_changes = []
+        self._displayed_boards = {
+            GameView.PLAYER_BOARD: self._player_board.get_display_board(),
+            GameView.ENEMY_BOARD: BitBoard()
+        }
         self._players_turn = True
         self._won = False
+        self._replay = bytearray(replay_header(
+            self._settings, self._player_fleet, self._enemy_fleet))
+        self._last_move = None
         self._message_players_turn()
 
     def discover_field(self, x: str, y: int) -> bool:
@@ -105,14 +264,21 @@ class Game:
             self._players_turn = True
             self._message_enemy_ship_hit()
             sunk = self._enemy_fleet.hit(x, y)
+            self._record(ReplayMove.PLAYER_SINK if sunk
+                         else ReplayMove.PLAYER_HIT, x, y)
             if sunk:
                 self._message_enemy_ship_sunk()
                 ship_to_sink = self._enemy_fleet.find_ship(x, y)
+                # the enemy's ships are only shown once they sink
+                self._add_fleet_changes(GameView.ENEMY_FLEET,
+                                        self._enemy_fleet, ship_to_sink,
+                                        ship_to_sink.get_segment_coordinates())
                 self._enemy_board.sink_ship(ship_to_sink)
                 if self._settings[Setting.MARK_MISSES_AROUND]:
                     self._enemy_board.mark_misses_around(ship_to_sink)
                 self.check_win()
         else:
+            self._record(ReplayMove.PLAYER_MISS, x, y)
             self._message_player_miss()
         return hit
 
@@ -128,7 +294,9 @@ class Game:
             self._message_invalid_coordinates()
             return
         marked = self._enemy_board.mark_as_empty(x, y)
-        if not marked:
+        if marked:
+            self._record(ReplayMove.MARK, x, y)
+        else:
             self._message_field_mark_fail()
 
     def unmark_field(self, x: str, y: int):
@@ -143,7 +311,9 @@ class Game:
             self._message_invalid_coordinates()
             return
         unmarked = self._enemy_board.unmark_as_empty(x, y)
-        if not unmarked:
+        if unmarked:
+            self._record(ReplayMove.UNMARK, x, y)
+        else:
             self._message_field_unmark_fail()
 
     def game_help(self):
@@ -152,20 +322,58 @@ class Game:
         """
         self._message_game_help()
 
-    def enemy_move(self) -> bool:
+    def enemy_move_times(self) -> List[MoveTime]:
+        """
+        Returns the times taken by the enemy's moves, since the game was
+        started or restored
+        :return: a list of MoveTimes, in the order of the moves
+        """
+        return self._enemy.move_times()
+
+    def choose_enemy_target(self,
+                            deadline_ms: float = None) -> tuple[str, int]:
+        """
+        Lets the computer enemy choose the field it will shoot at in its next
+        move. It only changes the state of the enemy, so it can be done on a
+        different thread than the rest of the game, as long as the game isn't
+        used until the move is made with enemy_move()
+        :param deadline_ms: time limit of the choice in milliseconds, if None
+        the enemy's time budget is used
+        :type deadline_ms: float
+        :return: a tuple with coordinates of the chosen field, or None if it's
+        not the enemy's turn
+        """
+        if self._players_turn or self._won:
+            return None
+        return self._enemy.shoot(deadline_ms)
+
+    def enemy_move(self, target: tuple[str, int] = None,
+                   deadline_ms: float = None) -> bool:
         """
         Handles the computer enemy's move
+        :param target: field chosen earlier with choose_enemy_target(), if
+        None the enemy chooses it now
+        :type target: tuple
+        :param deadline_ms: time limit of choosing the target in
+        milliseconds, if None the enemy's time budget is used
+        :type deadline_ms: float
         :return: True if the enemy hit player's ship, otherwise false.
         """
         if self._players_turn:
             return False
-        target = self._enemy.shoot()
+        if target is None:
+            target = self._enemy.shoot(deadline_ms)
         x, y = target
         hit = self._player_board.discover_field(x, y)
         if hit:
             self._players_turn = False
             self._message_player_ship_hit()
             sunk = self._player_fleet.hit(x, y)
+            self._record(ReplayMove.ENEMY_SINK if sunk
+                         else ReplayMove.ENEMY_HIT, x, y)
+            self._add_fleet_changes(GameView.PLAYER_FLEET, self._player_fleet,
+                                    self._player_fleet.find_ship(x, y),
+                                    [(x, y)])
             self._enemy.react_to_hit()
             if sunk:
                 self._message_player_ship_sunk()
@@ -173,8 +381,12 @@ class Game:
                 self._player_board.sink_ship(ship_to_sink)
                 self._enemy.react_to_sink()
                 self.check_win()
+            if self._replay is not None:
+                self._replay += enemy_target_records(
+                    self._enemy.pending_targets())
         else:
             self._players_turn = True
+            self._record(ReplayMove.ENEMY_MISS, x, y)
             self._message_enemy_miss()
         to_mark_as_empty = self._enemy.mark_as_empty()
         if to_mark_as_empty:
@@ -183,6 +395,26 @@ class Game:
                 self._player_board.mark_as_empty(m_x, m_y)
         return hit
 
+    def _add_fleet_changes(self, view: GameView, changed_fleet: Fleet,
+                           ship, fields: list):
+        """
+        Adds changes of the segments of a ship that sunk to the fleet changes
+        :param view: the fleet display which changed
+        :type view: GameView
+        :param changed_fleet: fleet containing the ship
+        :type changed_fleet: Fleet
+        :param ship: the ship which segments sunk
+        :type ship: Ship
+        :param fields: coordinates of the sunken segments
+        :type fields: list
+        """
+        ship_index = changed_fleet.ships().index(ship)
+        segment_fields = ship.get_segment_coordinates()
+        for field in fields:
+            self._fleet_changes.append(GameChange(
+                view, (ship_index, segment_fields.index(field)),
+                FieldStatus.SHIP, FieldStatus.SUNK))
+
     def check_win(self) -> bool:
         """
         Checks if one of the players won the game
@@ -325,6 +557,173 @@ class Game:
         self._messages.clear()
         return messages
 
+    def get_changes(self) -> List[GameChange]:
+        """
+        Returns changes of the boards and fleets displayed in the game since
+        the last call or the start of the game, so the displays can be updated
+        without comparing all fields and segments
+        :return: a list of GameChanges, first of the boards, then of the
+        fleets
+        """
+        changes = []
+        boards = [
+            (GameView.PLAYER_BOARD, self._player_board, False),
+            (GameView.ENEMY_BOARD, self._enemy_board, True)
+        ]
+        for view, game_board, display_as_enemy in boards:
+            displayed = self._displayed_boards[view]
+            current = None
+            for x, y in game_board.changed_fields():
+                if current is None:
+                    current = game_board.get_display_board(display_as_enemy)
+                old_status = displayed.get_field_status(x, y)
+                new_status = current.get_field_status(x, y)
+                if old_status != new_status:
+                    displayed.set_field_status(x, y, new_status)
+                    changes.append(
+                        GameChange(view, (x, y), old_status, new_status))
+        changes += self._fleet_changes
+        self._fleet_changes = []
+        return changes
+
+    def snapshot(self) -> bytes:
+        """
+        Encodes the state of the game - whose turn it is, the settings, both
+        boards and fleets and the state of the enemy, so it can be restored
+        later with restore(), also in a different Game. The snapshot starts
+        with the format version and a byte of flags, followed by the encoded
+        boards, fleets and enemy, each one preceded by its length, and takes
+        about 300 bytes. Messages and changes that weren't collected yet, and
+        the state of the source of randomness, aren't included
+        :return: the encoded game
+        """
+        flags = self._players_turn | self._won << 1 | \
+            encode_settings(self._settings) << 2
+        data = bytearray([SNAPSHOT_VERSION, flags])
+        parts = [self._player_board.snapshot(), self._enemy_board.snapshot(),
+                 self._player_fleet.snapshot(), self._enemy_fleet.snapshot(),
+                 self._enemy.snapshot()]
+        for part in parts:
+            data.append(len(part))
+            data += part
+        return bytes(data)
+
+    def restore(self, data: bytes, rng=random):
+        """
+        Replaces the state of the game with one encoded with snapshot(). The
+        game continues as if the displays were refreshed just before the
+        snapshot, so there are no messages or changes to collect
+        :param data: the encoded game
+        :type data: bytes
+        :param rng: source of randomness used by the enemy from now on, a
+        random.Random instance or the random module
+        :raises ValueError: if the data doesn't encode a game
+        """
+        if len(data) < 2 or data[0] != SNAPSHOT_VERSION:
+            raise ValueError("invalid game snapshot")
+        flags = data[1]
+        parts = []
+        position = 2
+        while position < len(data):
+            length = data[position]
+            parts.append(data[position + 1:position + 1 + length])
+            position += 1 + length
+        if position != len(data) or len(parts) != 5:
+            raise ValueError("invalid game snapshot")
+        player_board = GameBoard(BitBoard())
+        player_board.restore(parts[0])
+        enemy_board = GameBoard(BitBoard())
+        enemy_board.restore(parts[1])
+        player_fleet = Fleet()
+        player_fleet.restore(parts[2])
+        enemy_fleet = Fleet()
+        enemy_fleet.restore(parts[3])
+        enemy = Enemy(rng=rng, time_budget_ms=ENEMY_TIME_BUDGET_MS,
+                      max_samples=ENEMY_MAX_SAMPLES)
+        enemy.restore(parts[4])
+        self._players_turn = bool(flags & 1)
+        self._won = bool(flags >> 1 & 1)
+        self._settings = decode_settings(flags >> 2)
+        self._rng = rng
+        self._player_board = player_board
+        self._enemy_board = enemy_board
+        self._player_fleet = player_fleet
+        self._enemy_fleet = enemy_fleet
+        self._enemy = enemy
+        self._messages = []
+        self._fleet_changes = []
+        self._displayed_boards = {
+            GameView.PLAYER_BOARD: self._player_board.get_display_board(),
+            GameView.ENEMY_BOARD: self._enemy_board.get_display_board(
+                display_as_enemy=True).copy()
+        }
+        self._replay = None
+        self._last_move = None
+
+    def _record(self, move: ReplayMove, x: str, y: int):
+        """
+        Adds a move to the replay
+        :param move: the move and its result
+        :type move: ReplayMove
+        :param x: x coordinate of the field
+        :type x: str
+        :param y: y coordinate of the field
+        :type y: int
+        """
+        self._last_move = move
+        if self._replay is not None:
+            self._replay += bytes((REPLAY_CODES[move], FIELD_INDICES[(x, y)]))
+
+    def get_replay(self) -> bytes:
+        """
+        Returns the replay of the game, which can be played with a
+        ReplayPlayer. It contains the settings and both fleets from the start
+        of the game, followed by a REPLAY_RECORD_SIZE bytes long record of
+        every shot, mark and unmark made since then, with its result
+        :return: the replay, or None for games restored from a snapshot,
+        which don't record their replays
+        """
+        if self._replay is None:
+            return None
+        return bytes(self._replay)
+
+    def replay_move(self, move: ReplayMove, x: str, y: int,
+                    enemy_targets: list = None):
+        """
+        Makes a move recorded in a replay. Shots of the enemy are made at the
+        recorded fields, instead of the ones the enemy would choose
+        :param move: the recorded move and its result
+        :type move: ReplayMove
+        :param x: x coordinate of the field
+        :type x: str
+        :param y: y coordinate of the field
+        :type y: int
+        :param enemy_targets: fields of the ENEMY_TARGET records following
+        the move, the enemy's fields to shoot at are put in their order
+        :type enemy_targets: list
+        :raises ValueError: if the move can't be made, or if its result
+        differs from the recorded one
+        """
+        self._last_move = None
+        players_move = move in (ReplayMove.PLAYER_MISS, ReplayMove.PLAYER_HIT,
+                                ReplayMove.PLAYER_SINK)
+        if move == ReplayMove.ENEMY_TARGET:
+            raise ValueError(f"{move.name} isn't a move")
+        elif move == ReplayMove.MARK:
+            self.mark_field(x, y)
+        elif move == ReplayMove.UNMARK:
+            self.unmark_field(x, y)
+        elif self._won or players_move != self._players_turn:
+            raise ValueError(f"{move.name} made out of turn")
+        elif players_move:
+            self.discover_field(x, y)
+        else:
+            self.enemy_move(self._enemy.shoot_at((x, y)))
+        if self._last_move != move:
+            raise ValueError(f"{move.name} at {x}{y} doesn't match the game")
+        if enemy_targets:
+            self._enemy.set_pending_targets(enemy_targets)
+
     def players_turn(self) -> bool:
         return self._players_turn
 
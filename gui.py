@@ -1,10 +1,9 @@
-from PySide2.QtCore import Qt
+from PySide2.QtCore import Qt, QObject, QRunnable, Signal
 from PySide2.QtGui import QPixmap, QIcon
 from PySide2.QtWidgets import QToolButton, QSizePolicy, \
     QGridLayout
 
-from board import FieldStatus, game_to_array_coords, Board, \
-    return_all_field_coordinates
+from board import FieldStatus, game_to_array_coords, Board, ALL_FIELDS
 from fleet import Fleet, Ship
 
 
@@ -32,6 +31,42 @@ def array_to_game_coords(x: int, y: int) -> tuple[str, int]:
     return alphabet[x], y + 1
 
 
+class EnemyMoveSignals(QObject):
+    """
+    Signals of the EnemyMoveWorker, QRunnable can't have its own because it's
+    not a QObject
+    """
+    finished = Signal(object, object)
+
+
+class EnemyMoveWorker(QRunnable):
+    """
+    Lets the computer enemy choose its next target on a thread from a
+    QThreadPool, so the window stays responsive while it thinks. The result is
+    delivered with the finished signal, which is received on the main thread,
+    where the move itself should be made with Game.enemy_move()
+    """
+
+    def __init__(self, game):
+        """
+        :param game: the game in which the enemy makes its move, it shouldn't
+        be used until the finished signal is received
+        :type game: Game
+        """
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = EnemyMoveSignals()
+        self._game = game
+
+    def run(self):
+        """
+        Chooses the target and emits the finished signal with this worker and
+        the chosen field's coordinates
+        """
+        target = self._game.choose_enemy_target()
+        self.signals.finished.emit(self, target)
+
+
 # Original code by Oleh Prypin distributed under terms of the CC BY-SA 4.0
 # license
 # Source: https://stackoverflow.com/questions/11008140/pyqt-custom-widget-fixed-as-square
@@ -140,7 +175,7 @@ class UIBoard:
         refreshes a button if there was a change of state of it's corresponding
         field to improve performance
         """
-        for x, y in return_all_field_coordinates():
+        for x, y in ALL_FIELDS:
             self._cached_board.set_field_status(x, y, FieldStatus.SUNK)
 
     def set_icons(self, icons_dict: dict):
@@ -162,7 +197,7 @@ class UIBoard:
         way on the board, only used in the FleetCreator
         :type selected_ship: Ship
         """
-        for c_x, c_y in return_all_field_coordinates():
+        for c_x, c_y in ALL_FIELDS:
             new_status = display_board.get_field_status(c_x, c_y)
             if self._cached_board.get_field_status(c_x, c_y) != new_status:
                 x, y = game_to_array_coords(c_x, c_y)
@@ -177,6 +212,20 @@ class UIBoard:
                 self._cached_board.set_field_status(c_x, c_y,
                                                     FieldStatus.SELECTED)
 
+    def apply_changes(self, changes: list):
+        """
+        Updates only the buttons of the fields which status has changed,
+        without comparing the whole board
+        :param changes: list of GameChanges of the board displayed by this
+        UIBoard
+        :type changes: list
+        """
+        for change in changes:
+            c_x, c_y = change.position
+            x, y = game_to_array_coords(c_x, c_y)
+            self._button_array[y][x].setIcon(self._icons[change.new_status])
+            self._cached_board.set_field_status(c_x, c_y, change.new_status)
+
     def define_left_click_action(self, function):
         """
         Sets a function or a method that will be called when a button in this
@@ -261,7 +310,7 @@ class UIFleet:
         ships = self._cached_fleet.ships()
         for ship in ships:
             for segment in ship.segments():
-                segment.sink()
+                ship.sink(*segment.position())
 
     def set_icons(self, icons_dict: dict):
         """
@@ -291,11 +340,33 @@ class UIFleet:
                     if segment.sunk():
                         self._button_array[ship_num][segment_num].setIcon(
                             self._icons[FieldStatus.SUNK])
-                        cached_segment.sink()
+                        cached_ships[ship_num].sink(
+                            *cached_segment.position())
                     else:
                         self._button_array[ship_num][segment_num].setIcon(
                             self._icons[FieldStatus.SHIP])
-                        cached_segment.unsink()
+                        cached_ships[ship_num].unsink(
+                            *cached_segment.position())
+
+    def apply_changes(self, changes: list):
+        """
+        Updates only the displays of the segments which status has changed,
+        without comparing the whole fleet
+        :param changes: list of GameChanges of the fleet displayed by this
+        UIFleet
+        :type changes: list
+        """
+        cached_ships = self._cached_fleet.ships()
+        for change in changes:
+            ship_num, segment_num = change.position
+            cached_ship = cached_ships[ship_num]
+            position = cached_ship.segments()[segment_num].position()
+            self._button_array[ship_num][segment_num].setIcon(
+                self._icons[change.new_status])
+            if change.new_status == FieldStatus.SUNK:
+                cached_ship.sink(*position)
+            else:
+                cached_ship.unsink(*position)
 
     def define_left_click_action(self, function):
         """
@@ -0,0 +1,43 @@
+import random
+import time
+
+from archive import GameArchive, Winner
+from board import return_all_field_coordinates
+from enemy import Enemy, EnemyMode
+from settings import Setting
+from simulate import simulate_game, ScriptedShooter
+
+games_per_mode = 10000
+mode_settings = {
+    EnemyMode.EASY: {Setting.MARK_MISSES_AROUND: False,
+                     Setting.HARD_ENEMY: False,
+                     Setting.DENSITY_ENEMY: False},
+    EnemyMode.HARD: {Setting.MARK_MISSES_AROUND: False,
+                     Setting.HARD_ENEMY: True,
+                     Setting.DENSITY_ENEMY: False},
+    EnemyMode.DENSITY: {Setting.MARK_MISSES_AROUND: False,
+                        Setting.HARD_ENEMY: True,
+                        Setting.DENSITY_ENEMY: True},
+    EnemyMode.MONTE_CARLO: {Setting.MARK_MISSES_AROUND: False,
+                            Setting.HARD_ENEMY: True,
+                            Setting.MONTE_CARLO_ENEMY: True}
+}
+
+if __name__ == "__main__":
+    fields_queue = return_all_field_coordinates()
+    # the same player as in enemy_ai_test.py plays against every mode, every
+    # game is recorded and stored in the archive
+    with GameArchive("ai_games.sqlite") as archive:
+        for mode, settings in mode_settings.items():
+            for i in range(games_per_mode):
+                rng = random.Random(i)
+                result = simulate_game(ScriptedShooter(fields_queue),
+                                       Enemy(mode=mode, rng=rng), rng=rng,
+                                       settings=settings)
+                archive.add(result.replay)
+        archive.flush()
+        start = time.perf_counter()
+        losses = archive.count(EnemyMode.HARD, Winner.PLAYER, min_moves=71)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"Hard enemy lost {losses} games over 70 moves, "
+              f"found in {elapsed:.2f} ms")
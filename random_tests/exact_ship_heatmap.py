@@ -0,0 +1,24 @@
+import seaborn as seaborn
+import matplotlib.pyplot as plt
+
+from board import field_index
+from enumeration import PlacementDistribution
+from fleet import SHIP_SIZES
+
+# later ships don't change the placement of the earlier ones, so the first
+# three ships can be enumerated exactly in a few seconds, unlike the rest
+filenames = ["heatmap4_exact", "heatmap3_1_exact", "heatmap3_2_exact"]
+
+distribution = PlacementDistribution(SHIP_SIZES[:len(filenames)])
+for number, filename in enumerate(filenames):
+    heatmap = distribution.ship_heatmap(number)
+    two_d_dataset = []
+    for x in "abcdefghij":
+        row = []
+        for y in range(1, 11):
+            row.append(heatmap[field_index(x, y)] * 100)
+        two_d_dataset.append(row)
+    seaborn.heatmap(two_d_dataset, annot=True, fmt=".1f")
+    plt.title(f"{filename} distribution on the map (%)")
+    plt.savefig(f"{filename}.png")
+    plt.clf()
@@ -0,0 +1,103 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+
+from board import mask_indices
+from fleet import SHIP_SIZES, placement_table, random_fleet_layouts
+
+
+@lru_cache(maxsize=None)
+def placement_numbers() -> tuple[dict, np.ndarray]:
+    """
+    Numbers all placements from the placement table and creates a matrix of
+    fields they occupy
+    :return: a tuple with a dictionary mapping masks of placements to their
+    numbers and a matrix with a row for every placement, which has ones in
+    columns of the indices of fields occupied by it
+    """
+    numbers = {}
+    for (size, vertical), placements in placement_table().items():
+        for _, mask, _ in placements:
+            # single field ships have the same placements in both rotations
+            numbers.setdefault(mask, len(numbers))
+    fields = np.zeros((len(numbers), 100), dtype=np.int64)
+    for mask, number in numbers.items():
+        fields[number, mask_indices(mask)] = 1
+    return numbers, fields
+
+
+def layout_chunks(count: int, chunk_size: int = 10000, rng=random):
+    """
+    Generates random fleets in chunks of placement numbers
+    :param count: number of fleets to generate
+    :type count: int
+    :param chunk_size: maximum number of fleets in a chunk
+    :type chunk_size: int
+    :param rng: source of randomness, a random.Random instance or the random
+    module
+    :return: a generator of arrays with a row of placement numbers of every
+    ship for every fleet in the chunk
+    """
+    numbers, _ = placement_numbers()
+    layouts = random_fleet_layouts(count, rng)
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        chunk = np.fromiter(
+            (numbers[mask] for _, layout in zip(range(size), layouts)
+             for mask in layout),
+            dtype=np.int64, count=size * len(SHIP_SIZES))
+        yield chunk.reshape(size, len(SHIP_SIZES))
+
+
+def ship_heatmaps(count: int, chunk_size: int = 10000,
+                  rng=random) -> np.ndarray:
+    """
+    Counts how many times every ship of a random fleet occupies every field.
+    Only the counts of placements are accumulated for every chunk, so the
+    memory used doesn't depend on the number of fleets
+    :param count: number of fleets to generate
+    :type count: int
+    :param chunk_size: number of fleets processed at once
+    :type chunk_size: int
+    :param rng: source of randomness, a random.Random instance or the random
+    module
+    :return: an array of shape (ships, 10, 10) indexed with the ship's
+    number and the field's array coordinates y and x
+    """
+    numbers, fields = placement_numbers()
+    ships = len(SHIP_SIZES)
+    offsets = np.arange(ships, dtype=np.int64) * len(numbers)
+    counts = np.zeros(ships * len(numbers), dtype=np.int64)
+    for chunk in layout_chunks(count, chunk_size, rng):
+        counts += np.bincount((chunk + offsets).ravel(),
+                              minlength=counts.size)
+    heatmaps = counts.reshape(ships, len(numbers)) @ fields
+    return heatmaps.reshape(ships, 10, 10)
+
+
+def fleet_heatmap(count: int, chunk_size: int = 10000,
+                  rng=random) -> np.ndarray:
+    """
+    Counts how many times any ship of a random fleet occupies every field
+    :param count: number of fleets to generate
+    :type count: int
+    :param chunk_size: number of fleets processed at once
+    :type chunk_size: int
+    :param rng: source of randomness, a random.Random instance or the random
+    module
+    :return: an array of shape (10, 10) indexed with the field's array
+    coordinates y and x
+    """
+    return ship_heatmaps(count, chunk_size, rng).sum(axis=0)
+
+
+def heatmap_to_dataset(heatmap: np.ndarray) -> np.ndarray:
+    """
+    Transposes a heatmap to the layout used in the plots, with a row for
+    every letter coordinate and a column for every number coordinate
+    :param heatmap: heatmap indexed with array coordinates y and x
+    :type heatmap: np.ndarray
+    :return: the transposed heatmap
+    """
+    return heatmap.T
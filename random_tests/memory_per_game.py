@@ -0,0 +1,49 @@
+import gc
+import random
+import tracemalloc
+
+from fleet_creator import FleetCreator
+from game import Game
+from settings import Setting
+
+games_amount = 1000
+
+
+def play_game(rng: random.Random) -> Game:
+    """
+    Plays a whole game between a player shooting at random fields and the
+    harder computer enemy
+    """
+    creator = FleetCreator(rng)
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                         Setting.HARD_ENEMY: True})
+    game.start_game(board, fleet, rng)
+    targets = [(x, y) for x in "abcdefghij" for y in range(1, 11)]
+    rng.shuffle(targets)
+    while not game.won():
+        if game.players_turn():
+            x, y = targets.pop()
+            game.discover_field(x, y)
+        else:
+            game.enemy_move()
+        game.get_display_messages()
+        game.get_changes()
+    return game
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    # warm up the caches of the placement tables before measuring
+    play_game(rng)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = [play_game(rng) for _ in range(games_amount)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{len(games)} finished games kept in memory")
+    print(f"{(after - before) / games_amount:.0f} bytes per game")
@@ -0,0 +1,89 @@
+import csv
+import random
+from datetime import datetime
+from statistics import mean, stdev
+
+from board import return_all_field_coordinates
+from enemy import Enemy, EnemyMode
+from fleet import random_fleet_layouts
+from game import ENEMY_TIME_BUDGET_MS, ENEMY_MAX_SAMPLES
+from results import ResultsWriter
+from simulate import simulate_game, ScriptedShooter
+
+tests_amount = 1000
+results_path = "monte_carlo_strength_results.csv"
+headers = [
+    "density_moves", "density_results",
+    "monte_carlo_moves", "monte_carlo_results", "monte_carlo_move_ms",
+    "monte_carlo_dead_ends"
+]
+
+
+def print_summary(path: str):
+    """
+    Prints the average number of moves and the number of wins of both
+    enemies in the games saved in the results file, how many moves fewer
+    the Monte Carlo enemy needed on the same fleets, and how many of its
+    sampled layouts were dead ends
+    :param path: path to the results file
+    :type path: str
+    """
+    with open(path, newline='') as file_handle:
+        rows = list(csv.DictReader(file_handle))
+    for mode in ("density", "monte_carlo"):
+        moves = [int(row[f"{mode}_moves"]) for row in rows]
+        wins = sum(row[f"{mode}_results"] == "1" for row in rows)
+        error = stdev(moves) / len(moves) ** 0.5
+        print(f"{mode}: {mean(moves):.2f} ± {error:.2f} moves, "
+              f"won {wins} of {len(rows)} games")
+    differences = [int(row["density_moves"]) - int(row["monte_carlo_moves"])
+                   for row in rows]
+    error = stdev(differences) / len(differences) ** 0.5
+    print(f"monte_carlo: {mean(differences):.2f} ± {error:.2f} moves fewer "
+          f"on the same fleets")
+    move_ms = mean(float(row["monte_carlo_move_ms"]) for row in rows)
+    print(f"monte_carlo: {move_ms:.1f} ms per move")
+    dead_ends = mean(float(row["monte_carlo_dead_ends"]) for row in rows)
+    print(f"monte_carlo: {dead_ends:.2f}% of sampled layouts were dead ends")
+
+
+if __name__ == "__main__":
+    fields_queue = return_all_field_coordinates()
+    # both enemies play against the same fleets and the same player as in
+    # enemy_ai_test.py, the Monte Carlo enemy samples as many layouts as it
+    # can in the time budget of the Game, so the results depend on the speed
+    # of the machine they were played on, and resuming the test continues
+    # with the next game, but doesn't repeat the games already played
+    with ResultsWriter(results_path, headers) as writer:
+        for i in range(writer.completed(), tests_amount):
+            rng = random.Random(i)
+            player_layout, enemy_layout = random_fleet_layouts(2, rng)
+            density_game = simulate_game(
+                ScriptedShooter(fields_queue),
+                Enemy(mode=EnemyMode.DENSITY, rng=rng), player_layout,
+                enemy_layout)
+            monte_carlo = Enemy(mode=EnemyMode.MONTE_CARLO, rng=rng,
+                                time_budget_ms=ENEMY_TIME_BUDGET_MS,
+                                max_samples=ENEMY_MAX_SAMPLES)
+            monte_carlo_game = simulate_game(ScriptedShooter(fields_queue),
+                                             monte_carlo, player_layout,
+                                             enemy_layout)
+            move_times = monte_carlo.move_times()
+            sampling_stats = monte_carlo.sampling_stats()
+            layouts = sum(stats.layouts for stats in sampling_stats)
+            dead_ends = sum(stats.dead_ends for stats in sampling_stats)
+            writer.write({
+                "density_moves": density_game.shots[1],
+                "density_results": density_game.winner,
+                "monte_carlo_moves": monte_carlo_game.shots[1],
+                "monte_carlo_results": monte_carlo_game.winner,
+                "monte_carlo_move_ms": round(
+                    mean(move_time.elapsed_ms for move_time in move_times), 2),
+                "monte_carlo_dead_ends": round(
+                    100 * dead_ends / max(layouts, 1), 2)
+            })
+            if i % 100 == 0:
+                now = datetime.now()
+                time = now.strftime("%H:%M:%S")
+                print(f"[{time}] Processed {i} boards...")
+    print_summary(results_path)
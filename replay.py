@@ -0,0 +1,145 @@
+import random
+from typing import List, NamedTuple
+
+import board
+from board import BitBoard
+from fleet import Fleet
+from game import Game, ReplayMove, REPLAY_VERSION, REPLAY_RECORD_SIZE, \
+    REPLAY_MOVES, decode_settings
+
+
+class ReplayHeader(NamedTuple):
+    """
+    Beginning of a replay, describing the game at its start. Fleets are
+    encoded with Fleet.snapshot(), and records contains the moves, made after
+    the header
+    """
+    settings: dict
+    player_fleet: bytes
+    enemy_fleet: bytes
+    records: bytes
+
+
+def read_replay(replay: bytes) -> ReplayHeader:
+    """
+    Splits a replay created by Game.get_replay() into its parts
+    :param replay: the replay
+    :type replay: bytes
+    :return: ReplayHeader with the parts of the replay
+    :raises ValueError: if the data isn't a replay
+    """
+    if len(replay) < 3 or replay[0] != REPLAY_VERSION:
+        raise ValueError("invalid replay")
+    player_length = replay[2]
+    player_fleet = replay[3:3 + player_length]
+    position = 3 + player_length
+    if position >= len(replay):
+        raise ValueError("invalid replay")
+    enemy_length = replay[position]
+    enemy_fleet = replay[position + 1:position + 1 + enemy_length]
+    records = replay[position + 1 + enemy_length:]
+    if len(enemy_fleet) != enemy_length \
+            or len(records) % REPLAY_RECORD_SIZE:
+        raise ValueError("invalid replay")
+    return ReplayHeader(decode_settings(replay[1]), player_fleet,
+                        enemy_fleet, records)
+
+
+def decode_moves(records: bytes):
+    """
+    Decodes the records of moves of a replay one by one, without
+    reconstructing the game
+    :param records: records from a ReplayHeader
+    :type records: bytes
+    :return: a generator of tuples with the ReplayMove and the field's
+    coordinates
+    """
+    for start in range(0, len(records), REPLAY_RECORD_SIZE):
+        code, index = records[start:start + REPLAY_RECORD_SIZE]
+        yield REPLAY_MOVES[code], board.INDEX_TO_FIELD[index]
+
+
+class ReplayPlayer:
+    """
+    Reconstructs positions of a game recorded with Game.get_replay(), by
+    starting a game with the recorded fleets and repeating the moves. Every
+    checkpoint_interval moves, the reconstructed game's snapshot is kept once
+    it's reached, so going to any position only repeats the moves made since
+    the closest checkpoint before it
+    """
+
+    def __init__(self, replay: bytes, checkpoint_interval: int = 16,
+                 rng=random):
+        """
+        Reads the replay and starts the recorded game
+        :param replay: the replay
+        :type replay: bytes
+        :param checkpoint_interval: number of moves between the checkpoints
+        :type checkpoint_interval: int
+        :param rng: source of randomness used by the enemy in reconstructed
+        games, it doesn't change the positions, since the enemy's shots and
+        the order of its fields to shoot at are recorded
+        :raises ValueError: if the data isn't a replay
+        """
+        header = read_replay(replay)
+        self._moves = []
+        # the enemy's fields to shoot at recorded after a move, by the
+        # number of the move
+        self._enemy_targets = {}
+        for move, field in decode_moves(header.records):
+            if move != ReplayMove.ENEMY_TARGET:
+                self._moves.append((move, field))
+            elif self._moves:
+                self._enemy_targets.setdefault(len(self._moves) - 1,
+                                               []).append(field)
+            else:
+                raise ValueError("invalid replay")
+        self._checkpoint_interval = checkpoint_interval
+        self._rng = rng
+        player_fleet = Fleet()
+        player_fleet.restore(header.player_fleet)
+        enemy_fleet = Fleet()
+        enemy_fleet.restore(header.enemy_fleet)
+        player_board = BitBoard()
+        player_board.place_fleet(player_fleet)
+        game = Game()
+        game.apply_settings(header.settings)
+        game.start_game(player_board, player_fleet, rng, enemy_fleet)
+        self._checkpoints = {0: game.snapshot()}
+
+    def moves(self) -> List[tuple]:
+        """
+        Returns all moves of the replay, without the enemy's fields to shoot
+        at recorded after them
+        :return: a list of tuples with the ReplayMove and the field's
+        coordinates
+        """
+        return self._moves
+
+    def move_count(self) -> int:
+        return len(self._moves)
+
+    def position(self, move_number: int) -> Game:
+        """
+        Reconstructs the game after the given number of moves
+        :param move_number: number of moves made, from 0 for the start of the
+        game to move_count() for its end
+        :type move_number: int
+        :return: a Game in the reconstructed position, which continues like a
+        game restored from a snapshot
+        :raises IndexError: if the replay doesn't have that many moves
+        :raises ValueError: if a move doesn't match the reconstructed game
+        """
+        if not 0 <= move_number <= len(self._moves):
+            raise IndexError(f"replay has {len(self._moves)} moves")
+        start = move_number - move_number % self._checkpoint_interval
+        while start not in self._checkpoints:
+            start -= self._checkpoint_interval
+        game = Game()
+        game.restore(self._checkpoints[start], self._rng)
+        for number in range(start, move_number):
+            move, (x, y) = self._moves[number]
+            game.replay_move(move, x, y, self._enemy_targets.get(number))
+            if (number + 1) % self._checkpoint_interval == 0:
+                self._checkpoints.setdefault(number + 1, game.snapshot())
+        return game
@@ -0,0 +1,146 @@
+import csv
+import os
+from typing import List
+
+
+class ResultsWriter:
+    """
+    Writes records of a simulation run to a CSV file in chunks, so memory use
+    doesn't grow with the length of the run and a crash loses at most one
+    chunk. If the file already contains records with the same columns, new
+    records are appended after them, which allows resuming an interrupted run
+    """
+
+    def __init__(self, path: str, fieldnames: List[str],
+                 chunk_size: int = 100):
+        """
+        Opens the results file, creating it if it doesn't exist. A partially
+        written last line, left by a crash, is removed
+        :param path: path to the CSV file
+        :type path: str
+        :param fieldnames: names of the columns
+        :type fieldnames: list
+        :param chunk_size: number of records kept in memory before they are
+        written to the file
+        :type chunk_size: int
+        :raises ValueError: if the file has different columns
+        """
+        self._fieldnames = list(fieldnames)
+        self._chunk_size = chunk_size
+        self._chunk = []
+        self._completed = 0
+        if os.path.exists(path) and os.path.getsize(path):
+            self._completed = _prepare_for_resume(path, self._fieldnames)
+            self._file = open(path, 'a', newline='')
+            self._writer = csv.DictWriter(self._file, self._fieldnames)
+        else:
+            self._file = open(path, 'w', newline='')
+            self._writer = csv.DictWriter(self._file, self._fieldnames)
+            self._writer.writeheader()
+            self._file.flush()
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def completed(self) -> int:
+        """
+        Returns the number of records in the file, including the ones written
+        before resuming and the ones waiting in the current chunk
+        """
+        return self._completed + len(self._chunk)
+
+    def write(self, record: dict):
+        """
+        Adds a record to the current chunk, writing the chunk to the file once
+        it's full
+        :param record: dictionary mapping column names to values, missing
+        columns are left empty
+        :type record: dict
+        """
+        self._chunk.append(record)
+        if len(self._chunk) >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the current chunk to the file and makes sure it reaches the
+        disk
+        """
+        if not self._chunk:
+            return
+        self._writer.writerows(self._chunk)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._completed += len(self._chunk)
+        self._chunk = []
+
+    def close(self):
+        """
+        Writes the remaining records and closes the file
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+
+def _prepare_for_resume(path: str, fieldnames: List[str]) -> int:
+    """
+    Checks the columns of an existing results file, removes an incomplete
+    last line and counts the records in it
+    :param path: path to the CSV file
+    :type path: str
+    :param fieldnames: expected names of the columns
+    :type fieldnames: list
+    :return: number of records in the file
+    :raises ValueError: if the file has different columns
+    """
+    with open(path, 'rb+') as file_handle:
+        content = file_handle.read()
+        complete_length = content.rfind(b'\n') + 1
+        if complete_length < len(content):
+            file_handle.truncate(complete_length)
+    with open(path, newline='') as file_handle:
+        reader = csv.reader(file_handle)
+        header = next(reader, None)
+        if header != fieldnames:
+            raise ValueError(f"{path} has columns {header}, expected "
+                             f"{fieldnames}")
+        return sum(1 for _ in reader)
+
+
+def read_results(path: str, converters: dict = None):
+    """
+    Reads records from a results file one by one, without loading the whole
+    file into memory
+    :param path: path to the CSV file
+    :type path: str
+    :param converters: dictionary mapping column names to functions
+    converting their values, like int, other columns are left as strings
+    :type converters: dict
+    :return: a generator of dictionaries mapping column names to values
+    """
+    if converters is None:
+        converters = {}
+    with open(path, newline='') as file_handle:
+        for record in csv.DictReader(file_handle):
+            for name, converter in converters.items():
+                record[name] = converter(record[name])
+            yield record
+
+
+def read_column(path: str, name: str, converter=str):
+    """
+    Reads values of a single column from a results file one by one
+    :param path: path to the CSV file
+    :type path: str
+    :param name: name of the column
+    :type name: str
+    :param converter: function converting the values, like int
+    :return: a generator of the column's values
+    """
+    for record in read_results(path, {name: converter}):
+        yield record[name]
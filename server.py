@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+
+from board import field_on_board
+from fleet_creator import FleetCreator
+from game import Game, ENEMY_TIME_BUDGET_MS
+from settings import Setting
+
+
+def _encode_change(change) -> dict:
+    """
+    Converts a GameChange to a dictionary that can be sent as JSON
+    :param change: the change to convert
+    :type change: GameChange
+    :return: a dictionary with names of the view and statuses
+    """
+    return {
+        "view": change.view.name,
+        "position": list(change.position),
+        "old": change.old_status.name,
+        "new": change.new_status.name
+    }
+
+
+class ProtocolError(Exception):
+    """
+    Raised when a client sends a request the server can't handle
+    """
+
+
+def _coordinates(request: dict) -> tuple[str, int]:
+    """
+    Reads field coordinates from a request
+    :param request: a request with "x" and "y" keys
+    :type request: dict
+    :return: a tuple with field coordinates
+    :raises ProtocolError: if the coordinates are missing or invalid
+    """
+    x, y = request.get("x"), request.get("y")
+    if not isinstance(x, str) or type(y) is not int \
+            or not field_on_board((x, y)):
+        raise ProtocolError("invalid coordinates")
+    return x, y
+
+
+class GameSession:
+    """
+    A single client's game against the computer enemy. The Game is only
+    created once the client starts it, so idle connections stay cheap
+    """
+
+    __slots__ = ('_game', '_move_budget_ms')
+
+    def __init__(self, move_budget_ms: float = ENEMY_TIME_BUDGET_MS):
+        """
+        Creates a session without a game
+        :param move_budget_ms: time limit of every move of the enemy in
+        milliseconds
+        :type move_budget_ms: float
+        """
+        self._game = None
+        self._move_budget_ms = move_budget_ms
+
+    def _state(self) -> dict:
+        """
+        Creates a response describing what happened since the last response
+        :return: a dictionary with the game's messages, changes of the boards
+        and fleets and the game's state
+        """
+        return {
+            "messages": [message.name
+                         for message in self._game.get_display_messages()],
+            "changes": [_encode_change(change)
+                        for change in self._game.get_changes()],
+            "players_turn": self._game.players_turn(),
+            "won": self._game.won()
+        }
+
+    def start(self, request: dict) -> dict:
+        """
+        Starts a new game with a random fleet for the player
+        :param request: the start request, optionally containing settings
+        and a seed for the random number generator
+        :type request: dict
+        :return: the response to send
+        """
+        seed = request.get("seed")
+        if seed is not None and type(seed) is not int:
+            raise ProtocolError("seed must be an integer")
+        rng = random.Random(seed)
+        creator = FleetCreator(rng)
+        creator.start()
+        board, fleet = creator.get_setup()
+        self._game = Game()
+        self._game.apply_settings({
+            Setting.MARK_MISSES_AROUND: bool(
+                request.get("mark_misses_around", True)),
+            Setting.HARD_ENEMY: bool(request.get("hard_enemy", False)),
+            Setting.DENSITY_ENEMY: bool(request.get("density_enemy", False)),
+            Setting.MONTE_CARLO_ENEMY: bool(
+                request.get("monte_carlo_enemy", False))
+        })
+        self._game.start_game(board, fleet, rng)
+        response = self._state()
+        response["fleet"] = [[ship.origin()[0], ship.origin()[1],
+                              ship.size(), ship.vertical()]
+                             for ship in fleet.ships()]
+        return response
+
+    async def shoot(self, request: dict) -> dict:
+        """
+        Shoots at a field of the enemy's board, and then lets the enemy make
+        all of its moves. The enemy chooses its targets in the event loop's
+        default executor, so other sessions keep running while it thinks, and
+        every choice takes at most the move's time limit
+        :param request: the shoot request with the field's coordinates
+        :type request: dict
+        :return: the response to send, which also contains the times taken by
+        the enemy's moves in milliseconds
+        """
+        x, y = _coordinates(request)
+        self._game.discover_field(x, y)
+        moves_before = len(self._game.enemy_move_times())
+        loop = asyncio.get_running_loop()
+        while not self._game.players_turn() and not self._game.won():
+            target = await loop.run_in_executor(
+                None, self._game.choose_enemy_target, self._move_budget_ms)
+            self._game.enemy_move(target)
+        response = self._state()
+        response["enemy_move_ms"] = [
+            move_time.elapsed_ms
+            for move_time in self._game.enemy_move_times()[moves_before:]]
+        return response
+
+    def mark(self, request: dict) -> dict:
+        x, y = _coordinates(request)
+        self._game.mark_field(x, y)
+        return self._state()
+
+    def unmark(self, request: dict) -> dict:
+        x, y = _coordinates(request)
+        self._game.unmark_field(x, y)
+        return self._state()
+
+    def started(self) -> bool:
+        return self._game is not None
+
+
+class GameServer:
+    """
+    Server hosting games against the computer enemy over TCP. Clients send
+    one JSON object per line, with a "command" key set to "start", "shoot",
+    "mark" or "unmark", and "x" and "y" keys with the field's coordinates for
+    the last three. "start" can also contain the "hard_enemy",
+    "density_enemy", "monte_carlo_enemy" and "mark_misses_around" settings
+    and a "seed". Every request gets a single line response, with the game's
+    messages, changes of the boards and fleets since the last response and
+    whose turn it is, or an "error" if the request was invalid. Responses to
+    "shoot" also list the times taken by the enemy's moves. Requests are
+    handled in a single thread, and the enemies choose their targets on the
+    threads of the event loop's default executor, so a thinking enemy doesn't
+    block other sessions
+    """
+
+    def __init__(self, move_budget_ms: float = ENEMY_TIME_BUDGET_MS):
+        """
+        Creates a server which isn't listening yet
+        :param move_budget_ms: time limit of every move of the enemies in
+        milliseconds, which bounds the time a client waits for a move
+        :type move_budget_ms: float
+        """
+        self._sessions = set()
+        self._server = None
+        self._move_budget_ms = move_budget_ms
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Starts listening for connections
+        :param host: address to listen on
+        :type host: str
+        :param port: port to listen on, a free one is chosen if it's 0
+        :type port: int
+        """
+        self._server = await asyncio.start_server(self._handle_connection,
+                                                  host, port)
+
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    def sessions(self) -> int:
+        return len(self._sessions)
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        """
+        Handles requests of a single client until it disconnects
+        :param reader: stream to read the requests from
+        :type reader: asyncio.StreamReader
+        :param writer: stream to write the responses to
+        :type writer: asyncio.StreamWriter
+        """
+        session = GameSession(self._move_budget_ms)
+        self._sessions.add(session)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                response = await self._handle_request(session, line)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._sessions.discard(session)
+            writer.close()
+
+    async def _handle_request(self, session: GameSession,
+                              line: bytes) -> dict:
+        """
+        Executes a single request
+        :param session: session of the client which sent the request
+        :type session: GameSession
+        :param line: the request, a line with a JSON object
+        :type line: bytes
+        :return: the response to send
+        """
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"error": "invalid JSON"}
+        try:
+            if not isinstance(request, dict):
+                raise ProtocolError("request must be a JSON object")
+            command = request.get("command")
+            if command == "start":
+                return session.start(request)
+            if command not in ("shoot", "mark", "unmark"):
+                raise ProtocolError(f"unknown command {command}")
+            if not session.started():
+                raise ProtocolError("game not started")
+            if command == "shoot":
+                return await session.shoot(request)
+            if command == "mark":
+                return session.mark(request)
+            return session.unmark(request)
+        except ProtocolError as error:
+            return {"error": str(error)}
+
+
+def main(argv):
+    """
+    Parses the command line arguments and runs the server
+    :param argv: command line arguments
+    :type argv: list
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="port to listen on")
+    parser.add_argument("--move-budget", type=float,
+                        default=ENEMY_TIME_BUDGET_MS,
+                        help="time limit of every move of the enemy in "
+                             "milliseconds")
+    args = parser.parse_args(argv[1:])
+
+    async def run():
+        server = GameServer(args.move_budget)
+        await server.start(args.host, args.port)
+        print(f"Listening on {args.host}:{server.port()}")
+        await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -6,7 +6,9 @@ from json import JSONDecodeError
 
 class Setting(Enum):
     MARK_MISSES_AROUND = 0,
-    HARD_ENEMY = 1
+    HARD_ENEMY = 1,
+    DENSITY_ENEMY = 2,
+    MONTE_CARLO_ENEMY = 3
 
 
 class Settings:
@@ -22,7 +24,9 @@ class Settings:
         """
         self._default_settings = {
             Setting.MARK_MISSES_AROUND: True,
-            Setting.HARD_ENEMY: False
+            Setting.HARD_ENEMY: False,
+            Setting.DENSITY_ENEMY: False,
+            Setting.MONTE_CARLO_ENEMY: False
         }
         self._path = path
         self._settings = self._default_settings
@@ -39,6 +43,18 @@ class Settings:
         """
         self._settings[Setting.HARD_ENEMY] = new_state
 
+    def set_density_enemy(self, new_state: bool):
+        """
+        Toggles the "Probability-based targeting" setting of the harder enemy
+        """
+        self._settings[Setting.DENSITY_ENEMY] = new_state
+
+    def set_monte_carlo_enemy(self, new_state: bool):
+        """
+        Toggles the "Sampling-based targeting" setting of the harder enemy
+        """
+        self._settings[Setting.MONTE_CARLO_ENEMY] = new_state
+
     def load_settings(self):
         """
         Loads settings from the specified settings file
@@ -53,6 +69,11 @@ class Settings:
                         "mark_misses_around"]
                     self._settings[Setting.HARD_ENEMY] = settings_json[
                         "hard_enemy"]
+                    # missing in settings files saved by older versions
+                    self._settings[Setting.DENSITY_ENEMY] = \
+                        settings_json.get("density_enemy", False)
+                    self._settings[Setting.MONTE_CARLO_ENEMY] = \
+                        settings_json.get("monte_carlo_enemy", False)
             except (JSONDecodeError, PermissionError, KeyError):
                 return
 
@@ -65,7 +86,10 @@ class Settings:
                 settings_dict = {
                     "mark_misses_around": self._settings[
                         Setting.MARK_MISSES_AROUND],
-                    "hard_enemy": self._settings[Setting.HARD_ENEMY]
+                    "hard_enemy": self._settings[Setting.HARD_ENEMY],
+                    "density_enemy": self._settings[Setting.DENSITY_ENEMY],
+                    "monte_carlo_enemy": self._settings[
+                        Setting.MONTE_CARLO_ENEMY]
                 }
                 json.dump(settings_dict, file_handle, indent=4)
         except PermissionError:
@@ -0,0 +1,212 @@
+import random
+from typing import List, NamedTuple
+
+import board
+from fleet import Fleet, Ship, random_fleet_layouts, fields_around_ship
+from game import ReplayMove, REPLAY_CODES, replay_header, \
+    enemy_target_records
+from settings import Setting
+
+
+class MatchResult(NamedTuple):
+    """
+    Result of a simulated game. winner is 0 if the first shooter won and 1 if
+    the second one did, shots contains the number of shots fired by each
+    shooter and rounds is the number of turns the first shooter had. replay
+    is only set for recorded games
+    """
+    winner: int
+    shots: tuple[int, int]
+    rounds: int
+    replay: bytes = None
+
+
+# codes of misses, hits and sinks of each shooter in a replay
+_SHOT_CODES = (
+    tuple(REPLAY_CODES[move] for move in (
+        ReplayMove.PLAYER_MISS, ReplayMove.PLAYER_HIT,
+        ReplayMove.PLAYER_SINK)),
+    tuple(REPLAY_CODES[move] for move in (
+        ReplayMove.ENEMY_MISS, ReplayMove.ENEMY_HIT, ReplayMove.ENEMY_SINK))
+)
+
+
+class ScriptedShooter:
+    """
+    Shooter which fires at fields in a predefined order, ignoring the results
+    of its shots. Has the same interface as the Enemy, so both can be used in
+    simulate_game()
+    """
+
+    def __init__(self, targets: List[tuple]):
+        """
+        Creates a shooter firing at the given targets
+        :param targets: coordinates of fields to shoot at, in order
+        :type targets: list
+        """
+        self._targets = targets
+        self._next_target = 0
+
+    def shoot(self, deadline_ms: float = None) -> tuple[str, int]:
+        """
+        Chooses the next field from the list of targets
+        :param deadline_ms: time limit of the move, unused since choosing the
+        target takes constant time
+        :type deadline_ms: float
+        :return: a tuple with field coordinates
+        """
+        target = self._targets[self._next_target]
+        self._next_target += 1
+        return target
+
+    def react_to_hit(self):
+        pass
+
+    def pending_targets(self) -> list:
+        return []
+
+    def react_to_sink(self):
+        pass
+
+    def mark_as_empty(self) -> list:
+        return []
+
+
+def fleet_layout(fleet_to_convert: Fleet) -> tuple:
+    """
+    Converts a Fleet to the layout used by random_fleet_layouts()
+    :param fleet_to_convert: Fleet to convert
+    :type fleet_to_convert: Fleet
+    :return: a tuple with masks of fields occupied by every ship of the fleet
+    """
+    return tuple(board.ship_mask(ship) for ship in fleet_to_convert.ships())
+
+
+def layout_fleet(layout: tuple) -> Fleet:
+    """
+    Converts a layout used by random_fleet_layouts() to a Fleet
+    :param layout: a tuple with masks of fields occupied by every ship
+    :type layout: tuple
+    :return: a Fleet with the ships in the same order
+    """
+    ships = []
+    for mask in layout:
+        indices = board.mask_indices(mask)
+        vertical = len(indices) == 1 or indices[1] - indices[0] == 10
+        ships.append(Ship(board.INDEX_TO_FIELD[indices[0]], len(indices),
+                          vertical))
+    return Fleet(ships)
+
+
+class _TargetFleet:
+    """
+    Fleet being shot at in a simulated game, storing only the number of the
+    ship on every field and the number of segments of every ship afloat
+    """
+
+    def __init__(self, layout: tuple):
+        """
+        Creates a fleet from a layout
+        :param layout: a tuple with masks of fields occupied by every ship
+        :type layout: tuple
+        """
+        self.ship_on_field = {}
+        self.segments_afloat = []
+        for number, mask in enumerate(layout):
+            for index in board.mask_indices(mask):
+                self.ship_on_field[board.INDEX_TO_FIELD[index]] = number
+            self.segments_afloat.append(bin(mask).count('1'))
+        self.ships_afloat = len(layout)
+
+
+def simulate_game(first, second, first_layout: tuple = None,
+                  second_layout: tuple = None, rng=random,
+                  settings: dict = None,
+                  deadline_ms: float = None) -> MatchResult:
+    """
+    Plays a whole game between two shooters, without creating any boards or
+    messages. Shooters are objects with the same interface as the Enemy, the
+    first shooter makes the first move, and just like in the Game, a shooter
+    moves again after hitting a ship. Shots at fields without a ship afloat
+    are misses. If settings are given, the game is recorded as a replay of a
+    Game in which the first shooter is the player and the second one is the
+    enemy, which can be played by a ReplayPlayer if the second shooter is an
+    Enemy in the mode chosen by the settings. Just like in the Game, the
+    first shooter's shots at fields outside the board or already discovered
+    ones, including the fields marked around sunken ships if misses are
+    marked around them, are then ignored and don't end its turn
+    :param first: the shooter making the first move
+    :param second: the other shooter
+    :param first_layout: layout of the first shooter's fleet, which the
+    second one shoots at, a random one if not specified
+    :type first_layout: tuple
+    :param second_layout: layout of the second shooter's fleet, which the
+    first one shoots at, a random one if not specified
+    :type second_layout: tuple
+    :param rng: source of randomness used to create the random layouts, a
+    random.Random instance or the random module
+    :param settings: settings of the recorded Game, the game isn't recorded
+    if they're None
+    :type settings: dict
+    :param deadline_ms: time limit of every move in milliseconds, passed to
+    the shooters' shoot(), if None they use their own time budgets
+    :type deadline_ms: float
+    :return: MatchResult of the game
+    """
+    if first_layout is None:
+        first_layout = next(random_fleet_layouts(1, rng))
+    if second_layout is None:
+        second_layout = next(random_fleet_layouts(1, rng))
+    replay = None
+    # fields of the second shooter's board discovered by the first shooter,
+    # only tracked in recorded games
+    discovered = None
+    if settings is not None:
+        second_fleet = layout_fleet(second_layout)
+        replay = bytearray(replay_header(settings, layout_fleet(first_layout),
+                                         second_fleet))
+        discovered = set()
+        mark_misses_around = settings.get(Setting.MARK_MISSES_AROUND, False)
+    shooters = (first, second)
+    targets = (_TargetFleet(second_layout), _TargetFleet(first_layout))
+    shots = [0, 0]
+    rounds = 1
+    turn = 0
+    while True:
+        shooter = shooters[turn]
+        target = targets[turn]
+        field = shooter.shoot(deadline_ms)
+        if discovered is not None and not turn:
+            if field in discovered or not board.field_on_board(field):
+                continue
+            discovered.add(field)
+        shots[turn] += 1
+        ship = target.ship_on_field.pop(field, None)
+        if ship is None:
+            if replay is not None:
+                replay += bytes((_SHOT_CODES[turn][0],
+                                 board.FIELD_INDICES[field]))
+            shooter.mark_as_empty()
+            turn = 1 - turn
+            rounds += 1 - turn
+            continue
+        shooter.react_to_hit()
+        target.segments_afloat[ship] -= 1
+        sunk = not target.segments_afloat[ship]
+        if replay is not None:
+            replay += bytes((_SHOT_CODES[turn][1 + sunk],
+                             board.FIELD_INDICES[field]))
+        if sunk:
+            if discovered is not None and not turn and mark_misses_around:
+                discovered.update(
+                    fields_around_ship(second_fleet.ships()[ship]))
+            shooter.react_to_sink()
+            target.ships_afloat -= 1
+            if not target.ships_afloat:
+                if replay is not None:
+                    replay = bytes(replay)
+                return MatchResult(turn, (shots[0], shots[1]), rounds,
+                                   replay)
+        elif replay is not None and turn:
+            replay += enemy_target_records(shooter.pending_targets())
+        shooter.mark_as_empty()
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from archive import GameArchive, Winner
+from board import return_all_field_coordinates
+from enemy import Enemy, EnemyMode
+from fleet_creator import FleetCreator
+from game import Game
+from replay import ReplayPlayer
+from settings import Setting
+from simulate import simulate_game, ScriptedShooter
+
+MODE_SETTINGS = {
+    EnemyMode.EASY: {Setting.MARK_MISSES_AROUND: False,
+                     Setting.HARD_ENEMY: False,
+                     Setting.DENSITY_ENEMY: False},
+    EnemyMode.HARD: {Setting.MARK_MISSES_AROUND: False,
+                     Setting.HARD_ENEMY: True,
+                     Setting.DENSITY_ENEMY: False},
+    EnemyMode.DENSITY: {Setting.MARK_MISSES_AROUND: False,
+                        Setting.HARD_ENEMY: True,
+                        Setting.DENSITY_ENEMY: True},
+    EnemyMode.MONTE_CARLO: {Setting.MARK_MISSES_AROUND: False,
+                            Setting.HARD_ENEMY: True,
+                            Setting.MONTE_CARLO_ENEMY: True}
+}
+
+
+def recorded_games(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    fields = return_all_field_coordinates()
+    results = []
+    for number in range(count):
+        mode = list(EnemyMode)[number % len(EnemyMode)]
+        results.append((mode, simulate_game(
+            ScriptedShooter(fields), Enemy(mode=mode, rng=rng), rng=rng,
+            settings=MODE_SETTINGS[mode])))
+    return results
+
+
+def test_archive_find():
+    games = recorded_games(30, 1)
+    with GameArchive(":memory:", batch_size=7) as archive:
+        for _, result in games:
+            archive.add(result.replay)
+        assert archive.count() == 30
+        found = list(archive.find())
+        assert [game.replay for game in found] == \
+            [result.replay for _, result in games]
+        for game, (mode, result) in zip(found, games):
+            assert game.enemy_mode == mode
+            assert game.winner == [Winner.PLAYER, Winner.ENEMY][result.winner]
+            assert (game.player_shots, game.enemy_shots) == result.shots
+            assert game.moves == sum(result.shots)
+        expected = [result.replay for mode, result in games
+                    if mode == EnemyMode.HARD and result.winner == 0
+                    and sum(result.shots) > 70]
+        assert [game.replay for game in archive.find(
+            EnemyMode.HARD, Winner.PLAYER, min_moves=71)] == expected
+        assert archive.count(EnemyMode.HARD, Winner.PLAYER,
+                             min_moves=71) == len(expected)
+        assert archive.count(max_moves=0) == 0
+
+
+def test_archive_persistent(tmp_path):
+    path = str(tmp_path / "games.sqlite")
+    games = recorded_games(5, 2)
+    with GameArchive(path) as archive:
+        for _, result in games[:3]:
+            archive.add(result.replay)
+    with GameArchive(path) as archive:
+        for _, result in games[3:]:
+            archive.add(result.replay)
+    with GameArchive(path) as archive:
+        assert [game.game_id for game in archive.find()] == [1, 2, 3, 4, 5]
+        replay = next(archive.find(EnemyMode.DENSITY)).replay
+        player = ReplayPlayer(replay)
+        assert player.position(player.move_count()).won()
+
+
+def test_archive_game_replay():
+    rng = random.Random(3)
+    creator = FleetCreator(rng)
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                         Setting.HARD_ENEMY: True})
+    game.start_game(board, fleet, rng)
+    with GameArchive(":memory:") as archive:
+        with pytest.raises(ValueError):
+            archive.add(game.get_replay())
+        targets = return_all_field_coordinates()
+        while not game.won():
+            if game.players_turn():
+                game.discover_field(*targets.pop())
+            else:
+                game.enemy_move()
+        archive.add(game.get_replay())
+        archived = next(archive.find())
+        assert archived.enemy_mode == EnemyMode.HARD
+        assert archived.replay == game.get_replay()
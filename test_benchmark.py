@@ -0,0 +1,158 @@
+import itertools
+import random
+
+import pytest
+
+from board import Board, BitBoard, GameBoard, ALL_FIELDS, FieldStatus
+from enemy import Enemy, EnemyMode
+from fleet import Fleet, Ship
+from fleet_creator import FleetCreator
+from game import Game
+from settings import Setting
+from simulate import simulate_game
+
+pytest.importorskip("pytest_benchmark")
+
+
+def random_fleet(seed: int) -> Fleet:
+    fleet = Fleet()
+    fleet.create_random(random.Random(seed))
+    return fleet
+
+
+def shoot_whole_board(enemy: Enemy):
+    for _ in range(100):
+        enemy.shoot()
+
+
+def discover_whole_board(game_board: GameBoard):
+    for x, y in ALL_FIELDS:
+        game_board.discover_field(x, y)
+
+
+def play_game(seed: int) -> Game:
+    rng = random.Random(seed)
+    creator = FleetCreator(rng)
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                         Setting.HARD_ENEMY: True})
+    game.start_game(board, fleet, rng)
+    targets = list(ALL_FIELDS)
+    rng.shuffle(targets)
+    while not game.won():
+        if game.players_turn():
+            x, y = targets.pop()
+            game.discover_field(x, y)
+        else:
+            game.enemy_move()
+        game.get_display_messages()
+        game.get_changes()
+    return game
+
+
+@pytest.mark.benchmark(group="fleet")
+def test_benchmark_fleet_create_random(benchmark):
+    fleet = Fleet()
+    rng = random.Random(0)
+    benchmark(fleet.create_random, rng)
+    assert len(fleet.ships()) == 10
+
+
+@pytest.mark.benchmark(group="fleet")
+def test_benchmark_fleet_new_ship_test_fit(benchmark):
+    fleet = random_fleet(1)
+    ship = fleet.ships()[0]
+    fleet.select_ship(*ship.origin())
+    new_ship = Ship(ship.origin(), ship.size(), not ship.vertical())
+    benchmark(fleet._new_ship_test_fit, new_ship)
+
+
+@pytest.mark.benchmark(group="enemy")
+@pytest.mark.parametrize("mode", list(EnemyMode))
+def test_benchmark_enemy_shoot_whole_board(benchmark, mode):
+    rng = random.Random(2)
+
+    def new_enemy():
+        return (Enemy(mode=mode, rng=rng),), {}
+
+    # the sampling enemy takes tens of milliseconds for every shot
+    rounds = 5 if mode == EnemyMode.MONTE_CARLO else 50
+    benchmark.pedantic(shoot_whole_board, setup=new_enemy, rounds=rounds)
+
+
+# changes every field goes through in a game: ships placed and sunk, misses
+# marked and unmarked
+STATUS_CHANGES = [FieldStatus.SHIP, FieldStatus.SUNK, FieldStatus.NOTHING,
+                  FieldStatus.MISS, FieldStatus.NOTHING]
+
+
+def get_every_field(board):
+    for x, y in ALL_FIELDS:
+        board.get_field_status(x, y)
+
+
+def set_every_field(board, statuses):
+    status = next(statuses)
+    for x, y in ALL_FIELDS:
+        board.set_field_status(x, y, status)
+
+
+@pytest.mark.benchmark(group="board-fields")
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+def test_benchmark_board_get_field_status(benchmark, board_type):
+    board = board_type()
+    board.place_fleet(random_fleet(7))
+    benchmark(get_every_field, board)
+
+
+@pytest.mark.benchmark(group="board-fields")
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+def test_benchmark_board_set_field_status(benchmark, board_type):
+    board = board_type()
+    board.place_fleet(random_fleet(7))
+    benchmark(set_every_field, board, itertools.cycle(STATUS_CHANGES))
+
+
+@pytest.mark.benchmark(group="board")
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+def test_benchmark_game_board_discover_whole_board(benchmark, board_type):
+    fleet = random_fleet(3)
+
+    def new_game_board():
+        data_board = board_type()
+        data_board.place_fleet(fleet)
+        return (GameBoard(data_board),), {}
+
+    benchmark.pedantic(discover_whole_board, setup=new_game_board,
+                       rounds=200)
+
+
+@pytest.mark.benchmark(group="board")
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+def test_benchmark_game_board_get_display_board(benchmark, board_type):
+    data_board = board_type()
+    data_board.place_fleet(random_fleet(4))
+    game_board = GameBoard(data_board)
+    for x, y in ALL_FIELDS[::3]:
+        game_board.discover_field(x, y)
+    benchmark(game_board.get_display_board)
+
+
+@pytest.mark.benchmark(group="game")
+def test_benchmark_simulate_game(benchmark):
+    rng = random.Random(5)
+
+    def new_enemies():
+        first = Enemy(mode=EnemyMode.HARD, rng=rng)
+        second = Enemy(mode=EnemyMode.EASY, rng=rng)
+        return (first, second), {"rng": rng}
+
+    benchmark.pedantic(simulate_game, setup=new_enemies, rounds=50)
+
+
+@pytest.mark.benchmark(group="game")
+def test_benchmark_full_game(benchmark):
+    game = benchmark.pedantic(play_game, args=(6,), rounds=20)
+    assert game.won()
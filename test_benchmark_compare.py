@@ -0,0 +1,21 @@
+from benchmarks import compare_with_baseline, main, stored_baselines
+
+
+def test_stored_baselines(tmp_path):
+    assert stored_baselines(str(tmp_path)) == []
+    machine = tmp_path / "Linux-CPython-3.11-64bit"
+    machine.mkdir()
+    (machine / "0002_second.json").write_text("{}")
+    (machine / "0001_first.json").write_text("{}")
+    assert stored_baselines(str(tmp_path)) == [
+        str(machine / "0001_first.json"), str(machine / "0002_second.json")
+    ]
+
+
+def test_compare_with_baseline_no_baseline(tmp_path):
+    assert compare_with_baseline(str(tmp_path), 10) == 1
+
+
+def test_main_compare_no_baseline(tmp_path):
+    assert main(["benchmarks.py", "compare", "--storage", str(tmp_path),
+                 "--threshold", "5"]) == 1
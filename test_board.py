@@ -1,9 +1,13 @@
+import random
+
 import pytest
 
 from board import Field, FieldStatus, game_to_array_coords, \
     InvalidGameCoordinatesError, Board, GameBoard, \
-    return_all_field_coordinates
-from fleet import Ship, Fleet
+    return_all_field_coordinates, BitBoard, field_index, ship_mask, \
+    field_on_board, ALL_FIELDS, FIELD_INDICES, INDEX_TO_FIELD, \
+    ADHERENT_FIELDS, TANGENT_FIELDS, FIELDS_AROUND, mask_indices, FieldSet
+from fleet import Ship, Fleet, fields_around_ship
 
 
 def test_field_create():
@@ -75,6 +79,23 @@ def test_game_to_array_coords_y_too_high():
         game_to_array_coords('g', 11)
 
 
+def test_field_index():
+    assert field_index('a', 1) == 0
+    assert field_index('b', 1) == 1
+    assert field_index('a', 2) == 10
+    assert field_index('j', 10) == 99
+
+
+def test_field_index_invalid():
+    with pytest.raises(InvalidGameCoordinatesError):
+        field_index('k', 1)
+
+
+def test_ship_mask():
+    ship = Ship(('b', 1), 2, True)
+    assert ship_mask(ship) == (1 << 1) | (1 << 11)
+
+
 def test_get_all_fields_coordinates():
     all_fields = return_all_field_coordinates()
     assert all_fields == [('a', 1), ('a', 2), ('a', 3), ('a', 4), ('a', 5),
@@ -99,6 +120,94 @@ def test_get_all_fields_coordinates():
                           ('j', 6), ('j', 7), ('j', 8), ('j', 9), ('j', 10)]
 
 
+def test_mask_indices():
+    assert mask_indices(0) == []
+    assert mask_indices(1) == [0]
+    assert mask_indices((1 << 99) | (1 << 12) | 1) == [0, 12, 99]
+
+
+def test_get_all_fields_coordinates_copy():
+    all_fields = return_all_field_coordinates()
+    all_fields.remove(('a', 1))
+    assert ('a', 1) in return_all_field_coordinates()
+    assert list(ALL_FIELDS) == return_all_field_coordinates()
+
+
+def test_field_on_board():
+    assert field_on_board(('a', 1))
+    assert field_on_board(('j', 10))
+    assert not field_on_board(('k', 1))
+    assert not field_on_board(('a', 0))
+    assert not field_on_board(('A', 1))
+
+
+def test_field_indices_tables():
+    for field in ALL_FIELDS:
+        index = FIELD_INDICES[field]
+        assert index == field_index(*field)
+        assert INDEX_TO_FIELD[index] == field
+    assert INDEX_TO_FIELD[:3] == (('a', 1), ('b', 1), ('c', 1))
+
+
+def test_neighbour_tables_typical():
+    assert ADHERENT_FIELDS[('b', 5)] == (('a', 5), ('c', 5), ('b', 4),
+                                         ('b', 6))
+    assert TANGENT_FIELDS[('b', 5)] == (('a', 4), ('c', 4), ('a', 6),
+                                        ('c', 6))
+    assert len(FIELDS_AROUND[('b', 5)]) == 8
+
+
+def test_neighbour_tables_corner():
+    assert ADHERENT_FIELDS[('a', 1)] == (('b', 1), ('a', 2))
+    assert TANGENT_FIELDS[('a', 1)] == (('b', 2),)
+    assert FIELDS_AROUND[('j', 10)] == (('i', 10), ('j', 9), ('i', 9))
+
+
+def test_field_set_create():
+    field_set = FieldSet(ALL_FIELDS)
+    assert len(field_set) == 100
+    assert list(field_set) == list(ALL_FIELDS)
+    assert field_set.mask() == (1 << 100) - 1
+    assert ('a', 1) in field_set
+    assert ('k', 1) not in field_set
+    assert len(FieldSet()) == 0
+
+
+def test_field_set_add():
+    field_set = FieldSet()
+    field_set.add(('b', 1))
+    field_set.add(('b', 1))
+    assert len(field_set) == 1
+    assert ('b', 1) in field_set
+    assert field_set.mask() == 1 << 1
+
+
+def test_field_set_remove():
+    field_set = FieldSet([('a', 1), ('b', 1), ('c', 1)])
+    field_set.remove(('a', 1))
+    assert ('a', 1) not in field_set
+    assert len(field_set) == 2
+    assert set(field_set) == {('b', 1), ('c', 1)}
+    assert field_set.mask() == (1 << 1) | (1 << 2)
+    field_set.remove(('c', 1))
+    assert list(field_set) == [('b', 1)]
+
+
+def test_field_set_remove_missing():
+    field_set = FieldSet([('a', 1)])
+    with pytest.raises(ValueError):
+        field_set.remove(('b', 1))
+    with pytest.raises(ValueError):
+        field_set.remove(('k', 1))
+
+
+def test_field_set_choice():
+    fields = [('a', 1), ('j', 10), ('e', 5)]
+    field_set = FieldSet(fields)
+    for _ in range(20):
+        assert field_set.choice() in fields
+
+
 def test_board_create():
     board = Board()
     assert board.get_field_status('j', 10) == FieldStatus.NOTHING
@@ -184,6 +293,181 @@ def test_board_mark_sunken_ship():
         assert board.get_field_status(x, y) == FieldStatus.SUNK
 
 
+def test_bit_board_create():
+    board = BitBoard()
+    for x, y in return_all_field_coordinates():
+        assert board.get_field_status(x, y) == FieldStatus.NOTHING
+
+
+def test_bit_board_set_field_status():
+    board = BitBoard()
+    board.set_field_status('a', 1, FieldStatus.SHIP)
+    assert board.get_field_status('a', 1) == FieldStatus.SHIP
+    board.set_field_status('a', 1, FieldStatus.SUNK)
+    assert board.get_field_status('a', 1) == FieldStatus.SUNK
+    board.set_field_status('a', 1, FieldStatus.NOTHING)
+    assert board.get_field_status('a', 1) == FieldStatus.NOTHING
+
+
+def test_bit_board_set_field_status_masks():
+    board = BitBoard()
+    board.set_field_status('b', 1, FieldStatus.SHIP)
+    board.set_field_status('b', 1, FieldStatus.SUNK)
+    board.set_field_status('b', 1, FieldStatus.SUNK)
+    assert board.mask(FieldStatus.SHIP) == 0
+    assert board.mask(FieldStatus.SUNK) == 1 << field_index('b', 1)
+    board.set_field_status('b', 1, FieldStatus.NOTHING)
+    for status in FieldStatus:
+        if status != FieldStatus.NOTHING:
+            assert board.mask(status) == 0
+    assert board.mask(FieldStatus.NOTHING) == (1 << 100) - 1
+
+
+def test_bit_board_str():
+    board = Board()
+    bit_board = BitBoard()
+    for status, (x, y) in zip(FieldStatus, [('a', 1), ('a', 10), ('j', 1),
+                                            ('j', 10), ('e', 5)]):
+        board.set_field_status(x, y, status)
+        bit_board.set_field_status(x, y, status)
+    assert str(bit_board) == str(board)
+
+
+def test_bit_board_clear_board():
+    board = BitBoard()
+    board.set_field_status('b', 5, FieldStatus.SUNK)
+    board.set_field_status('a', 10, FieldStatus.SELECTED)
+    board.clear_board()
+    assert board.get_field_status('b', 5) == FieldStatus.NOTHING
+    assert board.get_field_status('a', 10) == FieldStatus.NOTHING
+
+
+def test_bit_board_place_fleet():
+    board = BitBoard()
+    fleet = Fleet()
+    fleet.create_random()
+    board.place_fleet(fleet)
+    reference = Board()
+    reference.place_fleet(fleet)
+    for x, y in return_all_field_coordinates():
+        assert board.get_field_status(x, y) == \
+               reference.get_field_status(x, y)
+
+
+def test_bit_board_mark_sunken_ship():
+    board = BitBoard()
+    ship = Ship(('d', 7), 4, False)
+    board.place_ship(ship)
+    board.mark_sunken_ship(ship)
+    for x, y in ship.get_segment_coordinates():
+        assert board.get_field_status(x, y) == FieldStatus.SUNK
+    assert board.mask(FieldStatus.SHIP) == 0
+    assert board.mask(FieldStatus.SUNK) == ship_mask(ship)
+
+
+def test_bit_board_mask_nothing():
+    board = BitBoard()
+    board.set_field_status('a', 1, FieldStatus.MISS)
+    assert board.mask(FieldStatus.NOTHING) == ((1 << 100) - 1) & ~1
+
+
+def test_bit_board_overlay():
+    board = BitBoard()
+    other = BitBoard()
+    board.set_field_status('a', 1, FieldStatus.SHIP)
+    other.set_field_status('a', 1, FieldStatus.MISS)
+    other.set_field_status('b', 1, FieldStatus.MISS)
+    merged = board.overlay(other)
+    assert merged.get_field_status('a', 1) == FieldStatus.SHIP
+    assert merged.get_field_status('b', 1) == FieldStatus.MISS
+    assert board.get_field_status('b', 1) == FieldStatus.NOTHING
+
+
+def test_bit_board_to_board():
+    board = BitBoard()
+    board.set_field_status('c', 4, FieldStatus.SELECTED)
+    converted = board.to_board()
+    assert isinstance(converted, Board)
+    assert converted.get_field_status('c', 4) == FieldStatus.SELECTED
+
+
+def test_game_board_bit_board():
+    board = BitBoard()
+    fleet = Fleet()
+    fleet.create_random()
+    board.place_fleet(fleet)
+    gboard = GameBoard(board)
+    x, y = fleet.ships()[0].segments()[0].position()
+    assert gboard.discover_field(x, y)
+    assert not gboard.field_undiscovered(x, y)
+    board_seen_by_player = gboard.get_display_board()
+    assert board_seen_by_player.get_field_status(x, y) == FieldStatus.SUNK
+    board_seen_by_enemy = gboard.get_display_board(display_as_enemy=True)
+    assert board_seen_by_enemy.get_field_status(x, y) == FieldStatus.SHIP
+
+
+def player_view(gboard: GameBoard, x: str, y: int) -> FieldStatus:
+    status = gboard._data_board.get_field_status(x, y)
+    if status == FieldStatus.NOTHING:
+        status = gboard._visible_board.get_field_status(x, y)
+    return status
+
+
+def test_game_board_display_board_follows_moves():
+    rng = random.Random(6)
+    for board_type in (Board, BitBoard):
+        board = board_type()
+        fleet = Fleet()
+        fleet.create_random(rng)
+        board.place_fleet(fleet)
+        gboard = GameBoard(board)
+        for _ in range(150):
+            x, y = rng.choice(ALL_FIELDS)
+            action = rng.randrange(3)
+            if action == 0 and gboard.field_undiscovered(x, y):
+                if gboard.discover_field(x, y) and fleet.hit(x, y):
+                    gboard.mark_misses_around(fleet.find_ship(x, y))
+            elif action == 1:
+                gboard.mark_as_empty(x, y)
+            else:
+                gboard.unmark_as_empty(x, y)
+        display = gboard.get_display_board()
+        for x, y in ALL_FIELDS:
+            assert display.get_field_status(x, y) == \
+                player_view(gboard, x, y)
+
+
+def test_game_board_display_board_snapshot():
+    board = Board()
+    gboard = GameBoard(board)
+    display = gboard.get_display_board()
+    gboard.discover_field('c', 3)
+    assert display.get_field_status('c', 3) == FieldStatus.NOTHING
+    assert gboard.get_display_board().get_field_status('c', 3) == \
+        FieldStatus.MISS
+
+
+def test_game_board_changed_fields():
+    board = Board()
+    ship = Ship(('b', 2), 2, False)
+    board.place_ship(ship)
+    gboard = GameBoard(board)
+    assert gboard.changed_fields() == []
+    gboard.discover_field('e', 5)
+    gboard.mark_as_empty('f', 5)
+    # marked only on the board seen by the enemy
+    gboard.mark_as_empty('b', 2)
+    assert gboard.changed_fields() == [('e', 5), ('f', 5), ('b', 2)]
+    assert gboard.changed_fields() == []
+    gboard.discover_field('b', 2)
+    gboard.discover_field('c', 2)
+    gboard.mark_misses_around(ship)
+    changed = gboard.changed_fields()
+    assert len(changed) == 12
+    assert set(changed) == set(fields_around_ship(ship)) | {('b', 2),
+                                                            ('c', 2)}
+
+
 def test_game_board_create():
     board = Board()
     fleet = Fleet()
@@ -407,7 +691,7 @@ def test_game_board_field_undiscovered_discovered():
 
 
 def test_mark_misses_around(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = [Ship(('a', 1), 4, False), Ship(('a', 3), 3, False),
                  Ship(('a', 5), 3, False), Ship(('a', 7), 2, False),
@@ -454,3 +738,45 @@ def test_mark_misses_around(monkeypatch):
     # This function is used to automatically mark fields around when the ship
     # sinks, and these markers cannot be seen by the player as they aren't
     # placed by the enemy, but show up on their board automatically
+
+
+def test_board_classes_have_no_instance_dict():
+    objects = [Field(), FieldSet(), Board(), BitBoard(), GameBoard(Board())]
+    for board_object in objects:
+        assert not hasattr(board_object, '__dict__')
+
+
+def test_bit_board_snapshot_restore():
+    board = BitBoard()
+    board.place_ship(Ship(('c', 3), 3, True))
+    board.set_field_status('a', 1, FieldStatus.MISS)
+    board.set_field_status('j', 10, FieldStatus.SUNK)
+    data = board.snapshot()
+    assert len(data) == 52
+    restored = BitBoard()
+    restored.restore(data)
+    for x, y in ALL_FIELDS:
+        assert restored.get_field_status(x, y) == \
+            board.get_field_status(x, y)
+    with pytest.raises(ValueError):
+        restored.restore(data[:-1])
+
+
+def test_game_board_snapshot_restore():
+    data_board = Board()
+    ship = Ship(('b', 2), 2, False)
+    data_board.place_ship(ship)
+    gboard = GameBoard(data_board)
+    gboard.discover_field('b', 2)
+    gboard.discover_field('e', 5)
+    gboard.mark_as_empty('f', 6)
+    restored = GameBoard(BitBoard())
+    restored.restore(gboard.snapshot())
+    assert restored.changed_fields() == []
+    for display_as_enemy in (False, True):
+        original_view = gboard.get_display_board(display_as_enemy)
+        restored_view = restored.get_display_board(display_as_enemy)
+        for x, y in ALL_FIELDS:
+            assert restored_view.get_field_status(x, y) == \
+                original_view.get_field_status(x, y)
+    assert restored.discover_field('c', 2)
@@ -1,6 +1,12 @@
-from board import return_all_field_coordinates
+import random
+import time
+
+import pytest
+
+from board import return_all_field_coordinates, FIELD_INDICES
 from enemy import create_list_of_adherent, create_list_of_tangents, \
-    upper_field, lower_field, left_field, right_field, Enemy
+    upper_field, lower_field, left_field, right_field, Enemy, EnemyMode, \
+    DensityMap, PosteriorSampler, SamplingStats
 
 
 def test_create_list_of_adherent_typical():
@@ -565,3 +571,297 @@ def test_enemy_react_to_sink_big_ship_corner_end(monkeypatch):
     assert ('j', 6) in mark_as_empty
     for x, y in mark_as_empty:
         assert x >= 'i' and y >= 6
+
+
+def test_density_map_create():
+    density_map = DensityMap()
+    # a field in the corner can only be covered by ships starting in it, the
+    # fields in the middle of the board can be covered in the most ways
+    assert density_map.density(('a', 1)) == 1 * 2 + 2 * 2 + 3 * 2 + 4 * 1
+    assert density_map.density(('e', 5)) > density_map.density(('a', 1))
+    assert density_map.densest_fields([('a', 1), ('e', 5), ('f', 6)]) == \
+           [('e', 5), ('f', 6)]
+
+
+def test_density_map_remove_field():
+    density_map = DensityMap()
+    density_map.remove_field(('a', 2))
+    # vertical ships starting in a1 covered both fields
+    assert density_map.density(('a', 1)) == 1 * 1 + 2 * 1 + 3 * 1 + 4 * 1
+    density_map.remove_field(('b', 1))
+    assert density_map.density(('a', 1)) == 4
+
+
+def test_density_map_remove_ship():
+    density_map = DensityMap()
+    density_map.remove_ship(4)
+    assert density_map.density(('a', 1)) == 2 * 2 + 3 * 2 + 4 * 1
+    density_map.remove_ship(4)
+    assert density_map.density(('a', 1)) == 2 * 2 + 3 * 2 + 4 * 1
+    density_map.remove_ship(1)
+    assert density_map.density(('a', 1)) == 2 * 2 + 3 * 2 + 3 * 1
+
+
+def test_enemy_create_density():
+    enemy = Enemy(mode=EnemyMode.DENSITY)
+    assert enemy._hard_mode
+    assert enemy._density_map is not None
+    assert Enemy(hard_mode=True)._mode == EnemyMode.HARD
+    assert Enemy()._mode == EnemyMode.EASY
+
+
+def test_enemy_density_shoot_all():
+    all_fields = return_all_field_coordinates()
+    enemy = Enemy(mode=EnemyMode.DENSITY)
+    for i in range(len(all_fields)):
+        shot = enemy.shoot()
+        assert shot in all_fields
+        all_fields.remove(shot)
+    assert not all_fields
+
+
+def test_enemy_density_first_shot():
+    enemy = Enemy(mode=EnemyMode.DENSITY)
+    density_map = DensityMap()
+    best = density_map.densest_fields(return_all_field_coordinates())
+    assert enemy.shoot() in best
+
+
+def test_enemy_density_react_to_sink():
+    enemy = Enemy(mode=EnemyMode.DENSITY)
+    enemy._last_target = ('e', 5)
+    enemy._discover(('e', 5))
+    enemy.react_to_hit()
+    enemy.react_to_sink()
+    for field in create_list_of_adherent(('e', 5)):
+        assert field not in enemy._undiscovered
+        assert enemy._density_map.density(field) == 0
+    assert enemy._density_map._remaining[1] == 3
+
+
+def test_posterior_sampler_heatmap_known_fields():
+    sampler = PosteriorSampler(max_samples=50)
+    unknown = (1 << 100) - 1
+    for field in (('a', 1), ('e', 5), ('j', 10)):
+        unknown &= ~(1 << FIELD_INDICES[field])
+    heat = sampler.heatmap(unknown, 0, random.Random(1))
+    assert heat[FIELD_INDICES[('a', 1)]] == 0
+    assert heat[FIELD_INDICES[('e', 5)]] == 0
+    assert heat[FIELD_INDICES[('j', 10)]] == 0
+    assert max(heat) > 0
+
+
+def test_posterior_sampler_heatmap_hits():
+    sampler = PosteriorSampler(max_samples=50)
+    hits = 1 << FIELD_INDICES[('e', 5)] | 1 << FIELD_INDICES[('f', 5)]
+    unknown = ((1 << 100) - 1) & ~hits
+    heat = sampler.heatmap(unknown, hits, random.Random(2))
+    # every sampled layout has a ship covering both hit fields, which can
+    # only continue in the same row
+    assert heat[FIELD_INDICES[('e', 5)]] == max(heat)
+    assert heat[FIELD_INDICES[('f', 5)]] == max(heat)
+    assert heat[FIELD_INDICES[('e', 4)]] == 0
+    assert heat[FIELD_INDICES[('f', 6)]] == 0
+    assert heat[FIELD_INDICES[('d', 5)]] > 0
+    assert heat[FIELD_INDICES[('g', 5)]] > 0
+
+
+def test_posterior_sampler_heatmap_inconsistent():
+    sampler = PosteriorSampler(max_samples=20)
+    # no ship can cover two fields which aren't in a line
+    hits = 1 << FIELD_INDICES[('a', 1)] | 1 << FIELD_INDICES[('c', 3)]
+    unknown = ((1 << 100) - 1) & ~hits
+    assert sampler.heatmap(unknown, hits, random.Random(3)) == [0.0] * 100
+
+
+def test_posterior_sampler_heatmap_single_layout():
+    sampler = PosteriorSampler(max_samples=200)
+    for size in (4, 3, 3, 2, 2, 2):
+        sampler.remove_ship(size)
+    # four single-field ships fit in the first seven fields of a row only
+    # with one empty field between each of them
+    unknown = 0
+    for x in "abcdefg":
+        unknown |= 1 << FIELD_INDICES[(x, 1)]
+    heat = sampler.heatmap(unknown, 0, random.Random(4))
+    assert heat[FIELD_INDICES[('a', 1)]] > 0
+    for x in "aceg":
+        assert heat[FIELD_INDICES[(x, 1)]] == heat[FIELD_INDICES[('a', 1)]]
+    assert sum(heat) == 4 * heat[FIELD_INDICES[('a', 1)]]
+    stats = sampler.stats()
+    assert stats.layouts == 200
+    assert 0 < stats.dead_ends < 200
+    assert not stats.fallback
+
+
+def test_posterior_sampler_heatmap_weights():
+    sampler = PosteriorSampler(max_samples=2000)
+    for size in (4, 3, 3, 2, 2, 1, 1, 1):
+        sampler.remove_ship(size)
+    unknown = 0
+    for x in "abcde":
+        unknown |= 1 << FIELD_INDICES[(x, 1)]
+    heat = sampler.heatmap(unknown, 0, random.Random(7))
+    # create_random() places the ship of size 2 first, and then the ship of
+    # size 1 on one of the 94 or 92 fields left free on the whole board, so
+    # the six layouts fitting the row are almost equally likely, even though
+    # the ship of size 1 fits in one or two fields of the row
+    expected = (2 / 92) / (3 / 94 + 1 / 92)
+    ratio = heat[FIELD_INDICES[('c', 1)]] / heat[FIELD_INDICES[('a', 1)]]
+    assert ratio == pytest.approx(expected, rel=0.1)
+
+
+def test_posterior_sampler_heatmap_fallback():
+    sampler = PosteriorSampler(max_samples=20)
+    for size in (4, 3, 3, 2, 2, 2):
+        sampler.remove_ship(size)
+    # four single-field ships don't fit in six fields of a row, but each of
+    # them fits in any of the fields
+    unknown = 0
+    for x in "abcdef":
+        unknown |= 1 << FIELD_INDICES[(x, 1)]
+    heat = sampler.heatmap(unknown, 0, random.Random(8))
+    for x in "abcdef":
+        assert heat[FIELD_INDICES[(x, 1)]] == 1
+    assert sum(heat) == 6
+    assert sampler.stats() == SamplingStats(20, 20, True)
+
+
+def test_posterior_sampler_remove_ship():
+    sampler = PosteriorSampler(max_samples=20)
+    for size in (4, 3, 3, 2, 2, 2, 1, 1, 1, 1):
+        sampler.remove_ship(size)
+    sampler.remove_ship(4)
+    assert sum(sampler.remaining().values()) == 0
+    heat = sampler.heatmap((1 << 100) - 1, 0, random.Random(4))
+    assert heat == [0.0] * 100
+
+
+def test_posterior_sampler_time_budget():
+    sampler = PosteriorSampler(time_budget_ms=1, max_samples=10 ** 6)
+    start = time.perf_counter()
+    heat = sampler.heatmap((1 << 100) - 1, 0, random.Random(5))
+    assert time.perf_counter() - start < 1
+    assert max(heat) > 0
+
+
+def test_enemy_monte_carlo_shoot_all():
+    all_fields = return_all_field_coordinates()
+    enemy = Enemy(mode=EnemyMode.MONTE_CARLO, rng=random.Random(6),
+                  max_samples=5)
+    for i in range(len(all_fields)):
+        shot = enemy.shoot()
+        assert shot in all_fields
+        all_fields.remove(shot)
+    assert not all_fields
+
+
+def test_enemy_monte_carlo_react_to_hit():
+    enemy = Enemy(mode=EnemyMode.MONTE_CARLO, rng=random.Random(7),
+                  max_samples=20)
+    enemy._last_target = ('e', 5)
+    enemy._discover(('e', 5))
+    enemy.react_to_hit()
+    assert enemy._hit_mask == 1 << FIELD_INDICES[('e', 5)]
+    assert enemy.shoot() in create_list_of_adherent(('e', 5))
+
+
+def test_enemy_monte_carlo_react_to_sink():
+    enemy = Enemy(mode=EnemyMode.MONTE_CARLO, rng=random.Random(8))
+    enemy._last_target = ('e', 5)
+    enemy._discover(('e', 5))
+    enemy.react_to_hit()
+    enemy.react_to_sink()
+    for field in create_list_of_adherent(('e', 5)):
+        assert field not in enemy._undiscovered
+    assert enemy._sampler.remaining()[1] == 3
+    assert enemy._hit_mask == 0
+
+
+def test_enemy_shoot_deadline():
+    enemy = Enemy(mode=EnemyMode.MONTE_CARLO, rng=random.Random(9),
+                  max_samples=10 ** 6)
+    start = time.perf_counter()
+    enemy.shoot(5)
+    assert time.perf_counter() - start < 1
+    assert enemy.move_times()[0].budget_ms == 5
+
+
+def test_enemy_shoot_time_budget():
+    enemy = Enemy(mode=EnemyMode.MONTE_CARLO, rng=random.Random(10),
+                  time_budget_ms=5, max_samples=10 ** 6)
+    start = time.perf_counter()
+    enemy.shoot()
+    enemy.shoot(2)
+    assert time.perf_counter() - start < 2
+    assert [move_time.budget_ms for move_time in enemy.move_times()] == \
+        [5, 2]
+
+
+def test_enemy_hard_shoot_expired_deadline():
+    enemy = Enemy(mode=EnemyMode.HARD, rng=random.Random(11))
+    # ranking stops after the first fields, but a field is still chosen
+    shot = enemy.shoot(0)
+    assert shot in return_all_field_coordinates()
+    assert shot not in enemy._undiscovered
+    # the fields ranked before the deadline are chosen at random, not the
+    # first ones on the board
+    shots = {Enemy(mode=EnemyMode.HARD, rng=random.Random(seed)).shoot(0)
+             for seed in range(30)}
+    first_ranked = return_all_field_coordinates()[:9]
+    assert any(field not in first_ranked for field in shots)
+
+
+def test_enemy_move_times():
+    for mode in EnemyMode:
+        enemy = Enemy(mode=mode, rng=random.Random(12), max_samples=5)
+        for _ in range(5):
+            enemy.shoot()
+        move_times = enemy.move_times()
+        assert len(move_times) == 5
+        for move_time in move_times:
+            assert move_time.elapsed_ms >= 0
+            assert move_time.budget_ms is None
+
+
+def test_enemy_sampling_stats():
+    enemy = Enemy(mode=EnemyMode.MONTE_CARLO, rng=random.Random(13),
+                  max_samples=5)
+    for _ in range(5):
+        enemy.shoot()
+    sampling_stats = enemy.sampling_stats()
+    assert len(sampling_stats) == 5
+    for stats in sampling_stats:
+        assert stats.layouts == 5
+        assert 0 <= stats.dead_ends <= stats.layouts
+    assert Enemy(mode=EnemyMode.DENSITY).sampling_stats() == []
+
+
+def test_enemy_rng():
+    for mode in EnemyMode:
+        enemy1 = Enemy(mode=mode, rng=random.Random(5))
+        enemy2 = Enemy(mode=mode, rng=random.Random(5))
+        for _ in range(30):
+            assert enemy1.shoot() == enemy2.shoot()
+
+
+def test_enemy_snapshot_restore():
+    for mode in EnemyMode:
+        enemy = Enemy(mode=mode, rng=random.Random(6))
+        for _ in range(10):
+            enemy.shoot()
+        enemy.react_to_hit()
+        if mode == EnemyMode.DENSITY:
+            enemy.react_to_sink()
+        restored = Enemy(rng=random.Random(7))
+        restored.restore(enemy.snapshot())
+        assert restored.snapshot() == enemy.snapshot()
+        assert restored._mode == mode
+        assert list(restored._undiscovered) == list(enemy._undiscovered)
+        if mode == EnemyMode.DENSITY:
+            for field in return_all_field_coordinates():
+                assert restored._density_map.density(field) == \
+                    enemy._density_map.density(field)
+        enemy._rng = random.Random(7)
+        for _ in range(20):
+            assert restored.shoot() == enemy.shoot()
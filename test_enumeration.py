@@ -0,0 +1,134 @@
+from itertools import product
+
+import pytest
+
+from board import field_index, ship_mask, mask_indices
+from enumeration import PlacementDistribution, EnumerationTooLargeError
+from fleet import placement_table, Ship
+
+
+def brute_force_distribution(sizes: tuple, misses: int = 0,
+                             hits: int = 0) -> list:
+    """
+    Enumerates every sequence of choices create_random() can make, without
+    any memoisation
+    """
+    table = placement_table()
+    distributions = [{} for _ in sizes]
+    total = 0.0
+    paths = [(1.0, 0, ())]
+    for size in sizes:
+        new_paths = []
+        for probability, taken, masks in paths:
+            for vertical in (True, False):
+                good = [placement for placement in table[(size, vertical)]
+                        if not placement[1] & taken]
+                for _, mask, exclusion in good:
+                    new_paths.append((probability * 0.5 / len(good),
+                                      taken | exclusion, masks + (mask,)))
+        paths = new_paths
+    for probability, _, masks in paths:
+        occupied = 0
+        for mask in masks:
+            occupied |= mask
+        if occupied & misses or hits & ~occupied:
+            continue
+        total += probability
+        for distribution, mask in zip(distributions, masks):
+            distribution[mask] = distribution.get(mask, 0.0) + probability
+    for distribution in distributions:
+        for mask in distribution:
+            distribution[mask] /= total
+    return distributions
+
+
+def assert_distributions_equal(expected: dict, actual: dict):
+    assert set(expected) == set(actual)
+    for mask, probability in expected.items():
+        assert actual[mask] == pytest.approx(probability)
+
+
+def fields_mask(fields: list) -> int:
+    mask = 0
+    for x, y in fields:
+        mask |= 1 << field_index(x, y)
+    return mask
+
+
+def test_placement_distribution_single_ship():
+    distribution = PlacementDistribution((4,))
+    assert distribution.probability() == pytest.approx(1)
+    ship_distribution = distribution.ship_distribution(0)
+    assert len(ship_distribution) == 140
+    for probability in ship_distribution.values():
+        assert probability == pytest.approx(0.5 / 70)
+
+
+def test_placement_distribution_single_field_ship():
+    distribution = PlacementDistribution((1,))
+    heatmap = distribution.ship_heatmap(0)
+    assert heatmap == pytest.approx([0.01] * 100)
+
+
+def test_placement_distribution_matches_brute_force():
+    sizes = (3, 2)
+    distribution = PlacementDistribution(sizes)
+    expected = brute_force_distribution(sizes)
+    for number in range(len(sizes)):
+        assert_distributions_equal(expected[number],
+                                   distribution.ship_distribution(number))
+
+
+def test_placement_distribution_fleet_heatmap():
+    sizes = (4, 3)
+    heatmap = PlacementDistribution(sizes).fleet_heatmap()
+    assert sum(heatmap) == pytest.approx(7)
+    # the board is symmetric
+    for x, y in product("abcdefghij", range(1, 11)):
+        mirrored = (chr(ord('j') - ord(x) + ord('a')), 11 - y)
+        assert heatmap[field_index(x, y)] == \
+            pytest.approx(heatmap[field_index(*mirrored)])
+
+
+def test_placement_distribution_misses():
+    misses = fields_mask([('a', y) for y in range(1, 11)])
+    distribution = PlacementDistribution((1,), misses=misses)
+    heatmap = distribution.ship_heatmap(0)
+    for index in mask_indices(misses):
+        assert heatmap[index] == 0
+    assert sum(heatmap) == pytest.approx(1)
+    assert distribution.probability() == pytest.approx(0.9)
+
+
+def test_placement_distribution_hits():
+    hits = fields_mask([('a', 1)])
+    distribution = PlacementDistribution((2,), hits=hits)
+    ship_distribution = distribution.ship_distribution(0)
+    vertical = ship_mask(Ship(('a', 1), 2, True))
+    horizontal = ship_mask(Ship(('a', 1), 2, False))
+    assert_distributions_equal({vertical: 0.5, horizontal: 0.5},
+                               ship_distribution)
+
+
+def test_placement_distribution_conditioned_matches_brute_force():
+    sizes = (3, 1)
+    misses = fields_mask([('c', 3), ('d', 4), ('e', 5)])
+    hits = fields_mask([('d', 3), ('h', 8)])
+    distribution = PlacementDistribution(sizes, misses, hits)
+    expected = brute_force_distribution(sizes, misses, hits)
+    for number in range(len(sizes)):
+        assert_distributions_equal(expected[number],
+                                   distribution.ship_distribution(number))
+
+
+def test_placement_distribution_impossible_observations():
+    hits = fields_mask([('a', 1), ('c', 1), ('e', 1)])
+    distribution = PlacementDistribution((1, 1), hits=hits)
+    assert distribution.probability() == 0
+    assert distribution.ship_distribution(0) == {}
+    assert distribution.fleet_heatmap() == [0.0] * 100
+
+
+def test_placement_distribution_too_large():
+    with pytest.raises(EnumerationTooLargeError):
+        PlacementDistribution((4, 3, 3), max_states=1000)
@@ -1,9 +1,11 @@
 import random
 
-from board import return_all_field_coordinates, Board, FieldStatus
+from board import return_all_field_coordinates, Board, FieldStatus, \
+    BitBoard, ship_mask, field_index
 from fleet import ShipSegment, Ship, field_available, mark_misses_around, \
     Fleet, \
-    fields_around_field, fields_around_ship
+    fields_around_field, fields_around_ship, placement_table, SHIP_SIZES, \
+    random_fleet_layouts, placement_masks
 
 
 def test_ship_segment_create():
@@ -198,6 +200,25 @@ def test_field_available_ship_colliding_with_markers():
     assert not field_available(ship, board)
 
 
+def test_field_available_bit_board():
+    board = BitBoard()
+    ship = Ship(('b', 7), 3, False)
+    assert field_available(ship, board)
+
+
+def test_field_available_bit_board_ship_outside_board():
+    board = BitBoard()
+    ship = Ship(('a', 9), 3, True)
+    assert not field_available(ship, board)
+
+
+def test_field_available_bit_board_colliding_with_markers():
+    board = BitBoard()
+    board.set_field_status('d', 7, FieldStatus.MISS)
+    ship = Ship(('b', 7), 3, False)
+    assert not field_available(ship, board)
+
+
 def test_fields_around_field_typical():
     source = ('b', 5)
     expected = [('a', 4), ('a', 5), ('a', 6), ('b', 4), ('b', 6), ('c', 4),
@@ -307,6 +328,42 @@ def test_mark_misses_around_corner():
             assert board.get_field_status(x, y) == FieldStatus.NOTHING
 
 
+def test_placement_table_sizes():
+    table = placement_table()
+    assert len(table) == 8
+    for size in SHIP_SIZES:
+        assert len(table[(size, True)]) == (11 - size) * 10
+        assert len(table[(size, False)]) == (11 - size) * 10
+
+
+def test_placement_table_placement():
+    table = placement_table()
+    placements = {origin: (mask, exclusion) for origin, mask, exclusion
+                  in table[(3, False)]}
+    assert ('i', 1) not in placements
+    mask, exclusion = placements[('b', 7)]
+    ship = Ship(('b', 7), 3, False)
+    assert mask == ship_mask(ship)
+    around = 0
+    for x, y in fields_around_ship(ship):
+        around |= 1 << field_index(x, y)
+    assert exclusion == mask | around
+
+
+def test_random_fleet_layouts():
+    table = placement_table()
+    layouts = list(random_fleet_layouts(50))
+    assert len(layouts) == 50
+    for layout in layouts:
+        assert len(layout) == 10
+        taken = 0
+        for mask, size in zip(layout, SHIP_SIZES):
+            placements = table[(size, True)] + table[(size, False)]
+            exclusion = [p[2] for p in placements if p[1] == mask][0]
+            assert not exclusion & taken
+            taken |= mask
+
+
 def test_fleet_create():
     fleet = Fleet()
     assert not fleet.ships()
@@ -404,7 +461,7 @@ def test_fleet_select_ship():
 
 
 def test_fleet_new_ship_test_fit_success(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -429,7 +486,7 @@ def test_fleet_new_ship_test_fit_success(monkeypatch):
 
 
 def test_fleet_new_ship_test_fit_fail_collision(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -454,7 +511,7 @@ def test_fleet_new_ship_test_fit_fail_collision(monkeypatch):
 
 
 def test_fleet_new_ship_test_fit_fail_out_of_board(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -479,7 +536,7 @@ def test_fleet_new_ship_test_fit_fail_out_of_board(monkeypatch):
 
 
 def test_fleet_set_ship_position_success(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -505,7 +562,7 @@ def test_fleet_set_ship_position_success(monkeypatch):
 
 
 def test_fleet_set_ship_position_fail_collision(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -531,7 +588,7 @@ def test_fleet_set_ship_position_fail_collision(monkeypatch):
 
 
 def test_fleet_set_ship_position_fail_out_of_board(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -557,7 +614,7 @@ def test_fleet_set_ship_position_fail_out_of_board(monkeypatch):
 
 
 def test_fleet_change_ship_rotation_success(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -583,7 +640,7 @@ def test_fleet_change_ship_rotation_success(monkeypatch):
 
 
 def test_fleet_change_ship_rotation_fail_collision(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -609,7 +666,7 @@ def test_fleet_change_ship_rotation_fail_collision(monkeypatch):
 
 
 def test_fleet_change_ship_rotation_fail_out_of_board(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('d', 10), 4, False))
@@ -818,3 +875,184 @@ def test_fleet_get_display_fleet_sunk_as_enemy():
             assert segment.sunk() == display_segment.sunk()
             assert segment.position() == display_segment.position()
             assert segment.sunk()
+
+
+def test_fleet_create_random_rng():
+    fleet1 = Fleet()
+    fleet1.create_random(random.Random(3))
+    fleet2 = Fleet()
+    fleet2.create_random(random.Random(3))
+    assert fleet1.fleet_to_str() == fleet2.fleet_to_str()
+
+
+def test_random_fleet_layouts_rng():
+    layouts1 = list(random_fleet_layouts(5, random.Random(11)))
+    layouts2 = list(random_fleet_layouts(5, random.Random(11)))
+    assert layouts1 == layouts2
+
+
+def test_placement_masks():
+    ship = Ship(('b', 2), 2, True)
+    mask, exclusion = placement_masks(ship)
+    assert mask == ship_mask(ship)
+    for x, y in fields_around_ship(ship):
+        assert exclusion >> field_index(x, y) & 1
+    assert bin(exclusion).count('1') == 12
+
+
+def test_placement_masks_out_of_board():
+    assert placement_masks(Ship(('i', 7), 4, False)) is None
+    assert placement_masks(Ship(('j', 10), 2, True)) is None
+
+
+def test_placement_masks_other_size():
+    ship = Ship(('a', 1), 5, False)
+    mask, exclusion = placement_masks(ship)
+    assert mask == ship_mask(ship)
+    assert bin(exclusion).count('1') == 12
+    assert placement_masks(Ship(('g', 1), 5, False)) is None
+
+
+def test_fleet_new_ship_test_fit_matches_board():
+    rng = random.Random(1)
+    fleet = Fleet()
+    for _ in range(200):
+        fleet.create_random(rng)
+        ship = rng.choice(fleet.ships())
+        x, y = ship.origin()
+        fleet.select_ship(x, y)
+        origin = (rng.choice("abcdefghij"), rng.randint(1, 10))
+        new_ship = Ship(origin, ship.size(), rng.choice([True, False]))
+        # test fit on a board, the way the fleet would be placed
+        fits = True
+        temp_board = Board()
+        for other in fleet.ships():
+            if other is ship:
+                other = new_ship
+            if not field_available(other, temp_board):
+                fits = False
+                break
+            mark_misses_around(other, temp_board)
+            temp_board.place_ship(other)
+        expected = fleet.ships().index(ship) if fits else -1
+        assert fleet._new_ship_test_fit(new_ship) == expected
+
+
+def test_fleet_set_ship_position_updates_collision_index():
+    fleet = Fleet([Ship(('a', 1), 2, False), Ship(('a', 5), 1, False)])
+    fleet.select_ship('a', 1)
+    assert fleet.set_ship_position('a', 8)
+    fleet.select_ship('a', 5)
+    assert not fleet.set_ship_position('b', 9)
+    assert fleet.set_ship_position('a', 1)
+    fleet.restore(Fleet([Ship(('c', 3), 2, True),
+                         Ship(('a', 1), 1, False)]).snapshot())
+    fleet.select_ship('a', 1)
+    assert not fleet.set_ship_position('c', 2)
+
+
+def test_fleet_classes_have_no_instance_dict():
+    fleet = Fleet()
+    fleet.create_random()
+    ship = fleet.ships()[0]
+    for fleet_object in (fleet, ship, ship.segments()[0]):
+        assert not hasattr(fleet_object, '__dict__')
+
+
+def test_ship_check_if_belongs_horizontal():
+    ship = Ship(('h', 4), 3, False)
+    for x, y in [('h', 4), ('i', 4), ('j', 4)]:
+        assert ship.check_if_belongs(x, y)
+    for x, y in [('g', 4), ('k', 4), ('h', 5), ('i', 3)]:
+        assert not ship.check_if_belongs(x, y)
+
+
+def test_ship_sink_twice():
+    ship = Ship(('b', 7), 2, False)
+    ship.sink('b', 7)
+    ship.sink('b', 7)
+    assert not ship.sunk()
+    ship.sink('c', 7)
+    assert ship.sunk()
+
+
+def test_ship_unsink():
+    ship = Ship(('c', 2), 2, True)
+    ship.sink('c', 2)
+    ship.sink('c', 3)
+    assert ship.sunk()
+    ship.unsink('c', 3)
+    ship.unsink('c', 3)
+    assert not ship.sunk()
+    assert not ship.segments()[1].sunk()
+    ship.sink('c', 3)
+    assert ship.sunk()
+
+
+def test_fleet_is_alive_after_create_random():
+    fleet = Fleet()
+    fleet.create_random(random.Random(9))
+    for ship in fleet.ships():
+        for x, y in ship.get_segment_coordinates():
+            fleet.hit(x, y)
+    assert not fleet.is_alive()
+    fleet.create_random(random.Random(10))
+    assert fleet.is_alive()
+    x, y = fleet.ships()[0].origin()
+    assert fleet.find_ship(x, y) is fleet.ships()[0]
+
+
+def test_fleet_find_ship_after_move():
+    fleet = Fleet([Ship(('a', 1), 2, False), Ship(('a', 5), 1, False)])
+    moved = fleet.ships()[0]
+    assert fleet.find_ship('b', 1) is moved
+    fleet.select_ship('a', 1)
+    assert fleet.set_ship_position('e', 8)
+    assert fleet.find_ship('a', 1) is None
+    assert fleet.find_ship('b', 1) is None
+    assert fleet.find_ship('f', 8) is fleet.ships()[0]
+    assert fleet.change_ship_rotation()
+    assert fleet.find_ship('f', 8) is None
+    assert fleet.find_ship('e', 9) is fleet.ships()[0]
+
+
+def test_fleet_hit_sunk_ship():
+    fleet = Fleet([Ship(('a', 1), 1, False), Ship(('a', 5), 1, False)])
+    assert fleet.hit('a', 1)
+    assert fleet.hit('a', 1)
+    assert fleet.is_alive()
+    assert fleet.hit('a', 5)
+    assert not fleet.is_alive()
+
+
+def test_fleet_is_alive_after_ships_replaced():
+    fleet = Fleet([Ship(('a', 1), 1, False)])
+    fleet.hit('a', 1)
+    assert not fleet.is_alive()
+    fleet.restore(Fleet([Ship(('c', 3), 2, True)]).snapshot())
+    assert fleet.is_alive()
+    assert fleet.find_ship('a', 1) is None
+    assert fleet.find_ship('c', 4) is fleet.ships()[0]
+
+
+def test_fleet_snapshot_restore():
+    fleet = Fleet()
+    fleet.create_random(random.Random(8))
+    ship = fleet.ships()[0]
+    x, y = ship.get_segment_coordinates()[1]
+    fleet.hit(x, y)
+    small = fleet.ships()[-1]
+    fleet.hit(*small.origin())
+    data = fleet.snapshot()
+    assert len(data) == 30
+    restored = Fleet()
+    restored.restore(data)
+    for original, copied in zip(fleet.ships(), restored.ships()):
+        assert copied.origin() == original.origin()
+        assert copied.size() == original.size()
+        assert copied.vertical() == original.vertical()
+        assert [segment.sunk() for segment in copied.segments()] == \
+            [segment.sunk() for segment in original.segments()]
+    assert restored.ships()[-1].sunk()
+    assert restored.find_ship(x, y) is restored.ships()[0]
+    assert restored.is_alive()
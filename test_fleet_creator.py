@@ -20,6 +20,17 @@ def test_fleet_creator_start():
             assert board.get_field_status(x, y) == FieldStatus.SHIP
 
 
+def test_fleet_creator_start_rng():
+    creator1 = FleetCreator(random.Random(4))
+    creator1.start()
+    creator2 = FleetCreator(random.Random(4))
+    creator2.start()
+    assert creator1._fleet.fleet_to_str() == creator2._fleet.fleet_to_str()
+    creator1.random_fleet()
+    creator2.random_fleet()
+    assert creator1._fleet.fleet_to_str() == creator2._fleet.fleet_to_str()
+
+
 def test_fleet_creator_select_ship():
     creator = FleetCreator()
     creator.start()
@@ -40,7 +51,7 @@ def test_fleet_creator_select_ship():
 
 
 def test_fleet_creator_set_ship_position_success(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -70,7 +81,7 @@ def test_fleet_creator_set_ship_position_success(monkeypatch):
 
 
 def test_fleet_creator_set_ship_position_fail_collision(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -101,7 +112,7 @@ def test_fleet_creator_set_ship_position_fail_collision(monkeypatch):
 
 
 def test_fleet_creator_set_ship_position_fail_out_of_board(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -132,7 +143,7 @@ def test_fleet_creator_set_ship_position_fail_out_of_board(monkeypatch):
 
 
 def test_fleet_creator_change_ship_rotation_success(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -162,7 +173,7 @@ def test_fleet_creator_change_ship_rotation_success(monkeypatch):
 
 
 def test_fleet_creator_change_ship_rotation_fail_collision(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('a', 1), 4, False))
@@ -193,7 +204,7 @@ def test_fleet_creator_change_ship_rotation_fail_collision(monkeypatch):
 
 
 def test_fleet_creator_change_ship_rotation_fail_out_of_board(monkeypatch):
-    def rigged_fleet(self):
+    def rigged_fleet(self, rng=None):
         self._ships.clear()
         ships = []
         ships.append(Ship(('d', 10), 4, False))
@@ -1,11 +1,15 @@
 import random
 from copy import deepcopy
 
-from board import return_all_field_coordinates, FieldStatus, field_on_board
-from enemy import create_list_of_tangents
-from fleet import fields_around_ship
+import pytest
+
+from board import return_all_field_coordinates, FieldStatus, \
+    field_on_board, BitBoard
+from enemy import create_list_of_tangents, EnemyMode
+from fleet import fields_around_ship, Ship
 from fleet_creator import FleetCreator
-from game import Game, GameMessage
+from game import Game, GameMessage, GameView, GameChange, \
+    ENEMY_TIME_BUDGET_MS
 from settings import Setting, Settings
 
 
@@ -46,6 +50,7 @@ def test_game_create_enemy_fleet():
     game._create_enemy_fleet()
     assert game._enemy_fleet is not None
     assert game._enemy_board is not None
+    assert isinstance(game._enemy_board._data_board, BitBoard)
 
 
 def test_game_start_game():
@@ -54,6 +59,7 @@ def test_game_start_game():
     game = Game()
     game.start_game(board, fleet)
     assert game._player_board._data_board == board
+    assert isinstance(board, BitBoard)
     assert not game._enemy._hard_mode
     assert game._player_fleet == fleet
     assert game._enemy_fleet is not None
@@ -65,6 +71,38 @@ def test_game_start_game():
     assert GameMessage.PLAYERS_TURN in messages
 
 
+def test_game_start_game_enemy_mode():
+    creator = FleetCreator()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                         Setting.HARD_ENEMY: True})
+    game.start_game(board, fleet)
+    assert game._enemy._mode == EnemyMode.HARD
+    game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                         Setting.HARD_ENEMY: True,
+                         Setting.DENSITY_ENEMY: True})
+    game.start_game(board, fleet)
+    assert game._enemy._mode == EnemyMode.DENSITY
+    game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                         Setting.HARD_ENEMY: False,
+                         Setting.DENSITY_ENEMY: True})
+    game.start_game(board, fleet)
+    assert game._enemy._mode == EnemyMode.EASY
+
+
+def test_game_start_game_rng():
+    creator = FleetCreator()
+    board, fleet = creator.get_setup()
+    game1 = Game()
+    game1.start_game(board, fleet, random.Random(2))
+    game2 = Game()
+    game2.start_game(board, fleet, random.Random(2))
+    assert game1._enemy_fleet.fleet_to_str() == \
+        game2._enemy_fleet.fleet_to_str()
+    assert game1._enemy.shoot() == game2._enemy.shoot()
+
+
 def test_game_discover_field_miss():
     creator = FleetCreator()
     creator.start()
@@ -330,8 +368,56 @@ def test_game_enemy_move_players_turn():
     assert not game.enemy_move()
 
 
+def test_game_choose_enemy_target_players_turn():
+    creator = FleetCreator()
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.start_game(board, fleet)
+    assert game.choose_enemy_target() is None
+
+
+def test_game_enemy_move_chosen_target():
+    creator = FleetCreator(random.Random(3))
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.start_game(board, fleet, random.Random(4))
+    game._players_turn = False
+    game.get_display_messages()
+    game.get_changes()
+    target = game.choose_enemy_target()
+    assert field_on_board(target)
+    assert game.get_changes() == []
+    assert game.get_display_messages() == []
+    hit = game.enemy_move(target)
+    x, y = target
+    status = game.get_player_board_display().get_field_status(x, y)
+    if hit:
+        assert status in (FieldStatus.SHIP, FieldStatus.SUNK)
+    else:
+        assert status == FieldStatus.MISS
+    assert target not in game._enemy._undiscovered
+    assert game.get_changes()
+
+
+def test_game_enemy_move_times():
+    creator = FleetCreator(random.Random(5))
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.start_game(board, fleet, random.Random(6))
+    assert game.enemy_move_times() == []
+    game._players_turn = False
+    game.enemy_move(game.choose_enemy_target(50))
+    game._players_turn = False
+    game.enemy_move()
+    budgets = [move_time.budget_ms for move_time in game.enemy_move_times()]
+    assert budgets == [50, ENEMY_TIME_BUDGET_MS]
+
+
 def test_game_enemy_move_miss(monkeypatch):
-    def rigged_shoot(self):
+    def rigged_shoot(self, deadline_ms=None):
         return misses_for_enemy[0]
 
     monkeypatch.setattr("enemy.Enemy.shoot", rigged_shoot)
@@ -365,7 +451,7 @@ def test_game_enemy_move_miss(monkeypatch):
 
 
 def test_game_enemy_move_hit(monkeypatch):
-    def rigged_shoot(self):
+    def rigged_shoot(self, deadline_ms=None):
         self._last_target = guaranteed_hit
         return guaranteed_hit
 
@@ -403,7 +489,7 @@ def test_game_enemy_move_hit(monkeypatch):
 
 
 def test_game_enemy_move_sink(monkeypatch):
-    def rigged_shoot(self):
+    def rigged_shoot(self, deadline_ms=None):
         self._last_target = guaranteed_sink
         return guaranteed_sink
 
@@ -441,7 +527,7 @@ def test_game_enemy_move_sink(monkeypatch):
 
 
 def test_game_enemy_move_win(monkeypatch):
-    def rigged_shoot(self):
+    def rigged_shoot(self, deadline_ms=None):
         self._last_target = target
         return target
 
@@ -624,7 +710,7 @@ def test_game_game_get_display_messages():
 
 
 def test_game_get_player_board_display(monkeypatch):
-    def rigged_shoot(self):
+    def rigged_shoot(self, deadline_ms=None):
         self._last_target = list_for_enemy[0]
         list_for_enemy.remove(self._last_target)
         return self._last_target
@@ -716,7 +802,7 @@ def test_game_get_enemy_board_display():
 
 
 def test_game_get_player_fleet_display(monkeypatch):
-    def rigged_shoot(self):
+    def rigged_shoot(self, deadline_ms=None):
         self._last_target = list_for_enemy[0]
         list_for_enemy.remove(self._last_target)
         return self._last_target
@@ -782,3 +868,163 @@ def test_game_get_enemy_fleet_display():
                 assert segment.sunk()
             else:
                 assert not segment.sunk()
+
+
+def board_statuses(display_board) -> dict:
+    return {(x, y): display_board.get_field_status(x, y)
+            for x, y in return_all_field_coordinates()}
+
+
+def fleet_statuses(display_fleet) -> dict:
+    statuses = {}
+    for ship_num, ship in enumerate(display_fleet.ships()):
+        for segment_num, segment in enumerate(ship.segments()):
+            status = FieldStatus.SUNK if segment.sunk() else FieldStatus.SHIP
+            statuses[(ship_num, segment_num)] = status
+    return statuses
+
+
+def game_displays(game: Game) -> dict:
+    return {
+        GameView.PLAYER_BOARD: board_statuses(
+            game.get_player_board_display()),
+        GameView.ENEMY_BOARD: board_statuses(game.get_enemy_board_display()),
+        GameView.PLAYER_FLEET: fleet_statuses(
+            game.get_player_fleet_display()),
+        GameView.ENEMY_FLEET: fleet_statuses(game.get_enemy_fleet_display())
+    }
+
+
+def test_game_get_changes():
+    rng = random.Random(8)
+    creator = FleetCreator(rng)
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                         Setting.HARD_ENEMY: True})
+    game.start_game(board, fleet, rng)
+    assert game.get_changes() == []
+    displayed = game_displays(game)
+    fields = return_all_field_coordinates()
+    rng.shuffle(fields)
+    while not game.won():
+        if game.players_turn():
+            x, y = fields.pop()
+            if rng.random() < 0.2:
+                game.mark_field(x, y)
+                fields.insert(0, (x, y))
+            elif game.discover_field(x, y) and rng.random() < 0.2:
+                game.unmark_field(*fields[0])
+        else:
+            game.enemy_move()
+        changes = game.get_changes()
+        for change in changes:
+            assert displayed[change.view][change.position] == \
+                change.old_status
+            assert change.old_status != change.new_status
+            displayed[change.view][change.position] = change.new_status
+        assert displayed == game_displays(game)
+
+
+def test_game_get_changes_enemy_fleet(monkeypatch):
+    def rigged_fleet(self, rng=None):
+        self._ships = [Ship(('a', 1), 2, False)]
+
+    monkeypatch.setattr("fleet.Fleet.create_random", rigged_fleet)
+    creator = FleetCreator()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.apply_settings({Setting.MARK_MISSES_AROUND: False,
+                         Setting.HARD_ENEMY: False})
+    game.start_game(board, fleet)
+    game.discover_field('a', 1)
+    assert game.get_changes() == [
+        GameChange(GameView.ENEMY_BOARD, ('a', 1), FieldStatus.NOTHING,
+                   FieldStatus.SHIP)
+    ]
+    game.discover_field('b', 1)
+    assert game.get_changes() == [
+        GameChange(GameView.ENEMY_BOARD, ('b', 1), FieldStatus.NOTHING,
+                   FieldStatus.SUNK),
+        GameChange(GameView.ENEMY_BOARD, ('a', 1), FieldStatus.SHIP,
+                   FieldStatus.SUNK),
+        GameChange(GameView.ENEMY_FLEET, (0, 0), FieldStatus.SHIP,
+                   FieldStatus.SUNK),
+        GameChange(GameView.ENEMY_FLEET, (0, 1), FieldStatus.SHIP,
+                   FieldStatus.SUNK)
+    ]
+
+
+def play_moves(game: Game, targets: list, moves: int):
+    for _ in range(moves):
+        if game.won():
+            return
+        if game.players_turn():
+            x, y = targets.pop()
+            game.discover_field(x, y)
+        else:
+            game.enemy_move()
+
+
+def test_game_snapshot_restore(monkeypatch):
+    # the Monte Carlo enemy's moves can only be repeated without the time
+    # limit, then they only depend on its rng
+    monkeypatch.setattr("game.ENEMY_TIME_BUDGET_MS", None)
+    monkeypatch.setattr("game.ENEMY_MAX_SAMPLES", 100)
+    for density, monte_carlo in ((False, False), (True, False),
+                                 (False, True)):
+        rng = random.Random(9)
+        creator = FleetCreator(rng)
+        creator.start()
+        board, fleet = creator.get_setup()
+        game = Game()
+        game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                             Setting.HARD_ENEMY: True,
+                             Setting.DENSITY_ENEMY: density,
+                             Setting.MONTE_CARLO_ENEMY: monte_carlo})
+        game.start_game(board, fleet, rng)
+        targets = return_all_field_coordinates()
+        rng.shuffle(targets)
+        play_moves(game, targets, 50)
+        data = game.snapshot()
+        assert len(data) < 400
+        restored = Game()
+        restored.restore(data, random.Random(10))
+        assert restored.snapshot() == data
+        assert restored.get_changes() == []
+        assert restored.get_display_messages() == []
+        assert restored._settings == game._settings
+        assert restored.players_turn() == game.players_turn()
+        game._enemy._rng = random.Random(10)
+        while not game.won():
+            play_moves(restored, targets[:], 1)
+            play_moves(game, targets, 1)
+            game.get_changes()
+            restored.get_changes()
+            assert restored.snapshot() == game.snapshot()
+        assert restored.won()
+
+
+def test_game_snapshot_fork():
+    creator = FleetCreator(random.Random(11))
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.start_game(board, fleet, random.Random(12))
+    data = game.snapshot()
+    game.discover_field('a', 1)
+    fork = Game()
+    fork.restore(data)
+    assert fork.get_enemy_board_display().get_field_status('a', 1) == \
+        FieldStatus.NOTHING
+    fork.discover_field('a', 1)
+    assert fork.get_enemy_board_display().get_field_status('a', 1) == \
+        game.get_enemy_board_display().get_field_status('a', 1)
+
+
+def test_game_restore_invalid():
+    game = Game()
+    for data in (b'', bytes([0, 0]), bytes([1, 0, 3, 1, 2])):
+        with pytest.raises(ValueError):
+            game.restore(data)
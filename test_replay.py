@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from board import ALL_FIELDS
+from fleet_creator import FleetCreator
+from game import Game, ReplayMove, REPLAY_CODES
+from replay import ReplayPlayer, read_replay, decode_moves
+from settings import Setting
+
+
+def play_recorded_game(seed: int, density: bool = False) -> tuple:
+    rng = random.Random(seed)
+    creator = FleetCreator(rng)
+    creator.start()
+    board, fleet = creator.get_setup()
+    game = Game()
+    game.apply_settings({Setting.MARK_MISSES_AROUND: True,
+                         Setting.HARD_ENEMY: True,
+                         Setting.DENSITY_ENEMY: density})
+    game.start_game(board, fleet, rng)
+    targets = list(ALL_FIELDS)
+    rng.shuffle(targets)
+    snapshots = [game.snapshot()]
+    game.mark_field(*targets[-1])
+    snapshots.append(game.snapshot())
+    game.unmark_field(*targets[-1])
+    snapshots.append(game.snapshot())
+    while not game.won():
+        if game.players_turn():
+            x, y = targets.pop()
+            if not game._enemy_board.field_undiscovered(x, y):
+                continue
+            game.discover_field(x, y)
+        else:
+            game.enemy_move()
+        snapshots.append(game.snapshot())
+    return game, snapshots
+
+
+def test_replay_records():
+    game, snapshots = play_recorded_game(1)
+    header = read_replay(game.get_replay())
+    assert header.settings[Setting.HARD_ENEMY]
+    moves = [(move, field) for move, field in decode_moves(header.records)
+             if move != ReplayMove.ENEMY_TARGET]
+    assert len(moves) == len(snapshots) - 1
+    assert moves[0][0] == ReplayMove.MARK
+    assert moves[1][0] == ReplayMove.UNMARK
+    sinks = [move for move, _ in moves
+             if move in (ReplayMove.PLAYER_SINK, ReplayMove.ENEMY_SINK)]
+    assert len(sinks) >= 10
+    assert moves[-1][0] in (ReplayMove.PLAYER_SINK, ReplayMove.ENEMY_SINK)
+
+
+def test_replay_player_positions():
+    for density in (False, True):
+        game, snapshots = play_recorded_game(2, density)
+        player = ReplayPlayer(game.get_replay(), checkpoint_interval=8)
+        assert player.move_count() == len(snapshots) - 1
+        for move_number in (0, 1, 2, 17, 40, 9, player.move_count()):
+            position = player.position(move_number)
+            assert position.snapshot() == snapshots[move_number]
+        assert player.position(player.move_count()).won()
+
+
+def test_replay_player_every_position():
+    # the enemy's targets are reconstructed in the same order, so positions
+    # match even while the enemy is finishing off a ship
+    for seed in (4, 5):
+        game, snapshots = play_recorded_game(seed)
+        player = ReplayPlayer(game.get_replay(), rng=random.Random(seed + 1))
+        for move_number in range(player.move_count() + 1):
+            assert player.position(move_number).snapshot() == \
+                snapshots[move_number]
+
+
+def test_replay_enemy_targets():
+    game, _ = play_recorded_game(6)
+    moves = list(decode_moves(read_replay(game.get_replay()).records))
+    targets = [field for move, field in moves
+               if move == ReplayMove.ENEMY_TARGET]
+    assert targets
+    # the targets are recorded after every enemy's hit which doesn't sink a
+    # ship, and only then
+    for number, (move, _) in enumerate(moves):
+        if move == ReplayMove.ENEMY_TARGET:
+            assert moves[number - 1][0] in (ReplayMove.ENEMY_HIT,
+                                            ReplayMove.ENEMY_TARGET)
+    player = ReplayPlayer(game.get_replay())
+    with pytest.raises(ValueError):
+        player.position(0).replay_move(ReplayMove.ENEMY_TARGET, 'a', 1)
+
+
+def test_replay_player_continue_game():
+    game, _ = play_recorded_game(3)
+    player = ReplayPlayer(game.get_replay())
+    position = player.position(20)
+    assert position.get_replay() is None
+    while not position.won():
+        if position.players_turn():
+            x, y = random.choice([field for field in ALL_FIELDS
+                                  if position._enemy_board.
+                                  field_undiscovered(*field)])
+            position.discover_field(x, y)
+        else:
+            position.enemy_move()
+    assert position.won()
+
+
+def test_replay_player_invalid():
+    game, _ = play_recorded_game(4)
+    replay = game.get_replay()
+    with pytest.raises(ValueError):
+        ReplayPlayer(replay[:-1])
+    with pytest.raises(ValueError):
+        ReplayPlayer(b'\x00' + replay[1:])
+    with pytest.raises(IndexError):
+        ReplayPlayer(replay).position(10000)
+    header = read_replay(replay)
+    moves = bytearray(header.records)
+    # the first shot's result is changed from a miss to a hit or the other
+    # way around
+    if moves[4] == REPLAY_CODES[ReplayMove.PLAYER_MISS]:
+        moves[4] = REPLAY_CODES[ReplayMove.PLAYER_HIT]
+    else:
+        moves[4] = REPLAY_CODES[ReplayMove.PLAYER_MISS]
+    tampered = replay[:len(replay) - len(moves)] + bytes(moves)
+    with pytest.raises(ValueError):
+        player = ReplayPlayer(tampered)
+        player.position(player.move_count())
+
+
+def test_game_replay_restored():
+    game, _ = play_recorded_game(5)
+    restored = Game()
+    restored.restore(game.snapshot())
+    assert restored.get_replay() is None
@@ -0,0 +1,86 @@
+import pytest
+
+from results import ResultsWriter, read_results, read_column
+
+FIELDNAMES = ["game", "winner", "shots"]
+
+
+def write_games(path, games: range, chunk_size: int = 3):
+    with ResultsWriter(path, FIELDNAMES, chunk_size) as writer:
+        for game in games:
+            writer.write({"game": game, "winner": game % 2,
+                          "shots": 50 + game})
+    return writer
+
+
+def test_results_writer_write_and_read(tmp_path):
+    path = tmp_path / "results.csv"
+    writer = write_games(path, range(10))
+    assert writer.completed() == 10
+    records = list(read_results(path, {"game": int, "shots": int}))
+    assert len(records) == 10
+    assert records[4] == {"game": 4, "winner": "0", "shots": 54}
+
+
+def test_results_writer_chunks(tmp_path):
+    path = tmp_path / "results.csv"
+    writer = ResultsWriter(path, FIELDNAMES, chunk_size=3)
+    for game in range(4):
+        writer.write({"game": game})
+    assert writer.completed() == 4
+    # the last record is still in the unfinished chunk
+    assert len(list(read_results(path))) == 3
+    writer.close()
+    assert len(list(read_results(path))) == 4
+
+
+def test_results_writer_missing_columns(tmp_path):
+    path = tmp_path / "results.csv"
+    with ResultsWriter(path, FIELDNAMES) as writer:
+        writer.write({"game": 1})
+    assert list(read_results(path)) == [
+        {"game": "1", "winner": "", "shots": ""}]
+
+
+def test_results_writer_resume(tmp_path):
+    path = tmp_path / "results.csv"
+    write_games(path, range(5))
+    writer = ResultsWriter(path, FIELDNAMES)
+    assert writer.completed() == 5
+    writer.close()
+    write_games(path, range(5, 8))
+    assert list(read_column(path, "game", int)) == list(range(8))
+
+
+def test_results_writer_resume_after_crash(tmp_path):
+    path = tmp_path / "results.csv"
+    write_games(path, range(4))
+    with open(path, 'a', newline='') as file_handle:
+        file_handle.write("4,0,5")
+    writer = ResultsWriter(path, FIELDNAMES)
+    assert writer.completed() == 4
+    writer.write({"game": 4, "winner": 0, "shots": 54})
+    writer.close()
+    assert list(read_column(path, "shots", int)) == [50, 51, 52, 53, 54]
+
+
+def test_results_writer_resume_different_columns(tmp_path):
+    path = tmp_path / "results.csv"
+    write_games(path, range(2))
+    with pytest.raises(ValueError):
+        ResultsWriter(path, ["game", "rounds"])
+
+
+def test_results_writer_empty_file(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text("")
+    write_games(path, range(2))
+    assert list(read_column(path, "game")) == ["0", "1"]
+
+
+def test_read_results_lazy(tmp_path):
+    path = tmp_path / "results.csv"
+    write_games(path, range(3))
+    records = read_results(path)
+    assert next(records)["game"] == "0"
+    records.close()
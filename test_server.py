@@ -0,0 +1,218 @@
+import asyncio
+import json
+import threading
+
+from game import Game
+from server import GameServer
+
+
+async def send(reader, writer, request) -> dict:
+    if isinstance(request, dict):
+        request = json.dumps(request)
+    writer.write(request.encode() + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+def run_with_server(client):
+    async def run():
+        server = GameServer()
+        await server.start()
+        try:
+            return await client(server)
+        finally:
+            await server.close()
+
+    return asyncio.run(run())
+
+
+def test_server_start_game():
+    async def client(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                       server.port())
+        response = await send(reader, writer,
+                              {"command": "start", "seed": 3})
+        writer.close()
+        return response
+
+    response = run_with_server(client)
+    assert response["messages"] == ["PLAYERS_TURN"]
+    assert response["changes"] == []
+    assert response["players_turn"]
+    assert not response["won"]
+    assert len(response["fleet"]) == 10
+
+
+def test_server_errors():
+    async def client(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                       server.port())
+        responses = [
+            await send(reader, writer, "not json"),
+            await send(reader, writer, "[1, 2]"),
+            await send(reader, writer, {"command": "fly"}),
+            await send(reader, writer, {"command": "shoot", "x": "a",
+                                        "y": 1}),
+            await send(reader, writer, {"command": "start", "seed": "a"}),
+            await send(reader, writer, {"command": "start"}),
+            await send(reader, writer, {"command": "shoot", "x": "k",
+                                        "y": 1}),
+            await send(reader, writer, {"command": "mark", "x": "a",
+                                        "y": [1]})
+        ]
+        writer.close()
+        return responses
+
+    responses = run_with_server(client)
+    assert responses[0] == {"error": "invalid JSON"}
+    assert responses[1] == {"error": "request must be a JSON object"}
+    assert responses[2] == {"error": "unknown command fly"}
+    assert responses[3] == {"error": "game not started"}
+    assert responses[4] == {"error": "seed must be an integer"}
+    assert "error" not in responses[5]
+    assert responses[6] == {"error": "invalid coordinates"}
+    assert responses[7] == {"error": "invalid coordinates"}
+
+
+def test_server_mark_and_unmark():
+    async def client(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                       server.port())
+        await send(reader, writer, {"command": "start"})
+        marked = await send(reader, writer,
+                            {"command": "mark", "x": "c", "y": 4})
+        unmarked = await send(reader, writer,
+                              {"command": "unmark", "x": "c", "y": 4})
+        writer.close()
+        return marked, unmarked
+
+    marked, unmarked = run_with_server(client)
+    assert marked["changes"] == [{"view": "ENEMY_BOARD",
+                                  "position": ["c", 4], "old": "NOTHING",
+                                  "new": "MISS"}]
+    assert unmarked["changes"] == [{"view": "ENEMY_BOARD",
+                                    "position": ["c", 4], "old": "MISS",
+                                    "new": "NOTHING"}]
+
+
+def test_server_play_games():
+    fields = [{"command": "shoot", "x": x, "y": y}
+              for y in range(1, 11) for x in "abcdefghij"]
+
+    async def play(server, seed: int) -> dict:
+        reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                       server.port())
+        await send(reader, writer, {"command": "start", "seed": seed,
+                                    "hard_enemy": True})
+        for request in fields:
+            response = await send(reader, writer, request)
+            assert response["players_turn"] or response["won"]
+            if response["won"]:
+                break
+        writer.close()
+        return response
+
+    async def client(server):
+        return await asyncio.gather(*(play(server, seed)
+                                      for seed in range(5)))
+
+    for response in run_with_server(client):
+        assert response["won"]
+        assert "PLAYER_WIN" in response["messages"] or \
+            "ENEMY_WIN" in response["messages"]
+
+
+def test_server_enemy_move_times():
+    async def client(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                       server.port())
+        await send(reader, writer, {"command": "start", "seed": 4,
+                                    "hard_enemy": True,
+                                    "monte_carlo_enemy": True})
+        responses = []
+        for x in "abcdefghij":
+            responses.append(await send(reader, writer, {"command": "shoot",
+                                                         "x": x, "y": 1}))
+        writer.close()
+        return responses
+
+    responses = run_with_server(client)
+    move_times = [elapsed for response in responses
+                  for elapsed in response["enemy_move_ms"]]
+    assert move_times
+    assert all(elapsed >= 0 for elapsed in move_times)
+    enemy_messages = [message for response in responses
+                      for message in response["messages"]
+                      if message in ("ENEMY_MISS", "PLAYER_SHIP_HIT")]
+    assert len(move_times) == len(enemy_messages)
+
+
+def test_server_enemy_move_does_not_block(monkeypatch):
+    thinking = threading.Event()
+    release = threading.Event()
+    timeouts = []
+    choose_enemy_target = Game.choose_enemy_target
+
+    def slow_choose_enemy_target(self, deadline_ms=None):
+        thinking.set()
+        timeouts.append(not release.wait(5))
+        return choose_enemy_target(self, deadline_ms)
+
+    monkeypatch.setattr("game.Game.choose_enemy_target",
+                        slow_choose_enemy_target)
+
+    async def client(server):
+        reader, writer = await asyncio.open_connection("127.0.0.1",
+                                                       server.port())
+        await send(reader, writer, {"command": "start", "seed": 3})
+
+        async def shoot_until_enemy_moves():
+            for y in range(1, 11):
+                for x in "abcdefghij":
+                    response = await send(reader, writer, {
+                        "command": "shoot", "x": x, "y": y})
+                    if response["enemy_move_ms"]:
+                        return response
+
+        shooting = asyncio.create_task(shoot_until_enemy_moves())
+        for _ in range(500):
+            if thinking.is_set():
+                break
+            await asyncio.sleep(0.01)
+        # the other session is served while the enemy is thinking
+        other_reader, other_writer = await asyncio.open_connection(
+            "127.0.0.1", server.port())
+        other = await send(other_reader, other_writer, {"command": "start"})
+        release.set()
+        response = await shooting
+        writer.close()
+        other_writer.close()
+        return other, response
+
+    other, response = run_with_server(client)
+    assert other["players_turn"]
+    assert response["enemy_move_ms"]
+    assert timeouts
+    assert not any(timeouts)
+
+
+def test_server_idle_sessions():
+    async def client(server):
+        connections = [await asyncio.open_connection("127.0.0.1",
+                                                     server.port())
+                       for _ in range(50)]
+        for _ in range(100):
+            if server.sessions() == 50:
+                break
+            await asyncio.sleep(0.01)
+        sessions = server.sessions()
+        for _, writer in connections:
+            writer.close()
+            await writer.wait_closed()
+        for _ in range(100):
+            if server.sessions() == 0:
+                break
+            await asyncio.sleep(0.01)
+        return sessions, server.sessions()
+
+    assert run_with_server(client) == (50, 0)
@@ -27,6 +27,51 @@ def test_settings_set_hard_enemy():
     assert setts[Setting.HARD_ENEMY]
 
 
+def test_settings_set_density_enemy():
+    settings = Settings()
+    assert not settings.get_settings()[Setting.DENSITY_ENEMY]
+    settings.set_density_enemy(True)
+    setts = settings.get_settings()
+    assert setts[Setting.DENSITY_ENEMY]
+    assert not setts[Setting.HARD_ENEMY]
+
+
+def test_settings_set_monte_carlo_enemy():
+    settings = Settings()
+    assert not settings.get_settings()[Setting.MONTE_CARLO_ENEMY]
+    settings.set_monte_carlo_enemy(True)
+    setts = settings.get_settings()
+    assert setts[Setting.MONTE_CARLO_ENEMY]
+    assert not setts[Setting.DENSITY_ENEMY]
+
+
+def test_settings_load_settings_without_monte_carlo_enemy():
+    with open("test.json", 'w') as file_handle:
+        json.dump({"mark_misses_around": False, "hard_enemy": True,
+                   "density_enemy": True}, file_handle)
+    settings = Settings("test.json")
+    settings.load_settings()
+    setts = settings.get_settings()
+    assert setts[Setting.HARD_ENEMY]
+    assert setts[Setting.DENSITY_ENEMY]
+    assert not setts[Setting.MONTE_CARLO_ENEMY]
+    os.remove("test.json")
+
+
+def test_settings_load_settings_without_density_enemy():
+    with open("test.json", 'w') as file_handle:
+        json.dump({"mark_misses_around": False, "hard_enemy": True},
+                  file_handle)
+    settings = Settings("test.json")
+    settings.load_settings()
+    setts = settings.get_settings()
+    assert not setts[Setting.MARK_MISSES_AROUND]
+    assert setts[Setting.HARD_ENEMY]
+    assert not setts[Setting.DENSITY_ENEMY]
+    assert not setts[Setting.MONTE_CARLO_ENEMY]
+    os.remove("test.json")
+
+
 def test_settings_load_settings_no_settings_file():
     assert not os.path.exists("non_existent.json")
     settings = Settings("non_existent.json")
@@ -72,4 +117,5 @@ def test_settings_save_settings():
         json_setts = json.load(file_handle)
         assert json_setts["mark_misses_around"]
         assert json_setts["hard_enemy"]
+        assert not json_setts["density_enemy"]
     os.remove("test.json")
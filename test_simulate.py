@@ -0,0 +1,136 @@
+import random
+
+from board import INDEX_TO_FIELD, mask_indices, ship_mask
+from enemy import Enemy, EnemyMode
+from fleet import Fleet, random_fleet_layouts
+from replay import ReplayPlayer
+from settings import Setting
+from simulate import ScriptedShooter, fleet_layout, simulate_game, \
+    MatchResult, layout_fleet
+
+
+def layout_fields(layout: tuple) -> list:
+    fields = []
+    for mask in layout:
+        fields += [INDEX_TO_FIELD[index] for index in mask_indices(mask)]
+    return fields
+
+
+def empty_fields(layout: tuple) -> list:
+    taken = layout_fields(layout)
+    return [field for field in INDEX_TO_FIELD if field not in taken]
+
+
+def test_scripted_shooter_shoot():
+    shooter = ScriptedShooter([('a', 1), ('c', 4)])
+    assert shooter.shoot() == ('a', 1)
+    shooter.react_to_hit()
+    shooter.react_to_sink()
+    assert not shooter.mark_as_empty()
+    assert shooter.shoot() == ('c', 4)
+
+
+def test_fleet_layout():
+    fleet = Fleet()
+    fleet.create_random()
+    layout = fleet_layout(fleet)
+    assert len(layout) == 10
+    for mask, ship in zip(layout, fleet.ships()):
+        assert mask == ship_mask(ship)
+
+
+def test_simulate_game_first_wins():
+    first_layout, second_layout = random_fleet_layouts(2)
+    first = ScriptedShooter(layout_fields(second_layout))
+    second = ScriptedShooter(layout_fields(first_layout))
+    result = simulate_game(first, second, first_layout, second_layout)
+    assert result == MatchResult(0, (20, 0), 1)
+
+
+def test_simulate_game_second_wins():
+    first_layout, second_layout = random_fleet_layouts(2)
+    first = ScriptedShooter(empty_fields(second_layout))
+    second = ScriptedShooter(layout_fields(first_layout))
+    result = simulate_game(first, second, first_layout, second_layout)
+    assert result.winner == 1
+    assert result.shots == (1, 20)
+    assert result.rounds == 1
+
+
+def test_simulate_game_turns():
+    first_layout, second_layout = random_fleet_layouts(2)
+    misses = empty_fields(first_layout)
+    # the second shooter misses once before sinking the whole fleet
+    first = ScriptedShooter(empty_fields(second_layout))
+    second = ScriptedShooter(misses[:1] + layout_fields(first_layout))
+    result = simulate_game(first, second, first_layout, second_layout)
+    assert result == MatchResult(1, (2, 21), 2)
+
+
+def test_simulate_game_repeated_shot_misses():
+    first_layout, second_layout = random_fleet_layouts(2)
+    hit = layout_fields(second_layout)[0]
+    first = ScriptedShooter([hit, hit] + layout_fields(second_layout)[1:])
+    second = ScriptedShooter(layout_fields(first_layout))
+    result = simulate_game(first, second, first_layout, second_layout)
+    assert result == MatchResult(1, (2, 20), 1)
+
+
+def test_simulate_game_repeated_shot_recorded():
+    first_layout, second_layout = random_fleet_layouts(2)
+    hit = layout_fields(second_layout)[0]
+    first = ScriptedShooter([hit, hit] + layout_fields(second_layout)[1:])
+    second = ScriptedShooter(layout_fields(first_layout))
+    settings = {Setting.MARK_MISSES_AROUND: False, Setting.HARD_ENEMY: False}
+    result = simulate_game(first, second, first_layout, second_layout,
+                           settings=settings)
+    # just like in the Game, the repeated shot doesn't count
+    assert result[:3] == (0, (20, 0), 1)
+    player = ReplayPlayer(result.replay)
+    assert player.move_count() == 20
+    assert player.position(player.move_count()).won()
+
+
+def test_simulate_game_marked_field_recorded():
+    first_layout, second_layout = random_fleet_layouts(2, random.Random(6))
+    ship_fields = layout_fields(second_layout)
+    # shoots at every field, so it also shoots at the fields marked around
+    # the sunken ships
+    first = ScriptedShooter(ship_fields[:1] + list(INDEX_TO_FIELD) +
+                            ship_fields)
+    second = ScriptedShooter(empty_fields(first_layout))
+    settings = {Setting.MARK_MISSES_AROUND: True, Setting.HARD_ENEMY: False}
+    result = simulate_game(first, second, first_layout, second_layout,
+                           settings=settings)
+    player = ReplayPlayer(result.replay)
+    assert player.move_count() == sum(result.shots)
+    assert player.position(player.move_count()).won()
+
+
+def test_simulate_game_enemies():
+    for mode in EnemyMode:
+        result = simulate_game(Enemy(mode=mode), Enemy())
+        assert result.winner in [0, 1]
+        assert 20 <= result.shots[result.winner] <= 100
+        assert result.shots[1 - result.winner] <= 100
+
+
+def test_layout_fleet():
+    for layout in random_fleet_layouts(20, random.Random(4)):
+        assert fleet_layout(layout_fleet(layout)) == layout
+
+
+def test_simulate_game_recorded():
+    rng = random.Random(5)
+    settings = {Setting.MARK_MISSES_AROUND: False, Setting.HARD_ENEMY: True,
+                Setting.DENSITY_ENEMY: False}
+    result = simulate_game(Enemy(mode=EnemyMode.EASY, rng=rng),
+                           Enemy(mode=EnemyMode.HARD, rng=rng), rng=rng,
+                           settings=settings)
+    player = ReplayPlayer(result.replay)
+    assert player.move_count() == sum(result.shots)
+    game = player.position(player.move_count())
+    assert game.won()
+    assert game._player_fleet.is_alive() == (result.winner == 0)
+    assert simulate_game(Enemy(rng=rng), Enemy(rng=rng),
+                         rng=rng).replay is None
@@ -0,0 +1,73 @@
+import random
+
+from enemy import EnemyMode
+from tournament import TournamentResult, run_tournament
+
+
+def test_tournament_result_add_game():
+    result = TournamentResult()
+    assert result.games() == 0
+    assert result.win_rate(0) == 0
+    result.add_game(0, (30, 29), 30)
+    result.add_game(1, (40, 41), 41)
+    result.add_game(0, (30, 25), 30)
+    assert result.games() == 3
+    assert result.wins(0) == 2
+    assert result.wins(1) == 1
+    assert result.win_rate(1) == 1 / 3
+    assert result.rounds_histogram() == {30: 2, 41: 1}
+    assert result.shots_histogram(0) == {30: 2, 40: 1}
+    assert result.shots_histogram(1) == {29: 1, 41: 1, 25: 1}
+
+
+def test_tournament_result_merge():
+    result = TournamentResult()
+    result.add_game(0, (30, 29), 30)
+    other = TournamentResult()
+    other.add_game(1, (40, 41), 41)
+    result.merge(other)
+    expected = TournamentResult()
+    expected.add_game(1, (40, 41), 41)
+    expected.add_game(0, (30, 29), 30)
+    assert result == expected
+
+
+def test_run_tournament():
+    result = run_tournament(EnemyMode.HARD, EnemyMode.EASY, 25, workers=1,
+                            chunk_size=10)
+    assert result.games() == 25
+    assert sum(result.rounds_histogram().values()) == 25
+    assert sum(result.shots_histogram(0).values()) == 25
+    assert sum(result.shots_histogram(1).values()) == 25
+
+
+def test_run_tournament_no_games():
+    result = run_tournament(EnemyMode.HARD, EnemyMode.EASY, 0)
+    assert result.games() == 0
+
+
+def test_run_tournament_reproducible():
+    result = run_tournament(EnemyMode.DENSITY, EnemyMode.EASY, 20, seed=7,
+                            workers=1, chunk_size=5)
+    other = run_tournament(EnemyMode.DENSITY, EnemyMode.EASY, 20, seed=7,
+                           workers=1, chunk_size=5)
+    assert result == other
+    different = run_tournament(EnemyMode.DENSITY, EnemyMode.EASY, 20, seed=8,
+                               workers=1, chunk_size=5)
+    assert result != different
+
+
+def test_run_tournament_workers():
+    result = run_tournament(EnemyMode.EASY, EnemyMode.EASY, 12, seed=1,
+                            workers=1, chunk_size=4)
+    parallel = run_tournament(EnemyMode.EASY, EnemyMode.EASY, 12, seed=1,
+                              workers=2, chunk_size=4)
+    assert result == parallel
+
+
+def test_run_tournament_keeps_random_state():
+    random.seed(5)
+    expected = random.random()
+    random.seed(5)
+    run_tournament(EnemyMode.EASY, EnemyMode.EASY, 2, workers=1)
+    assert random.random() == expected
@@ -0,0 +1,149 @@
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from enemy import Enemy, EnemyMode
+from simulate import simulate_game
+
+
+class TournamentResult:
+    """
+    Aggregated results of a series of games between two enemies
+    """
+
+    def __init__(self):
+        """
+        Creates an empty result
+        """
+        self._wins = [0, 0]
+        self._rounds = Counter()
+        self._shots = (Counter(), Counter())
+
+    def add_game(self, winner: int, shots: tuple, rounds: int):
+        """
+        Adds a single game to the result
+        :param winner: 0 if the first player won, 1 if the second one did
+        :type winner: int
+        :param shots: number of shots fired by each player
+        :type shots: tuple
+        :param rounds: number of rounds the game lasted
+        :type rounds: int
+        """
+        self._wins[winner] += 1
+        self._rounds[rounds] += 1
+        self._shots[0][shots[0]] += 1
+        self._shots[1][shots[1]] += 1
+
+    def merge(self, other: 'TournamentResult'):
+        """
+        Adds all games from another result to this one
+        :param other: result to add to this one
+        :type other: TournamentResult
+        """
+        for player in range(2):
+            self._wins[player] += other._wins[player]
+            self._shots[player].update(other._shots[player])
+        self._rounds.update(other._rounds)
+
+    def games(self) -> int:
+        return sum(self._wins)
+
+    def wins(self, player: int) -> int:
+        return self._wins[player]
+
+    def win_rate(self, player: int) -> float:
+        """
+        Calculates the fraction of games won by a player
+        :param player: 0 for the first player, 1 for the second one
+        :type player: int
+        :return: win rate of the player, 0 if no games were played
+        """
+        if not self.games():
+            return 0.0
+        return self._wins[player] / self.games()
+
+    def rounds_histogram(self) -> Counter:
+        return self._rounds
+
+    def shots_histogram(self, player: int) -> Counter:
+        return self._shots[player]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TournamentResult):
+            return NotImplemented
+        return self._wins == other._wins and \
+            self._rounds == other._rounds and \
+            self._shots == other._shots
+
+
+def _play_chunk(first_mode: EnemyMode, second_mode: EnemyMode, seed: int,
+                chunk: int, games: int) -> TournamentResult:
+    """
+    Plays a part of the tournament. The chunk's own random number generator
+    is seeded with the tournament's seed and the chunk number, so the result
+    of a chunk doesn't depend on the worker process it was played in. Players
+    take turns in making the first move, the first player starts in even games
+    :param first_mode: EnemyMode of the first player
+    :type first_mode: EnemyMode
+    :param second_mode: EnemyMode of the second player
+    :type second_mode: EnemyMode
+    :param seed: seed of the whole tournament
+    :type seed: int
+    :param chunk: number of this chunk
+    :type chunk: int
+    :param games: number of games to play
+    :type games: int
+    :return: TournamentResult of the games played in this chunk
+    """
+    rng = random.Random(f"{seed}:{chunk}")
+    result = TournamentResult()
+    for game in range(games):
+        first = Enemy(mode=first_mode, rng=rng)
+        second = Enemy(mode=second_mode, rng=rng)
+        if game % 2:
+            game_result = simulate_game(second, first, rng=rng)
+            result.add_game(1 - game_result.winner,
+                            game_result.shots[::-1], game_result.rounds)
+        else:
+            game_result = simulate_game(first, second, rng=rng)
+            result.add_game(game_result.winner, game_result.shots,
+                            game_result.rounds)
+    return result
+
+
+def run_tournament(first_mode: EnemyMode, second_mode: EnemyMode,
+                   games: int, seed: int = 0, workers: int = None,
+                   chunk_size: int = 200) -> TournamentResult:
+    """
+    Plays games between two enemies, split into chunks played in parallel by
+    a pool of worker processes. The result only depends on the seed, the
+    number of games and the chunk size, not on the number of workers
+    :param first_mode: EnemyMode of the first player
+    :type first_mode: EnemyMode
+    :param second_mode: EnemyMode of the second player
+    :type second_mode: EnemyMode
+    :param games: number of games to play
+    :type games: int
+    :param seed: seed used to generate all fleets and moves
+    :type seed: int
+    :param workers: number of worker processes, all cores if not specified,
+    with 1 the games are played in this process
+    :type workers: int
+    :param chunk_size: number of games played by a worker at a time
+    :type chunk_size: int
+    :return: TournamentResult of all the games
+    """
+    chunks = [(first_mode, second_mode, seed, chunk,
+               min(chunk_size, games - start))
+              for chunk, start in enumerate(range(0, games, chunk_size))]
+    result = TournamentResult()
+    if not chunks:
+        return result
+    if workers == 1:
+        for chunk_args in chunks:
+            result.merge(_play_chunk(*chunk_args))
+        return result
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_result in executor.map(_play_chunk, *zip(*chunks)):
+            result.merge(chunk_result)
+    return result
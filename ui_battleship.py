@@ -541,6 +541,16 @@ class Ui_Battleship(object):
 
         self.verticalLayout_14.addWidget(self.checkbox_settings_hard_enemy, 0, Qt.AlignLeft)
 
+        self.checkbox_settings_density_enemy = QCheckBox(self.page)
+        self.checkbox_settings_density_enemy.setObjectName(u"checkbox_settings_density_enemy")
+
+        self.verticalLayout_14.addWidget(self.checkbox_settings_density_enemy, 0, Qt.AlignLeft)
+
+        self.checkbox_settings_monte_carlo_enemy = QCheckBox(self.page)
+        self.checkbox_settings_monte_carlo_enemy.setObjectName(u"checkbox_settings_monte_carlo_enemy")
+
+        self.verticalLayout_14.addWidget(self.checkbox_settings_monte_carlo_enemy, 0, Qt.AlignLeft)
+
         self.verticalSpacer_19 = QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding)
 
         self.verticalLayout_14.addItem(self.verticalSpacer_19)
@@ -610,6 +620,8 @@ class Ui_Battleship(object):
         self.label_settings.setText(QCoreApplication.translate("Battleship", u"Settings", None))
         self.checkbox_settings_mma.setText(QCoreApplication.translate("Battleship", u"Automatically mark misses around sunken ships", None))
         self.checkbox_settings_hard_enemy.setText(QCoreApplication.translate("Battleship", u"Harder computer enemy", None))
+        self.checkbox_settings_density_enemy.setText(QCoreApplication.translate("Battleship", u"Probability-based targeting of the harder enemy", None))
+        self.checkbox_settings_monte_carlo_enemy.setText(QCoreApplication.translate("Battleship", u"Sampling-based targeting of the harder enemy", None))
         self.button_settings_back.setText(QCoreApplication.translate("Battleship", u"Back", None))
     # retranslateUi
 